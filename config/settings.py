@@ -65,10 +65,91 @@ def save_api_key(key: str) -> None:
 ANTHROPIC_API_KEY = get_api_key()
 CLAUDE_MODEL = "claude-sonnet-4-20250514"
 
+# Per-step model routing, keyed by pipeline step. Extraction and evaluation
+# fill fixed schemas and run a faster, cheaper model; writing and revision use
+# the strongest. Omitted keys fall back to CLAUDE_MODEL, LLM_TEMPERATURE and
+# the step's own max_tokens sizing (max_tokens here caps each request).
+STEP_MODELS = {
+    "extraction": {"model": "claude-haiku-4-5-20251001", "max_tokens": 8192, "temperature": 0.0},
+    "writing": {"model": CLAUDE_MODEL, "max_tokens": 8192, "temperature": 0.0},
+    "evaluation": {"model": "claude-haiku-4-5-20251001", "max_tokens": 4096, "temperature": 0.0},
+    "revision": {"model": CLAUDE_MODEL, "max_tokens": 8192, "temperature": 0.0},
+}
+
+
+def step_model_settings(step: str) -> dict:
+    """
+    Get model, max_tokens and temperature for a pipeline step.
+
+    Args:
+        step: "extraction", "writing", "evaluation" or "revision"
+
+    Returns:
+        Dict with "model", "max_tokens" (None for no cap) and "temperature"
+    """
+    configured = STEP_MODELS.get(step, {})
+    return {
+        "model": configured.get("model", CLAUDE_MODEL),
+        "max_tokens": configured.get("max_tokens"),
+        "temperature": configured.get("temperature", LLM_TEMPERATURE),
+    }
+
+
+# USD per million tokens, matched on the longest model-name prefix (used for cost estimates)
+MODEL_PRICING = {
+    "claude-opus-4-5": {"input": 5.00, "output": 25.00, "cache_write": 6.25, "cache_read": 0.50},
+    "claude-opus-4": {"input": 15.00, "output": 75.00, "cache_write": 18.75, "cache_read": 1.50},
+    "claude-sonnet-4": {"input": 3.00, "output": 15.00, "cache_write": 3.75, "cache_read": 0.30},
+    "claude-3-7-sonnet": {"input": 3.00, "output": 15.00, "cache_write": 3.75, "cache_read": 0.30},
+    "claude-haiku-4-5": {"input": 1.00, "output": 5.00, "cache_write": 1.25, "cache_read": 0.10},
+    "claude-3-5-haiku": {"input": 0.80, "output": 4.00, "cache_write": 1.00, "cache_read": 0.08},
+}
+
+# HTTP connection pool (one shared keep-alive pool for all API calls)
+HTTP_MAX_CONNECTIONS = 20
+HTTP_MAX_KEEPALIVE_CONNECTIONS = 10
+HTTP_KEEPALIVE_EXPIRY = 30.0  # Seconds an idle connection is kept open
+API_TIMEOUT_SECONDS = 600.0  # Default per-call timeout; generate() accepts an override
+API_CONNECT_TIMEOUT_SECONDS = 10.0
+
+# Rate limiting (starting budgets per model; refined from API rate-limit headers at runtime)
+RATE_LIMIT_REQUESTS_PER_MINUTE = 1000
+RATE_LIMIT_INPUT_TOKENS_PER_MINUTE = 450000
+RATE_LIMIT_OUTPUT_TOKENS_PER_MINUTE = 90000
+API_MAX_RETRIES = 6  # Retries for 429/529/connection errors, with jittered backoff
+
 # Pipeline settings
 MAX_ITERATIONS = 3  # Maximum write-evaluate-revise loops
+ISSUES_PER_ITERATION = 3  # Allow one revision per this many blocking issues in the first evaluation
+CONVERGENCE_MIN_CHANGE = 0.02  # Stop when a revision changes less than this fraction of the paragraphs it rewrote
+CONVERGENCE_MAX_OVERLAP = 0.8  # Stop when this fraction of flagged statements is flagged again
 LLM_TEMPERATURE = 0.0  # Deterministic output
 MAX_TOKENS = 4096
+MAX_OUTPUT_TOKENS = 32000  # Cap per call when continuing responses that hit max_tokens
+STREAMING_ENABLED = True  # Stream long generations for token-level progress
+PIPELINED_EVALUATION = True  # GUI: grounding-check paragraphs while the draft streams (needs streaming)
+CANDIDATE_DRAFTS = 1  # GUI: write and evaluate this many drafts concurrently and keep the best (1 = off)
+CANDIDATE_TEMPERATURE = 0.8  # Sampling temperature for candidate drafts, so they differ
+BATCH_WORKERS = 4  # Cases processed concurrently by `main.py --batch`
+BULK_GATHER_SECONDS = 2.0  # `--bulk`: wait this long for more calls before submitting a batch
+BULK_POLL_SECONDS = 60.0  # `--bulk`: delay between batch status checks
+CHECKPOINTS_ENABLED = True  # Save state after each step and resume unfinished runs for the same case
+STEP_MEMO_ENABLED = True  # Reuse a step's earlier output when its inputs and prompt are unchanged
+
+# How components and evaluations are rendered into prompts: "lean" (YAML-like),
+# "compact" (JSON without whitespace) or "json" (indented JSON)
+PROMPT_DATA_FORMAT = "lean"
+
+# Anthropic prompt caching (static instructions + components reused across iterations)
+PROMPT_CACHING_ENABLED = True
+
+# Response cache (replays identical deterministic API calls from disk).
+# Entries hold full prompts and responses unencrypted, including client
+# interview notes - sensitive case data. Keep CACHE_DIR out of version control
+# and shared folders (it's in .gitignore), and delete it when a case is closed.
+CACHE_DIR = PROJECT_ROOT / "cache"
+RESPONSE_CACHE_ENABLED = True  # Set to False to always call the API
+RESPONSE_CACHE_MAX_BYTES = 200 * 1024 * 1024  # Oldest entries evicted beyond this
 
 # Logging
 LOG_LEVEL = "INFO"  # DEBUG, INFO, WARNING, ERROR, CRITICAL
@@ -6,12 +6,13 @@ import logging
 from typing import Optional, Callable
 from pathlib import Path
 
+from pipeline.checkpoint import resume_state
 from pipeline.core import Pipeline, PipelineState
+from pipeline.iterative import build_iterative_pipeline, build_step_clients
+from pipeline.client_pool import pool_stats
 from pipeline.llm_client import ClaudeClient, PromptLoader
-from pipeline.steps.extractor import ExtractorStep
-from pipeline.steps.writer import WriterStep
-from pipeline.steps.evaluator import EvaluatorStep
-from pipeline.steps.reviser import ReviserStep
+from pipeline.response_cache import ResponseCache
+from pipeline.usage import format_totals, summarize
 from output.docx_builder import AffidavitDocxBuilder
 from config import settings
 
@@ -76,14 +77,18 @@ class PipelineRunner:
         """Internal method that runs the pipeline."""
         try:
             # Initialize components
-            client = ClaudeClient(
-                api_key=settings.ANTHROPIC_API_KEY,
-                model=settings.CLAUDE_MODEL
+            cache = ResponseCache(
+                str(settings.CACHE_DIR),
+                max_bytes=settings.RESPONSE_CACHE_MAX_BYTES,
+                enabled=settings.RESPONSE_CACHE_ENABLED
+            )
+            prompt_loader = PromptLoader(
+                str(settings.PROMPTS_DIR),
+                prompt_caching=settings.PROMPT_CACHING_ENABLED
             )
-            prompt_loader = PromptLoader(str(settings.PROMPTS_DIR))
 
             # Build pipeline with write-evaluate-revise loop
-            pipeline = self._build_pipeline(client, prompt_loader)
+            pipeline = self._build_pipeline(cache, prompt_loader)
 
             # Create initial state
             initial_state = PipelineState(
@@ -93,9 +98,23 @@ class PipelineRunner:
                 case_specifics=case_specifics
             )
 
+            # Pick up an interrupted run of this case where it stopped
+            if settings.CHECKPOINTS_ENABLED:
+                resumed = resume_state(initial_state)
+                if resumed:
+                    initial_state = resumed
+                    if progress_callback:
+                        progress_callback(
+                            f"Resuming after: {', '.join(resumed.completed_steps)}", 10
+                        )
+
             # Run pipeline
             logger.info("Starting pipeline execution")
             final_state = pipeline.run(initial_state, progress_callback)
+            logger.info(f"Response cache: {cache.stats()}")
+            logger.info(f"HTTP connection pool: {pool_stats()}")
+            logger.info(f"API usage: {format_totals(summarize(final_state.llm_calls)['total'])}")
+            logger.info(f"Input tokens saved by compact prompt data: ~{final_state.prompt_tokens_saved}")
 
             # Generate output documents
             if progress_callback:
@@ -130,10 +149,13 @@ class PipelineRunner:
         finally:
             self.is_running = False
 
-    def _build_pipeline(self, client: ClaudeClient, prompt_loader: PromptLoader) -> Pipeline:
+    def _build_pipeline(self, cache: ResponseCache, prompt_loader: PromptLoader) -> Pipeline:
         """
         Build the pipeline with write-evaluate-revise loop.
 
+        Each step gets a client for its model, temperature and max_tokens
+        from settings.STEP_MODELS; all of them share the response cache.
+
         Pipeline flow:
         1. Extract components
         2. Write draft
@@ -141,90 +163,19 @@ class PipelineRunner:
         4. If issues found and iterations < max: Revise and go back to step 3
         5. Done
         """
-        # Create pipeline steps
-        extractor = ExtractorStep(client, prompt_loader)
-        writer = WriterStep(client, prompt_loader)
-        evaluator = EvaluatorStep(client, prompt_loader)
-        reviser = ReviserStep(client, prompt_loader)
-
-        # Build step sequence with iteration logic
-        # The Pipeline class will handle the write-evaluate-revise loop
-        # For now, we'll create a custom pipeline that handles iterations
-
-        return IterativePipeline(
-            extract_step=extractor,
-            write_step=writer,
-            eval_step=evaluator,
-            revise_step=reviser,
-            max_iterations=settings.MAX_ITERATIONS
+        clients = build_step_clients(lambda **config: ClaudeClient(
+            api_key=settings.ANTHROPIC_API_KEY,
+            cache=cache,
+            streaming=settings.STREAMING_ENABLED,
+            max_output_tokens=settings.MAX_OUTPUT_TOKENS,
+            **config
+        ))
+        return build_iterative_pipeline(
+            clients["writing"], prompt_loader, settings.MAX_ITERATIONS,
+            checkpointing=settings.CHECKPOINTS_ENABLED,
+            memoize=settings.STEP_MEMO_ENABLED,
+            pipelined=settings.PIPELINED_EVALUATION,
+            step_clients=clients,
+            candidates=settings.CANDIDATE_DRAFTS,
+            candidate_temperature=settings.CANDIDATE_TEMPERATURE
         )
-
-
-class IterativePipeline(Pipeline):
-    """
-    Custom pipeline that handles write-evaluate-revise iterations.
-    """
-
-    def __init__(self, extract_step, write_step, eval_step, revise_step, max_iterations=3):
-        # Don't call super().__init__ - we'll override run()
-        self.extract_step = extract_step
-        self.write_step = write_step
-        self.eval_step = eval_step
-        self.revise_step = revise_step
-        self.max_iterations = max_iterations
-
-    def run(self, state: PipelineState,
-            progress_callback: Optional[Callable[[str, int], None]] = None) -> PipelineState:
-        """
-        Run pipeline with iterative write-evaluate-revise loop.
-        """
-        # Step 1: Extract components (10% of progress)
-        if progress_callback:
-            progress_callback("Extracting components from notes...", 10)
-
-        state = self.extract_step.execute(state)
-        if state.has_critical_error():
-            return state
-
-        # Step 2: Initial write (30% of progress)
-        if progress_callback:
-            progress_callback("Writing initial draft...", 30)
-
-        state = self.write_step.execute(state)
-        if state.has_critical_error():
-            return state
-
-        # Steps 3-4: Evaluate and revise loop (30% - 90% of progress)
-        iteration = 0
-        while iteration < self.max_iterations:
-            # Evaluate
-            progress = 40 + (iteration * 20)
-            if progress_callback:
-                progress_callback(f"Evaluating draft (iteration {iteration + 1})...", progress)
-
-            state = self.eval_step.execute(state)
-            if state.has_critical_error():
-                return state
-
-            # Check if we're done (no revision needed)
-            if state.evaluation_report and not state.evaluation_report.get('needs_revision', True):
-                logger.info(f"Draft approved after {iteration + 1} iteration(s)")
-                state.final_text = state.draft_text
-                break
-
-            # Revise if we haven't hit max iterations
-            iteration += 1
-            if iteration < self.max_iterations:
-                progress = 50 + (iteration * 20)
-                if progress_callback:
-                    progress_callback(f"Revising draft (iteration {iteration})...", progress)
-
-                state = self.revise_step.execute(state)
-                if state.has_critical_error():
-                    return state
-            else:
-                logger.warning(f"Reached max iterations ({self.max_iterations})")
-                state.final_text = state.draft_text
-                break
-
-        return state
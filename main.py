@@ -6,9 +6,12 @@ Simple, single-file entry point for the application.
 
 Usage:
     python main.py
+    python main.py --batch NOTES_DIR_OR_MANIFEST [--output DIR] [--workers N] [--bulk] [--fresh]
 """
+import argparse
 import sys
 import logging
+import time
 from pathlib import Path
 
 # Add project root to path
@@ -16,11 +19,119 @@ PROJECT_ROOT = Path(__file__).parent
 sys.path.insert(0, str(PROJECT_ROOT))
 
 from config.logging_config import setup_logging
-from gui.app import AffidavitApp
+from config import settings
+
+
+def parse_args():
+    """Parse command line arguments."""
+    parser = argparse.ArgumentParser(description="Affidavit Writing Assistant")
+    parser.add_argument(
+        "--batch",
+        metavar="SOURCE",
+        help="Run headless on a folder of notes files or a .json/.csv manifest"
+    )
+    parser.add_argument(
+        "--output",
+        default=str(settings.OUTPUT_DIR),
+        help="Base output directory for batch mode (default: %(default)s)"
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=settings.BATCH_WORKERS,
+        help="Cases processed concurrently in batch mode (default: %(default)s)"
+    )
+    parser.add_argument(
+        "--bulk",
+        action="store_true",
+        help="Batch mode only: submit all cases' calls through the Message Batches API "
+             "(about half the cost, results may take hours)"
+    )
+    parser.add_argument(
+        "--fresh",
+        action="store_true",
+        help="Batch mode only: ignore checkpoints and stored step outputs, and rerun every case"
+    )
+    return parser.parse_args()
+
+
+def run_batch(args) -> int:
+    """Run batch mode. Returns the process exit code."""
+    from pipeline.batch import BatchRunner, load_cases, format_summary
+    from pipeline.bulk import AnthropicBatchBackend, BulkClaudeClient
+    from pipeline.client_pool import pool_stats
+    from pipeline.iterative import build_step_clients
+    from pipeline.llm_client import AsyncClaudeClient, PromptLoader
+    from pipeline.response_cache import ResponseCache
+
+    logger = logging.getLogger(__name__)
+
+    if not settings.ANTHROPIC_API_KEY:
+        print("No API key configured. Set ANTHROPIC_API_KEY or run the GUI once to save one.")
+        return 1
+
+    cases = load_cases(args.batch)
+    if not cases:
+        print(f"No notes files found in {args.batch}")
+        return 1
+
+    cache = ResponseCache(
+        str(settings.CACHE_DIR),
+        max_bytes=settings.RESPONSE_CACHE_MAX_BYTES,
+        enabled=settings.RESPONSE_CACHE_ENABLED
+    )
+    if args.bulk:
+        backend = AnthropicBatchBackend(settings.ANTHROPIC_API_KEY)
+        step_clients = build_step_clients(lambda **config: BulkClaudeClient(
+            backend,
+            cache=cache,
+            gather_seconds=settings.BULK_GATHER_SECONDS,
+            poll_seconds=settings.BULK_POLL_SECONDS,
+            max_output_tokens=settings.MAX_OUTPUT_TOKENS,
+            **config
+        ))
+        # Every case should be waiting on the same batch, so don't cap workers
+        workers = len(cases)
+    else:
+        step_clients = build_step_clients(lambda **config: AsyncClaudeClient(
+            api_key=settings.ANTHROPIC_API_KEY,
+            cache=cache,
+            streaming=False,  # Nobody is watching token-level progress in batch mode
+            max_output_tokens=settings.MAX_OUTPUT_TOKENS,
+            **config
+        ))
+        workers = args.workers
+    prompt_loader = PromptLoader(
+        str(settings.PROMPTS_DIR),
+        prompt_caching=settings.PROMPT_CACHING_ENABLED
+    )
+    runner = BatchRunner(
+        step_clients["writing"],
+        prompt_loader,
+        output_path=args.output,
+        workers=workers,
+        max_iterations=settings.MAX_ITERATIONS,
+        checkpointing=settings.CHECKPOINTS_ENABLED,
+        resume=settings.CHECKPOINTS_ENABLED and not args.fresh,
+        memoize=settings.STEP_MEMO_ENABLED and not args.fresh,
+        step_clients=step_clients
+    )
+
+    start = time.perf_counter()
+    results = runner.run(cases, progress_callback=lambda message, _: logger.info(message))
+    elapsed = time.perf_counter() - start
+
+    logger.info(f"Response cache: {cache.stats()}")
+    logger.info(f"HTTP connection pool: {pool_stats()}")
+    print(format_summary(results, elapsed))
+
+    return 0 if all(r.success for r in results) else 2
 
 
 def main():
     """Main entry point."""
+    args = parse_args()
+
     # Setup logging
     log_file = setup_logging()
 
@@ -28,7 +139,11 @@ def main():
     logger.info("Starting Affidavit Writing Assistant")
 
     try:
+        if args.batch:
+            sys.exit(run_batch(args))
+
         # Create and run GUI
+        from gui.app import AffidavitApp
         app = AffidavitApp()
         app.run()
 
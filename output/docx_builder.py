@@ -2,7 +2,6 @@
 Word document generation for affidavit output.
 """
 import json
-import re
 from datetime import datetime
 from pathlib import Path
 from typing import Tuple
@@ -11,7 +10,9 @@ from docx import Document
 from docx.shared import Pt, Inches
 from docx.enum.text import WD_ALIGN_PARAGRAPH
 
-from pipeline.core import PipelineState, ErrorSeverity
+from pipeline.core import PipelineState, ErrorSeverity, sanitize_case_name
+from pipeline.models import EvaluationReport, is_missing
+from pipeline.usage import format_totals, summarize
 
 logger = logging.getLogger(__name__)
 
@@ -161,16 +162,16 @@ class AffidavitDocxBuilder:
         self.doc.add_paragraph()  # Blank line
 
         # Format as readable text
-        for component, content in state.extracted_components.items():
+        for component, content in state.extracted_components.to_dict().items():
             p = self.doc.add_paragraph(style='List Bullet')
             p.add_run(f"{component}: ").bold = True
 
-            if isinstance(content, dict) or isinstance(content, list):
+            if isinstance(content, list):
                 content_str = json.dumps(content, indent=2)
             else:
-                content_str = str(content)
+                content_str = content
 
-            if content_str == "MISSING" or not content_str.strip():
+            if is_missing(content):
                 run = p.add_run("[MISSING]")
                 run.font.color.rgb = None  # Red would require extra import
             else:
@@ -188,13 +189,13 @@ class AffidavitDocxBuilder:
         eval_report = state.evaluation_report
 
         # Summary statement
-        if eval_report.get('all_supported', False):
+        if eval_report.all_supported:
             self.doc.add_paragraph(
                 "All statements in the draft are supported by the source material."
             )
         else:
-            unsupported = eval_report.get('unsupported_statements', [])
-            uncertain = eval_report.get('uncertain_statements', [])
+            unsupported = eval_report.unsupported_statements
+            uncertain = eval_report.uncertain_statements
 
             summary_parts = []
             if unsupported:
@@ -222,7 +223,7 @@ class AffidavitDocxBuilder:
         eval_report = state.evaluation_report
 
         # Overall status
-        if eval_report.get('all_supported', False):
+        if eval_report.all_supported:
             self.doc.add_paragraph(
                 "Status: All statements supported by source material."
             )
@@ -234,7 +235,7 @@ class AffidavitDocxBuilder:
         self.doc.add_paragraph()
 
         # Unsupported statements
-        unsupported = eval_report.get('unsupported_statements', [])
+        unsupported = eval_report.unsupported_statements
         if unsupported:
             self.doc.add_heading('Unsupported Statements', level=3)
             self.doc.add_paragraph(
@@ -245,7 +246,7 @@ class AffidavitDocxBuilder:
             self.doc.add_paragraph()
 
         # Uncertain statements
-        uncertain = eval_report.get('uncertain_statements', [])
+        uncertain = eval_report.uncertain_statements
         if uncertain:
             self.doc.add_heading('Uncertain Statements', level=3)
             self.doc.add_paragraph(
@@ -256,9 +257,34 @@ class AffidavitDocxBuilder:
             self.doc.add_paragraph()
 
         # Summary from evaluation
-        if 'summary' in eval_report:
+        if eval_report.summary:
             self.doc.add_heading('Evaluator Summary', level=3)
-            self.doc.add_paragraph(eval_report['summary'])
+            self.doc.add_paragraph(eval_report.summary)
+
+        self._add_grounding_scores(eval_report)
+
+    def _add_grounding_scores(self, eval_report: EvaluationReport):
+        """Add per-sentence scores from the local grounding index."""
+        grounding = eval_report.grounding
+        if not grounding or not grounding.sentences:
+            return
+
+        sentences = grounding.sentences
+        pre_verified = sum(1 for s in sentences if s.pre_verified)
+
+        self.doc.add_paragraph()
+        self.doc.add_heading('Grounding Scores', level=3)
+        self.doc.add_paragraph(
+            f"{pre_verified} of {len(sentences)} sentence(s) scored at or above "
+            f"{grounding.threshold:.2f} against the extracted components and were "
+            "pre-verified; the rest were checked by the evaluator."
+        )
+        for s in sentences:
+            p = self.doc.add_paragraph(style='List Bullet')
+            p.add_run(f"{s.score:.2f}{' ✓' if s.pre_verified else ''}  ").bold = True
+            p.add_run(s.sentence)
+            if s.unknown_details:
+                p.add_run(f"  (not in source: {', '.join(s.unknown_details)})").italic = True
 
     def _add_processing_metadata(self, state: PipelineState):
         """Add processing metadata and error log (for technical report)."""
@@ -267,8 +293,16 @@ class AffidavitDocxBuilder:
         # Iterations
         self.doc.add_paragraph(f"Revision iterations completed: {state.iteration_count}")
         self.doc.add_paragraph(f"Maximum iterations allowed: 3")
+        if state.stop_reason:
+            self.doc.add_paragraph(f"Stopped because: {state.stop_reason}")
         self.doc.add_paragraph()
 
+        # Candidate drafts
+        self._add_candidate_scores(state)
+
+        # API usage
+        self._add_usage_breakdown(state)
+
         # Errors
         if state.errors:
             self.doc.add_heading('Processing Errors', level=3)
@@ -283,24 +317,88 @@ class AffidavitDocxBuilder:
         else:
             self.doc.add_paragraph("No errors occurred during processing.")
 
-    def _sanitize_case_name(self, case_name: str) -> str:
-        """
-        Sanitize case name for use as directory name.
+    def _add_candidate_scores(self, state: PipelineState):
+        """Add the evaluation scores of concurrently written candidate drafts."""
+        if not state.draft_candidates:
+            return
 
-        Args:
-            case_name: Raw case name from user
+        self.doc.add_heading('Candidate Drafts', level=3)
+        self.doc.add_paragraph(
+            f"{len(state.draft_candidates)} drafts were written and evaluated concurrently; "
+            "the one with the fewest blocking issues was kept."
+        )
+        for entry in state.draft_candidates:
+            p = self.doc.add_paragraph(style='List Bullet')
+            label = f"Candidate {entry['candidate']}{' (kept)' if entry['selected'] else ''}: "
+            p.add_run(label).bold = True
+            if 'blocking_issues' not in entry:
+                p.add_run(f"failed - {entry.get('error', 'unknown error')}")
+                continue
+            p.add_run(
+                f"{entry['blocking_issues']} blocking issue(s) "
+                f"({entry['unsupported']} unsupported, {entry['uncertain']} uncertain, "
+                f"{entry['missing']} missing elements), "
+                f"{entry['grammar_warnings']} grammar warning(s), {entry['words']} words"
+                + ("; passed evaluation" if entry['passed'] else "")
+            )
+        self.doc.add_paragraph()
 
-        Returns:
-            Safe directory name
-        """
-        # Convert to lowercase, replace spaces with underscores
-        sanitized = case_name.lower().strip()
-        sanitized = re.sub(r'\s+', '_', sanitized)
-        # Remove any non-alphanumeric characters except underscore and hyphen
-        sanitized = re.sub(r'[^a-z0-9_-]', '', sanitized)
-        # Limit length
-        sanitized = sanitized[:50]
-        return sanitized or "case"
+    def _add_usage_breakdown(self, state: PipelineState):
+        """Add token, latency and cost totals per step and per iteration."""
+        self.doc.add_heading('API Usage', level=3)
+
+        if not state.llm_calls:
+            self.doc.add_paragraph("No API calls were recorded.")
+            self.doc.add_paragraph()
+            return
+
+        usage = summarize(state.llm_calls)
+        self.doc.add_paragraph(f"Total: {format_totals(usage['total'])}")
+
+        streamed = [c.ttft_seconds for c in state.llm_calls if c.ttft_seconds is not None]
+        if streamed:
+            self.doc.add_paragraph(
+                f"Time to first token (streamed calls): "
+                f"mean {sum(streamed) / len(streamed):.1f}s, max {max(streamed):.1f}s"
+            )
+
+        if state.prompt_tokens_saved:
+            self.doc.add_paragraph(
+                f"Input tokens saved by compact prompt data (estimated): {state.prompt_tokens_saved:,}"
+            )
+
+        truncated = sum(1 for c in state.llm_calls if c.stop_reason == "max_tokens")
+        if truncated:
+            self.doc.add_paragraph(f"Calls stopped at max_tokens: {truncated}")
+
+        self.doc.add_paragraph("By step:")
+        for step_name, totals in usage['by_step'].items():
+            p = self.doc.add_paragraph(style='List Bullet')
+            p.add_run(f"{step_name}: ").bold = True
+            p.add_run(format_totals(totals))
+
+        self.doc.add_paragraph("By iteration:")
+        for iteration, totals in usage['by_iteration'].items():
+            label = "Setup (extraction and first draft)" if iteration == 0 else f"Iteration {iteration}"
+            p = self.doc.add_paragraph(style='List Bullet')
+            p.add_run(f"{label}: ").bold = True
+            p.add_run(format_totals(totals))
+
+        self.doc.add_paragraph("By model:")
+        for model, totals in usage['by_model'].items():
+            p = self.doc.add_paragraph(style='List Bullet')
+            p.add_run(f"{model}: ").bold = True
+            p.add_run(format_totals(totals))
+
+        self.doc.add_paragraph("Calls:")
+        for number, call in enumerate(state.llm_calls, 1):
+            p = self.doc.add_paragraph(style='List Bullet')
+            p.add_run(f"{number}. {call.step} (iteration {call.iteration}): ").bold = True
+            detail = (f"{call.model}, {call.input_tokens:,} input / "
+                      f"{call.output_tokens:,} output tokens, {call.seconds:.1f}s")
+            p.add_run(detail + (", response cache" if call.response_cached else ""))
+
+        self.doc.add_paragraph()
 
     def _generate_output_path(self, base_path: str, case_name: str, suffix: str = "draft") -> str:
         """
@@ -316,7 +414,7 @@ class AffidavitDocxBuilder:
         """
         # Create case subdirectory
         base_dir = Path(base_path)
-        safe_case_name = self._sanitize_case_name(case_name)
+        safe_case_name = sanitize_case_name(case_name)
         case_dir = base_dir / safe_case_name
 
         # Create directory if it doesn't exist
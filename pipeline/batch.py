@@ -0,0 +1,281 @@
+"""
+Headless batch runner - processes a folder or manifest of interview notes.
+
+Cases run through the same extract/write/evaluate/revise pipeline as the
+GUI, several at a time on one event loop, and each case's Word documents
+are written through AffidavitDocxBuilder.
+"""
+import asyncio
+import csv
+import json
+import statistics
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Union
+import logging
+
+from pipeline.checkpoint import resume_state
+from pipeline.core import PipelineState, ErrorSeverity
+from pipeline.iterative import build_iterative_pipeline
+from pipeline.bulk import BulkClaudeClient
+from pipeline.llm_client import AsyncClaudeClient, PromptLoader
+from pipeline.usage import summarize
+from output.docx_builder import AffidavitDocxBuilder
+
+logger = logging.getLogger(__name__)
+
+# File types picked up when the input is a folder of notes
+NOTES_EXTENSIONS = (".txt", ".md")
+
+
+@dataclass
+class BatchCase:
+    """One case to process in a batch."""
+    case_name: str
+    notes_path: Path
+    case_specifics: str = ""
+
+
+@dataclass
+class BatchResult:
+    """Outcome of one case in a batch."""
+    case_name: str
+    success: bool
+    seconds: float
+    draft_path: Optional[str] = None
+    report_path: Optional[str] = None
+    error: Optional[str] = None
+    cost_usd: float = 0.0
+
+
+def load_cases(source: str) -> List[BatchCase]:
+    """
+    Load batch cases from a folder of notes files or a manifest.
+
+    A folder yields one case per .txt/.md file, named after the file. A
+    manifest is a .json list or a .csv file with notes_file, case_name and
+    optional case_specifics entries; relative notes paths are resolved
+    against the manifest's folder.
+
+    Args:
+        source: Path to a folder or manifest file
+
+    Returns:
+        Cases in a stable order
+
+    Raises:
+        FileNotFoundError: If the source doesn't exist
+        ValueError: If the manifest format is not supported or an entry is incomplete
+    """
+    path = Path(source)
+    if not path.exists():
+        raise FileNotFoundError(f"Batch source not found: {path}")
+
+    if path.is_dir():
+        return [
+            BatchCase(case_name=notes_path.stem, notes_path=notes_path)
+            for notes_path in sorted(path.iterdir())
+            if notes_path.suffix.lower() in NOTES_EXTENSIONS
+        ]
+
+    if path.suffix.lower() == ".json":
+        with open(path, 'r', encoding='utf-8') as f:
+            entries = json.load(f)
+    elif path.suffix.lower() == ".csv":
+        with open(path, 'r', encoding='utf-8', newline='') as f:
+            entries = list(csv.DictReader(f))
+    else:
+        raise ValueError(f"Unsupported manifest format: {path.suffix} (use .json or .csv)")
+
+    cases = []
+    for entry in entries:
+        notes_file = (entry.get("notes_file") or "").strip()
+        if not notes_file:
+            raise ValueError(f"Manifest entry missing notes_file: {entry}")
+
+        notes_path = Path(notes_file)
+        if not notes_path.is_absolute():
+            notes_path = path.parent / notes_path
+
+        cases.append(BatchCase(
+            case_name=(entry.get("case_name") or notes_path.stem).strip(),
+            notes_path=notes_path,
+            case_specifics=(entry.get("case_specifics") or "").strip()
+        ))
+
+    return cases
+
+
+class BatchRunner:
+    """
+    Runs many cases through the pipeline with a bounded number of workers.
+
+    All cases share the clients (AsyncClaudeClient, or BulkClaudeClient for
+    overnight runs); a semaphore caps how many are in flight at once so the
+    batch stays inside account rate limits.
+    """
+
+    def __init__(self, client: Union[AsyncClaudeClient, BulkClaudeClient],
+                 prompt_loader: PromptLoader,
+                 output_path: str, workers: int = 4, max_iterations: int = 3,
+                 checkpointing: bool = True, resume: bool = True, memoize: bool = True,
+                 step_clients: Optional[Dict[str, Union[AsyncClaudeClient, BulkClaudeClient]]] = None):
+        """
+        Initialize batch runner.
+
+        Args:
+            client: Async Claude client shared by all cases
+            prompt_loader: Prompt loader shared by all cases
+            output_path: Base output directory (one subdirectory per case)
+            workers: Maximum number of cases processed concurrently
+            max_iterations: Maximum write-evaluate-revise iterations per case
+            checkpointing: Save each case's state after every step
+            resume: Continue unfinished cases from their checkpoints
+            memoize: Reuse step outputs from earlier runs when their inputs are unchanged
+            step_clients: Per-step clients (see build_step_clients()); steps
+                without one use client
+        """
+        self.client = client
+        self.step_clients = step_clients
+        self.prompt_loader = prompt_loader
+        self.output_path = output_path
+        self.workers = max(1, workers)
+        self.max_iterations = max_iterations
+        self.checkpointing = checkpointing
+        self.resume = resume
+        self.memoize = memoize
+
+    def run(self, cases: List[BatchCase],
+            progress_callback: Optional[Callable[[str, int], None]] = None) -> List[BatchResult]:
+        """Process all cases synchronously. See run_async()."""
+        return asyncio.run(self.run_async(cases, progress_callback))
+
+    async def run_async(self, cases: List[BatchCase],
+                        progress_callback: Optional[Callable[[str, int], None]] = None) -> List[BatchResult]:
+        """
+        Process all cases.
+
+        Args:
+            cases: Cases to process
+            progress_callback: Optional callback(message, percent of cases finished)
+
+        Returns:
+            One result per case, in input order
+        """
+        semaphore = asyncio.Semaphore(self.workers)
+        finished = [0]
+
+        async def worker(case: BatchCase) -> BatchResult:
+            async with semaphore:
+                result = await self._run_case(case)
+
+            finished[0] += 1
+            if progress_callback:
+                status = "done" if result.success else "FAILED"
+                progress_callback(
+                    f"[{finished[0]}/{len(cases)}] {case.case_name}: {status}",
+                    int(finished[0] / len(cases) * 100)
+                )
+            return result
+
+        logger.info(f"Starting batch of {len(cases)} case(s) with {self.workers} worker(s)")
+        return await asyncio.gather(*(worker(case) for case in cases))
+
+    async def _run_case(self, case: BatchCase) -> BatchResult:
+        """Run one case end to end and write its documents."""
+        start = time.perf_counter()
+
+        try:
+            notes = case.notes_path.read_text(encoding='utf-8')
+
+            pipeline = build_iterative_pipeline(
+                self.client, self.prompt_loader, self.max_iterations,
+                checkpointing=self.checkpointing, memoize=self.memoize,
+                step_clients=self.step_clients
+            )
+            state = PipelineState(
+                raw_notes=notes,
+                output_path=self.output_path,
+                case_name=case.case_name,
+                case_specifics=case.case_specifics
+            )
+            if self.resume:
+                state = resume_state(state) or state
+
+            logger.info(f"[{case.case_name}] Starting pipeline")
+            final_state = await pipeline.run_async(state)
+
+            # python-docx is blocking; keep it off the event loop
+            builder = AffidavitDocxBuilder()
+            main_file, report_file = await asyncio.to_thread(builder.build, final_state)
+
+            error = None
+            if final_state.has_critical_error():
+                error = "; ".join(
+                    e.message for e in final_state.errors if e.severity == ErrorSeverity.CRITICAL
+                )
+
+            return BatchResult(
+                case_name=case.case_name,
+                success=error is None,
+                seconds=time.perf_counter() - start,
+                draft_path=main_file,
+                report_path=report_file,
+                error=error,
+                cost_usd=summarize(final_state.llm_calls)["total"].cost_usd
+            )
+
+        except Exception as e:
+            logger.error(f"[{case.case_name}] Batch case failed: {str(e)}", exc_info=True)
+            return BatchResult(
+                case_name=case.case_name,
+                success=False,
+                seconds=time.perf_counter() - start,
+                error=str(e)
+            )
+
+
+def format_summary(results: List[BatchResult], elapsed: float) -> str:
+    """
+    Build a throughput/latency summary for a finished batch.
+
+    Args:
+        results: Results returned by BatchRunner
+        elapsed: Wall-clock seconds for the whole batch
+
+    Returns:
+        Multi-line summary text
+    """
+    succeeded = [r for r in results if r.success]
+    failed = [r for r in results if not r.success]
+    latencies = sorted(r.seconds for r in results)
+
+    lines = [
+        "=" * 60,
+        "BATCH SUMMARY",
+        "=" * 60,
+        f"Cases: {len(results)} ({len(succeeded)} succeeded, {len(failed)} failed)",
+        f"Wall time: {elapsed:.1f}s",
+    ]
+
+    if results and elapsed > 0:
+        lines.append(f"Throughput: {len(results) / elapsed * 60:.2f} cases/min")
+
+    if latencies:
+        p90_index = min(len(latencies) - 1, int(round(0.9 * (len(latencies) - 1))))
+        lines.append(
+            f"Latency per case: mean {statistics.mean(latencies):.1f}s, "
+            f"median {statistics.median(latencies):.1f}s, "
+            f"p90 {latencies[p90_index]:.1f}s, max {latencies[-1]:.1f}s"
+        )
+
+    total_cost = sum(r.cost_usd for r in results)
+    if total_cost:
+        lines.append(f"Estimated API cost: ${total_cost:.2f} (${total_cost / len(results):.4f} per case)")
+
+    for r in failed:
+        lines.append(f"  FAILED {r.case_name}: {r.error}")
+
+    lines.append("=" * 60)
+    return "\n".join(lines)
@@ -0,0 +1,305 @@
+"""
+Overnight bulk mode - routes pipeline calls through the Message Batches API.
+
+BulkClaudeClient is a drop-in client for the async pipeline. Instead of
+calling the API directly, each agenerate() call is queued; queued calls
+from all cases are submitted together as one batch job, and each call's
+future resolves when its batch result arrives. Because every case is an
+ordinary IterativePipeline coroutine, a case moves on to its next stage
+(extraction -> writing -> evaluation -> revision) as soon as its result
+for the current stage comes back, and its next request joins the next
+batch.
+
+Batch pricing is roughly half of interactive pricing and is not subject to
+interactive rate limits, at the cost of latency (results can take hours).
+"""
+import asyncio
+import itertools
+import time
+from abc import ABC, abstractmethod
+from typing import Any, Callable, Dict, List, Optional, Union
+import logging
+
+from anthropic.types import Message, TextBlock, Usage
+
+from pipeline.client_pool import get_anthropic_client
+from pipeline.llm_client import _ClaudeClientBase
+from pipeline.response_cache import ResponseCache
+
+logger = logging.getLogger(__name__)
+
+
+class BatchBackend(ABC):
+    """Submits batches of Messages API requests and fetches their results."""
+
+    @abstractmethod
+    def submit(self, requests: List[Dict[str, Any]]) -> str:
+        """
+        Submit a batch.
+
+        Args:
+            requests: List of {"custom_id": str, "params": messages.create kwargs}
+
+        Returns:
+            Batch ID
+        """
+        pass
+
+    @abstractmethod
+    def is_done(self, batch_id: str) -> bool:
+        """Return True once every request in the batch has finished processing."""
+        pass
+
+    @abstractmethod
+    def results(self, batch_id: str) -> Dict[str, Union[Message, Exception]]:
+        """
+        Fetch results for a finished batch.
+
+        Returns:
+            Mapping of custom_id to the response Message, or to an exception
+            describing why that request failed
+        """
+        pass
+
+
+class AnthropicBatchBackend(BatchBackend):
+    """Batch backend using Anthropic's Message Batches API."""
+
+    def __init__(self, api_key: str):
+        self.client = get_anthropic_client(api_key)
+
+    def submit(self, requests: List[Dict[str, Any]]) -> str:
+        batch = self.client.messages.batches.create(requests=requests)
+        return batch.id
+
+    def is_done(self, batch_id: str) -> bool:
+        batch = self.client.messages.batches.retrieve(batch_id)
+        return batch.processing_status == "ended"
+
+    def results(self, batch_id: str) -> Dict[str, Union[Message, Exception]]:
+        results = {}
+        for entry in self.client.messages.batches.results(batch_id):
+            if entry.result.type == "succeeded":
+                results[entry.custom_id] = entry.result.message
+            elif entry.result.type == "errored":
+                results[entry.custom_id] = RuntimeError(f"Batch request errored: {entry.result.error}")
+            else:
+                results[entry.custom_id] = RuntimeError(f"Batch request {entry.result.type}")
+        return results
+
+
+class LocalBatchBackend(BatchBackend):
+    """
+    In-process stand-in for the Message Batches API.
+
+    Answers each request with a caller-supplied responder, after the batch
+    has been polled a configurable number of times. Lets the bulk state
+    machine run end to end offline.
+    """
+
+    def __init__(self, responder: Callable[[Dict[str, Any]], str], polls_until_done: int = 1):
+        """
+        Initialize local backend.
+
+        Args:
+            responder: Callable(params) returning the response text for one request
+            polls_until_done: Number of is_done() calls before a batch reports finished
+        """
+        self.responder = responder
+        self.polls_until_done = polls_until_done
+        self.batches: Dict[str, Dict[str, Any]] = {}
+        self._ids = itertools.count(1)
+
+    def submit(self, requests: List[Dict[str, Any]]) -> str:
+        batch_id = f"local_batch_{next(self._ids)}"
+        self.batches[batch_id] = {"requests": list(requests), "polls": 0}
+        return batch_id
+
+    def is_done(self, batch_id: str) -> bool:
+        batch = self.batches[batch_id]
+        batch["polls"] += 1
+        return batch["polls"] >= self.polls_until_done
+
+    def results(self, batch_id: str) -> Dict[str, Union[Message, Exception]]:
+        results = {}
+        for request in self.batches[batch_id]["requests"]:
+            params = request["params"]
+            try:
+                text = self.responder(params)
+            except Exception as e:
+                results[request["custom_id"]] = e
+                continue
+
+            results[request["custom_id"]] = Message(
+                id=f"msg_{request['custom_id']}",
+                type="message",
+                role="assistant",
+                model=params["model"],
+                content=[TextBlock(type="text", text=text)],
+                stop_reason="end_turn",
+                stop_sequence=None,
+                usage=Usage(input_tokens=0, output_tokens=max(1, len(text) // 4)),
+            )
+        return results
+
+
+class BulkClaudeClient(_ClaudeClientBase):
+    """
+    Client that collects calls into Message Batches instead of calling the API directly.
+
+    Only the async interface (agenerate) is supported; drive it with the
+    async pipeline, e.g. through BatchRunner.
+    """
+
+    # Message Batches are billed at half the interactive price
+    price_factor = 0.5
+
+    def __init__(self, backend: BatchBackend, model: str = "claude-sonnet-4-20250514",
+                 cache: Optional[ResponseCache] = None, gather_seconds: float = 2.0,
+                 poll_seconds: float = 60.0, max_batch_size: int = 10000,
+                 max_output_tokens: int = 32000, temperature: float = 0.0,
+                 max_request_tokens: Optional[int] = None):
+        """
+        Initialize bulk client.
+
+        Args:
+            backend: Batch backend to submit to
+            model: Claude model to use
+            cache: Optional on-disk response cache for deterministic calls
+            gather_seconds: Quiet period to wait for more calls before submitting a batch
+            poll_seconds: Delay between batch status checks
+            max_batch_size: Submit immediately once this many calls are queued
+            max_output_tokens: Cap on total output per call, including continuations
+            temperature: Sampling temperature for calls that don't pass one
+            max_request_tokens: Cap on max_tokens of each request (None for no cap)
+        """
+        super().__init__(api_key=None, model=model, cache=cache, streaming=False,
+                         max_output_tokens=max_output_tokens, temperature=temperature,
+                         max_request_tokens=max_request_tokens)
+        self.backend = backend
+        self.gather_seconds = gather_seconds
+        self.poll_seconds = poll_seconds
+        self.max_batch_size = max_batch_size
+
+        self._pending: List[Dict[str, Any]] = []
+        self._new_request: Optional[asyncio.Event] = None
+        self._submitter: Optional[asyncio.Task] = None
+        self._pollers: List[asyncio.Task] = []
+        self._ids = itertools.count(1)
+        logger.info(f"Initialized bulk Claude client with model: {model}")
+
+    async def agenerate(self, prompt, max_tokens: int = 4096,
+                        temperature: Optional[float] = None, system: Optional[str] = None,
+                        use_cache: bool = True,
+                        on_delta: Optional[Callable[[str, int], None]] = None,
+                        timeout: Optional[float] = None,
+                        tool: Optional[Dict[str, Any]] = None) -> str:
+        """
+        Queue a call for the next batch and wait for its result.
+
+        Arguments match ClaudeClient.generate(); on_delta fires once with the
+        complete text since batch results are not streamed, and timeout is
+        ignored because batches run asynchronously on the server.
+        """
+        max_tokens, temperature = self._call_params(max_tokens, temperature)
+        cache_key = self._cache_key(prompt, max_tokens, temperature, system, use_cache, tool)
+        cached = self._cache_get(cache_key)
+        if cached is not None:
+            return cached
+
+        kwargs = self._build_kwargs(prompt, max_tokens, temperature, system, tool)
+        text = ""
+        output_tokens = 0
+        while kwargs:
+            started = time.perf_counter()
+            response = await self._queue(kwargs)
+
+            # A continuation of a truncated response joins the next batch
+            text += self._response_text(response)
+            output_tokens += response.usage.output_tokens
+            kwargs = self._continuation_kwargs(kwargs, response, text.rstrip(), output_tokens)
+            if kwargs:
+                text = text.rstrip()
+            self._finish(response, text, None if kwargs else cache_key, started)
+
+        self._raise_if_truncated(response, text, output_tokens)
+        if on_delta:
+            on_delta(text, output_tokens)
+        return text
+
+    async def _queue(self, params: Dict[str, Any]) -> Message:
+        """Queue one request for the next batch and wait for its response."""
+        future = asyncio.get_running_loop().create_future()
+        self._pending.append({
+            "custom_id": f"req-{next(self._ids)}",
+            "params": params,
+            "future": future,
+        })
+        self._ensure_submitter()
+        return await future
+
+    def _ensure_submitter(self) -> None:
+        """Start the background submitter task if it isn't running, and wake it."""
+        if self._new_request is None:
+            self._new_request = asyncio.Event()
+        self._new_request.set()
+
+        if self._submitter is None or self._submitter.done():
+            self._submitter = asyncio.get_running_loop().create_task(self._submit_loop())
+
+    async def _submit_loop(self) -> None:
+        """Submit queued calls as a batch once no new calls arrive for gather_seconds."""
+        while self._pending:
+            # Wait for the queue to go quiet (or fill up) so stragglers join this batch
+            while len(self._pending) < self.max_batch_size:
+                self._new_request.clear()
+                try:
+                    await asyncio.wait_for(self._new_request.wait(), self.gather_seconds)
+                except asyncio.TimeoutError:
+                    break
+
+            requests = self._pending[:self.max_batch_size]
+            self._pending = self._pending[self.max_batch_size:]
+
+            try:
+                batch_id = await asyncio.to_thread(
+                    self.backend.submit,
+                    [{"custom_id": r["custom_id"], "params": r["params"]} for r in requests]
+                )
+            except Exception as e:
+                logger.error(f"Batch submission failed: {str(e)}")
+                for r in requests:
+                    if not r["future"].done():
+                        r["future"].set_exception(e)
+                continue
+
+            logger.info(f"Submitted batch {batch_id} with {len(requests)} request(s)")
+            self._pollers.append(asyncio.get_running_loop().create_task(
+                self._poll_batch(batch_id, requests)
+            ))
+
+    async def _poll_batch(self, batch_id: str, requests: List[Dict[str, Any]]) -> None:
+        """Wait for a batch to finish and resolve each call's future."""
+        try:
+            while not await asyncio.to_thread(self.backend.is_done, batch_id):
+                await asyncio.sleep(self.poll_seconds)
+
+            results = await asyncio.to_thread(self.backend.results, batch_id)
+            logger.info(f"Batch {batch_id} finished ({len(results)} result(s))")
+
+            for r in requests:
+                if r["future"].done():
+                    continue
+                result = results.get(r["custom_id"])
+                if result is None:
+                    r["future"].set_exception(RuntimeError(f"No result for {r['custom_id']} in {batch_id}"))
+                elif isinstance(result, Exception):
+                    r["future"].set_exception(result)
+                else:
+                    r["future"].set_result(result)
+
+        except Exception as e:
+            logger.error(f"Polling batch {batch_id} failed: {str(e)}")
+            for r in requests:
+                if not r["future"].done():
+                    r["future"].set_exception(e)
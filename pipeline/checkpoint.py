@@ -0,0 +1,122 @@
+"""
+Per-case checkpoints so an interrupted run can resume without repeating paid calls.
+
+The iterative pipeline saves the whole PipelineState to
+<output>/<case>/checkpoint.json after every step that completes cleanly.
+State.completed_steps records which steps (extraction, writing,
+evaluation_N, revision_N) are already reflected in the saved state, and a
+resumed run skips them.
+"""
+import json
+import os
+import tempfile
+from pathlib import Path
+from typing import Any, Dict, Optional
+import logging
+
+from pipeline.core import PipelineState, sanitize_case_name
+
+logger = logging.getLogger(__name__)
+
+CHECKPOINT_FILENAME = "checkpoint.json"
+
+# Bump when the saved layout changes incompatibly; older checkpoints are ignored
+CHECKPOINT_VERSION = 1
+
+
+def checkpoint_path(output_path: str, case_name: str) -> Path:
+    """Return the checkpoint file for a case (next to its Word documents)."""
+    return Path(output_path) / sanitize_case_name(case_name) / CHECKPOINT_FILENAME
+
+
+def save_checkpoint(state: PipelineState, complete: bool = False) -> None:
+    """
+    Write the state to the case's checkpoint file.
+
+    The write is atomic, so a crash mid-save leaves the previous checkpoint
+    intact. Failures are logged rather than raised; losing a checkpoint
+    shouldn't fail the run.
+
+    Args:
+        state: Current pipeline state
+        complete: True once the run has finished; complete checkpoints are not resumed
+    """
+    path = checkpoint_path(state.output_path, state.case_name)
+    data = {
+        "version": CHECKPOINT_VERSION,
+        "complete": complete,
+        "state": state.to_dict(),
+    }
+
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+        try:
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                json.dump(data, f, ensure_ascii=False, indent=2)
+            os.replace(tmp_path, path)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+    except (OSError, TypeError, ValueError) as e:
+        logger.warning(f"Failed to save checkpoint {path}: {str(e)}")
+        return
+
+    logger.debug(f"Checkpoint saved: {path} ({', '.join(state.completed_steps) or 'no steps'})")
+
+
+def load_checkpoint(output_path: str, case_name: str) -> Optional[Dict[str, Any]]:
+    """
+    Read a case's checkpoint file.
+
+    Returns:
+        Dict with "complete" (bool) and "state" (PipelineState), or None if
+        there is no usable checkpoint
+    """
+    path = checkpoint_path(output_path, case_name)
+    if not path.exists():
+        return None
+
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        if data.get("version") != CHECKPOINT_VERSION:
+            logger.info(f"Ignoring checkpoint with unsupported version: {path}")
+            return None
+        return {"complete": data["complete"], "state": PipelineState.from_dict(data["state"])}
+    except (OSError, ValueError, KeyError, TypeError) as e:
+        logger.warning(f"Ignoring unreadable checkpoint {path}: {str(e)}")
+        return None
+
+
+def resume_state(initial_state: PipelineState) -> Optional[PipelineState]:
+    """
+    Return the saved state to resume from, if the case has an unfinished run.
+
+    A checkpoint is only used if the run didn't finish and its notes and
+    case specifics match the new run's inputs; otherwise the run starts
+    fresh.
+
+    Args:
+        initial_state: Fresh state for the new run
+
+    Returns:
+        State to continue from, or None to start from the beginning
+    """
+    checkpoint = load_checkpoint(initial_state.output_path, initial_state.case_name)
+    if checkpoint is None:
+        return None
+
+    saved = checkpoint["state"]
+    if checkpoint["complete"]:
+        logger.info("Previous run for this case finished; starting fresh")
+        return None
+    if saved.raw_notes != initial_state.raw_notes or saved.case_specifics != initial_state.case_specifics:
+        logger.info("Inputs changed since the checkpoint was saved; starting fresh")
+        return None
+    if not saved.completed_steps:
+        return None
+
+    saved.output_path = initial_state.output_path
+    logger.info(f"Resuming from checkpoint after: {', '.join(saved.completed_steps)}")
+    return saved
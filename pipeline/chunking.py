@@ -0,0 +1,178 @@
+"""
+Splitting long interview notes for chunked extraction, and merging the results.
+
+Notes are split on interview-session boundaries where possible and on
+paragraph boundaries otherwise; chunks split mid-session repeat the last
+paragraphs of the previous chunk so nothing loses its context. Component
+dicts extracted from the chunks are merged deterministically, in chunk
+order, so the same notes always produce the same components.
+"""
+import re
+from typing import Any, Dict, List, Tuple
+
+from pipeline.models import MISSING, is_missing
+
+# A line starting a new interview session ("Session 2", "## Interview 3 - 5/4",
+# "Day 2:", "Meeting with client ...") or a separator line ("---", "===", "***")
+SESSION_START = re.compile(
+    r'^[ \t]*(?:#{1,6}[ \t]*)?(?:session|interview|meeting|day)\b.*$'
+    r'|^[ \t]*(?:-{3,}|={3,}|\*{3,})[ \t]*$',
+    re.IGNORECASE
+)
+
+PARAGRAPH_BREAK = re.compile(r'\n[ \t]*\n')
+SENTENCE_END = re.compile(r'(?<=[.!?])\s+')
+
+
+def split_notes(notes: str, max_chars: int, overlap_chars: int = 0) -> List[str]:
+    """
+    Split notes into chunks of at most about max_chars characters.
+
+    Args:
+        notes: Raw interview notes
+        max_chars: Target maximum chunk size (overlap comes on top)
+        overlap_chars: Trailing paragraphs of the previous chunk, up to this
+            many characters, are repeated at the start of a chunk that begins
+            mid-session
+
+    Returns:
+        Chunks in note order; a single chunk if the notes already fit
+    """
+    if len(notes) <= max_chars:
+        return [notes]
+
+    chunks: List[str] = []
+    current: List[str] = []
+    size = 0
+
+    for paragraph, starts_session in _paragraphs(notes, max_chars):
+        # Prefer breaking at a session boundary once the chunk is reasonably full
+        at_boundary = starts_session and size >= max_chars // 2
+        if current and (size + len(paragraph) > max_chars or at_boundary):
+            chunks.append("\n\n".join(current))
+            current = [] if starts_session else _overlap(current, overlap_chars)
+            size = sum(len(p) for p in current)
+
+        current.append(paragraph)
+        size += len(paragraph)
+
+    if current:
+        chunks.append("\n\n".join(current))
+
+    return chunks
+
+
+def _paragraphs(notes: str, max_chars: int) -> List[Tuple[str, bool]]:
+    """
+    Break notes into (paragraph, starts_session) units no longer than max_chars.
+
+    Session header lines always start a new paragraph. Paragraphs that are
+    too long are split at sentence ends, or hard-split as a last resort.
+    """
+    units: List[Tuple[str, bool]] = []
+    block: List[str] = []
+    block_starts_session = False
+
+    def flush():
+        text = "\n".join(block)
+        for i, paragraph in enumerate(p.strip() for p in PARAGRAPH_BREAK.split(text)):
+            if paragraph:
+                for j, piece in enumerate(_fit(paragraph, max_chars)):
+                    units.append((piece, block_starts_session and i == 0 and j == 0))
+
+    for line in notes.splitlines():
+        if SESSION_START.match(line):
+            flush()
+            block = []
+            block_starts_session = True
+        block.append(line)
+    flush()
+
+    return units
+
+
+def _fit(paragraph: str, max_chars: int) -> List[str]:
+    """Split one paragraph into pieces of at most max_chars."""
+    if len(paragraph) <= max_chars:
+        return [paragraph]
+
+    pieces: List[str] = []
+    current = ""
+    for sentence in SENTENCE_END.split(paragraph):
+        while len(sentence) > max_chars:
+            if current:
+                pieces.append(current)
+                current = ""
+            pieces.append(sentence[:max_chars])
+            sentence = sentence[max_chars:]
+        if current and len(current) + 1 + len(sentence) > max_chars:
+            pieces.append(current)
+            current = sentence
+        else:
+            current = f"{current} {sentence}" if current else sentence
+    if current:
+        pieces.append(current)
+    return pieces
+
+
+def _overlap(paragraphs: List[str], overlap_chars: int) -> List[str]:
+    """Return the trailing paragraphs that fit within overlap_chars."""
+    tail: List[str] = []
+    size = 0
+    for paragraph in reversed(paragraphs):
+        if size + len(paragraph) > overlap_chars:
+            break
+        tail.insert(0, paragraph)
+        size += len(paragraph)
+    return tail
+
+
+def merge_components(parts: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    Merge component dicts extracted from consecutive chunks.
+
+    List components (tasks) are combined with duplicates removed, keeping
+    first-seen order. Text components (abuse and coercion evidence, the
+    trafficker's identity) are concatenated in chunk order, skipping
+    paragraphs already seen - chunk overlap otherwise repeats them. A
+    component missing from every chunk stays "MISSING".
+
+    Args:
+        parts: Extracted components per chunk, in chunk order
+
+    Returns:
+        Merged components
+    """
+    keys: List[str] = []
+    for part in parts:
+        keys.extend(key for key in part if key not in keys)
+
+    merged: Dict[str, Any] = {}
+    for key in keys:
+        values = [part.get(key) for part in parts if not is_missing(part.get(key))]
+        if not values:
+            merged[key] = MISSING
+        elif any(isinstance(value, list) for value in values):
+            items = [item for value in values
+                     for item in (value if isinstance(value, list) else [value])]
+            merged[key] = _dedupe(items)
+        else:
+            paragraphs = [p.strip() for value in values
+                          for p in PARAGRAPH_BREAK.split(str(value)) if p.strip()]
+            merged[key] = "\n\n".join(_dedupe(paragraphs))
+
+    return merged
+
+
+def _dedupe(items: List[Any]) -> List[Any]:
+    """Drop repeated items (ignoring case, whitespace and trailing punctuation), keeping order."""
+    seen = set()
+    result = []
+    for item in items:
+        if is_missing(item):
+            continue
+        key = re.sub(r'\s+', ' ', str(item)).strip().rstrip('.;,').casefold()
+        if key not in seen:
+            seen.add(key)
+            result.append(item)
+    return result
@@ -0,0 +1,262 @@
+"""
+Process-wide, pooled Anthropic SDK clients.
+
+Every ClaudeClient used to build its own Anthropic client, and with it a
+fresh HTTP connection pool, so each run paid new TCP/TLS handshakes.
+These factories hand out one shared client per API key (per event loop for
+the async client) on a keep-alive connection pool, and count pool usage so
+the pool can be sized from real numbers.
+
+httpx doesn't expose its connection pool, so connection counts come from
+a private attribute; if a future httpx release changes it, those counts
+are reported as unavailable instead of breaking API calls.
+"""
+import asyncio
+import threading
+import weakref
+from typing import Dict, List, Optional, Union
+import logging
+
+import httpx
+from anthropic import Anthropic, AsyncAnthropic
+
+logger = logging.getLogger(__name__)
+
+
+class PoolStats:
+    """Thread-safe counters describing HTTP connection pool usage."""
+
+    def __init__(self):
+        self.requests = 0
+        self.in_flight = 0
+        self.peak_in_flight = 0
+        self.connections_opened = 0
+        self._seen = weakref.WeakSet()
+        self._lock = threading.Lock()
+
+    def request_started(self) -> None:
+        with self._lock:
+            self.requests += 1
+            self.in_flight += 1
+            self.peak_in_flight = max(self.peak_in_flight, self.in_flight)
+
+    def request_finished(self) -> None:
+        with self._lock:
+            self.in_flight -= 1
+
+    def observe_connections(self, connections) -> None:
+        """Count connections in the pool that haven't been seen before."""
+        with self._lock:
+            for connection in connections:
+                if connection not in self._seen:
+                    self._seen.add(connection)
+                    self.connections_opened += 1
+
+
+def _pool_connections(transport: httpx.BaseTransport) -> Optional[List]:
+    """Return the connections in a transport's pool, or None if httpx no longer exposes them."""
+    try:
+        return list(transport._pool.connections)
+    except (AttributeError, TypeError):
+        return None
+
+
+class _ReleasingStream:
+    """Wraps a response body stream to report when the request is finished."""
+
+    def __init__(self, stream, on_close):
+        self._stream = stream
+        self._on_close = on_close
+        self._closed = False
+
+    def _release(self):
+        if not self._closed:
+            self._closed = True
+            self._on_close()
+
+
+class _SyncReleasingStream(_ReleasingStream, httpx.SyncByteStream):
+    def __iter__(self):
+        yield from self._stream
+
+    def close(self):
+        try:
+            self._stream.close()
+        finally:
+            self._release()
+
+
+class _AsyncReleasingStream(_ReleasingStream, httpx.AsyncByteStream):
+    async def __aiter__(self):
+        async for chunk in self._stream:
+            yield chunk
+
+    async def aclose(self):
+        try:
+            await self._stream.aclose()
+        finally:
+            self._release()
+
+
+class _PooledTransport(httpx.HTTPTransport):
+    """HTTP transport that records pool statistics."""
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.stats = PoolStats()
+
+    def open_connections(self) -> Optional[int]:
+        connections = _pool_connections(self)
+        return None if connections is None else len(connections)
+
+    def handle_request(self, request: httpx.Request) -> httpx.Response:
+        self.stats.request_started()
+        try:
+            response = super().handle_request(request)
+        except Exception:
+            self.stats.request_finished()
+            raise
+
+        connections = _pool_connections(self)
+        if connections is not None:
+            self.stats.observe_connections(connections)
+        return httpx.Response(
+            status_code=response.status_code,
+            headers=response.headers,
+            stream=_SyncReleasingStream(response.stream, self.stats.request_finished),
+            extensions=response.extensions,
+        )
+
+
+class _AsyncPooledTransport(httpx.AsyncHTTPTransport):
+    """Async HTTP transport that records pool statistics."""
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.stats = PoolStats()
+
+    def open_connections(self) -> Optional[int]:
+        connections = _pool_connections(self)
+        return None if connections is None else len(connections)
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        self.stats.request_started()
+        try:
+            response = await super().handle_async_request(request)
+        except Exception:
+            self.stats.request_finished()
+            raise
+
+        connections = _pool_connections(self)
+        if connections is not None:
+            self.stats.observe_connections(connections)
+        return httpx.Response(
+            status_code=response.status_code,
+            headers=response.headers,
+            stream=_AsyncReleasingStream(response.stream, self.stats.request_finished),
+            extensions=response.extensions,
+        )
+
+
+_lock = threading.Lock()
+_sync_clients: Dict[str, Anthropic] = {}
+_sync_transports = []
+# Async connections belong to the event loop that opened them
+_async_clients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Dict[str, AsyncAnthropic]]" = \
+    weakref.WeakKeyDictionary()
+_async_transports: "weakref.WeakSet[_AsyncPooledTransport]" = weakref.WeakSet()
+
+
+def _limits() -> httpx.Limits:
+    from config import settings
+    return httpx.Limits(
+        max_connections=settings.HTTP_MAX_CONNECTIONS,
+        max_keepalive_connections=settings.HTTP_MAX_KEEPALIVE_CONNECTIONS,
+        keepalive_expiry=settings.HTTP_KEEPALIVE_EXPIRY,
+    )
+
+
+def _timeout() -> httpx.Timeout:
+    from config import settings
+    return httpx.Timeout(settings.API_TIMEOUT_SECONDS, connect=settings.API_CONNECT_TIMEOUT_SECONDS)
+
+
+def get_anthropic_client(api_key: str) -> Anthropic:
+    """
+    Return the shared Anthropic client for an API key.
+
+    The client is safe to use from many pipeline threads at once.
+    """
+    with _lock:
+        client = _sync_clients.get(api_key)
+        if client is None:
+            transport = _PooledTransport(limits=_limits())
+            _sync_transports.append(transport)
+            client = Anthropic(
+                api_key=api_key,
+                http_client=httpx.Client(transport=transport, timeout=_timeout()),
+                timeout=_timeout(),
+                max_retries=0,  # Retries are scheduled by the rate limiter
+            )
+            _sync_clients[api_key] = client
+            logger.info("Created shared Anthropic HTTP client")
+        return client
+
+
+def get_async_anthropic_client(api_key: str) -> AsyncAnthropic:
+    """
+    Return the shared AsyncAnthropic client for an API key on the running event loop.
+
+    Must be called from inside a running event loop.
+    """
+    loop = asyncio.get_running_loop()
+    with _lock:
+        clients = _async_clients.setdefault(loop, {})
+        client = clients.get(api_key)
+        if client is None:
+            transport = _AsyncPooledTransport(limits=_limits())
+            _async_transports.add(transport)
+            client = AsyncAnthropic(
+                api_key=api_key,
+                http_client=httpx.AsyncClient(transport=transport, timeout=_timeout()),
+                timeout=_timeout(),
+                max_retries=0,  # Retries are scheduled by the rate limiter
+            )
+            clients[api_key] = client
+            logger.info("Created shared async Anthropic HTTP client")
+        return client
+
+
+def pool_stats() -> Dict[str, Union[int, str]]:
+    """
+    Report connection pool usage across all shared clients.
+
+    Returns:
+        Dict with requests sent, connections opened/open/reused, requests in
+        flight, peak concurrency and how many requests are waiting for a
+        free connection. Connection counts are "unavailable" if the
+        installed httpx doesn't expose its pool.
+    """
+    from config import settings
+
+    with _lock:
+        transports = list(_sync_transports) + list(_async_transports)
+
+    requests = sum(t.stats.requests for t in transports)
+    stats: Dict[str, Union[int, str]] = {"requests": requests}
+
+    open_counts = [t.open_connections() for t in transports]
+    if any(count is None for count in open_counts):
+        stats.update(connections_opened="unavailable", connections_open="unavailable",
+                     connections_reused="unavailable")
+    else:
+        opened = sum(t.stats.connections_opened for t in transports)
+        stats.update(connections_opened=opened, connections_open=sum(open_counts),
+                     connections_reused=max(0, requests - opened))
+
+    stats.update(
+        in_flight=sum(t.stats.in_flight for t in transports),
+        peak_in_flight=max((t.stats.peak_in_flight for t in transports), default=0),
+        waiting=sum(max(0, t.stats.in_flight - settings.HTTP_MAX_CONNECTIONS) for t in transports),
+    )
+    return stats
@@ -0,0 +1,114 @@
+"""
+Convergence checks for the write-evaluate-revise loop.
+
+Revising stops paying off when a revision barely changes the draft or the
+evaluator keeps flagging the same statements. These helpers measure both,
+and size the iteration budget to the number of issues the first
+evaluation found.
+
+Revisions usually rewrite only the paragraphs with flagged statements
+(see ReviserStep), so how much a revision changed is measured over the
+paragraphs it touched, not the whole draft.
+"""
+import difflib
+import math
+import re
+from typing import List, Optional, Set
+
+from pipeline.models import BLOCKING_CATEGORIES, EvaluationReport
+
+
+def change_ratio(before: str, after: str) -> float:
+    """
+    Return how much of the draft a revision changed, from 0.0 (identical) to 1.0.
+
+    Compared word by word, so whitespace-only edits don't count.
+    """
+    matcher = difflib.SequenceMatcher(None, before.split(), after.split(), autojunk=False)
+    return 1.0 - matcher.ratio()
+
+
+def _paragraphs(text: str) -> List[str]:
+    return [" ".join(p.split()) for p in re.split(r"\n[ \t]*\n", text) if p.strip()]
+
+
+def revised_change_ratio(before: str, after: str) -> float:
+    """
+    Return how much a revision changed the paragraphs it touched, from 0.0 to 1.0.
+
+    Paragraphs that came through unchanged (ignoring whitespace) are left
+    out, so rewriting one paragraph of a long draft counts by how much of
+    that paragraph changed. A revision that changed nothing returns 0.0.
+    """
+    old, new = _paragraphs(before), _paragraphs(after)
+    matcher = difflib.SequenceMatcher(None, old, new, autojunk=False)
+    changed_before: List[str] = []
+    changed_after: List[str] = []
+    for tag, i1, i2, j1, j2 in matcher.get_opcodes():
+        if tag != "equal":
+            changed_before.extend(old[i1:i2])
+            changed_after.extend(new[j1:j2])
+    if not changed_before and not changed_after:
+        return 0.0
+    return change_ratio("\n\n".join(changed_before), "\n\n".join(changed_after))
+
+
+def flagged_statements(report: Optional[EvaluationReport]) -> Set[str]:
+    """Return the blocking findings of an evaluation, normalized for comparison."""
+    if not report:
+        return set()
+    return {
+        " ".join(item.split()).casefold()
+        for category in BLOCKING_CATEGORIES
+        for item in report.findings(category)
+    }
+
+
+def flagged_overlap(previous: Optional[EvaluationReport], current: Optional[EvaluationReport]) -> float:
+    """Return the Jaccard overlap of two evaluations' blocking findings (0.0 if either has none)."""
+    a, b = flagged_statements(previous), flagged_statements(current)
+    if not a or not b:
+        return 0.0
+    return len(a & b) / len(a | b)
+
+
+def iteration_budget(report: Optional[EvaluationReport], max_iterations: int) -> int:
+    """
+    Return how many evaluations to allow, given the first evaluation's findings.
+
+    One revision is allowed per ISSUES_PER_ITERATION blocking issues (at
+    least one), never exceeding max_iterations evaluations in total.
+    """
+    from config import settings
+
+    issues = len(flagged_statements(report))
+    revisions = max(1, math.ceil(issues / settings.ISSUES_PER_ITERATION))
+    return min(max_iterations, 1 + revisions)
+
+
+def stall_reason(previous_report: Optional[EvaluationReport], current_report: Optional[EvaluationReport],
+                 draft_before: Optional[str], draft_after: Optional[str]) -> Optional[str]:
+    """
+    Decide whether the last revision made enough progress to keep going.
+
+    Args:
+        previous_report: Evaluation before the last revision
+        current_report: Evaluation after it
+        draft_before: Draft the last revision started from
+        draft_after: Draft it produced
+
+    Returns:
+        Reason to stop, or None to continue
+    """
+    from config import settings
+
+    if draft_before is not None and draft_after is not None:
+        ratio = revised_change_ratio(draft_before, draft_after)
+        if ratio < settings.CONVERGENCE_MIN_CHANGE:
+            return f"Stalled: the last revision changed only {ratio:.1%} of the paragraphs it rewrote"
+
+    overlap = flagged_overlap(previous_report, current_report)
+    if overlap >= settings.CONVERGENCE_MAX_OVERLAP:
+        return f"Stalled: {overlap:.0%} of the flagged statements were flagged again after revision"
+
+    return None
@@ -1,14 +1,23 @@
 """
 Core pipeline framework for affidavit generation.
 
-Simple, linear pipeline with state object flowing through each step.
+Pipeline with state object flowing through each step. Steps declare the
+state fields they read and write, and Pipeline runs steps that don't
+conflict concurrently. Steps are implemented as coroutines; the synchronous run()/execute() entry
+points are thin wrappers that drive them on a private event loop.
 """
+import asyncio
+import json
+import re
 from abc import ABC, abstractmethod
-from dataclasses import dataclass, field
-from typing import List, Dict, Callable, Optional, Any
+from dataclasses import asdict, dataclass, field, fields
+from typing import List, Dict, Callable, Optional, Any, Set, Tuple
 from enum import Enum
 import logging
 
+from pipeline.models import Components, EvaluationReport, MODEL_FIELDS, to_data
+from pipeline.usage import CallRecord, usage_scope
+
 logger = logging.getLogger(__name__)
 
 
@@ -29,6 +38,64 @@ class PipelineError:
     exception: Optional[Exception] = None
 
 
+# PipelineState fields rendered into prompts, and keys of them that are only for the report
+PROMPT_DATA_FIELDS = ("extracted_components", "evaluation_report")
+REPORT_ONLY_KEYS = ("grounding",)
+
+
+def render_prompt_data(value: Any, style: str = "lean") -> str:
+    """
+    Render components or an evaluation for a prompt.
+
+    Args:
+        value: JSON-compatible data
+        style: "lean" (YAML-like lines, no quotes or braces), "compact"
+            (JSON without whitespace) or "json" (JSON indented by 2)
+
+    Returns:
+        Rendered text
+    """
+    if style == "json":
+        return json.dumps(value, indent=2, ensure_ascii=False)
+    if style == "compact":
+        return json.dumps(value, separators=(",", ":"), ensure_ascii=False)
+    return "\n".join(_lean_lines(value, 0))
+
+
+def _lean_lines(value: Any, indent: int) -> List[str]:
+    pad = "  " * indent
+    if isinstance(value, dict):
+        lines = []
+        for key, item in value.items():
+            if isinstance(item, (dict, list)) and item:
+                lines.append(f"{pad}{key}:")
+                lines.extend(_lean_lines(item, indent + 1))
+            else:
+                lines.append(f"{pad}{key}: {_lean_scalar(item, pad + '  ')}")
+        return lines
+    if isinstance(value, list):
+        lines = []
+        for item in value:
+            if isinstance(item, (dict, list)) and item:
+                nested = _lean_lines(item, indent + 1)
+                lines.append(f"{pad}- {nested[0].lstrip()}")
+                lines.extend(nested[1:])
+            else:
+                lines.append(f"{pad}- {_lean_scalar(item, pad + '  ')}")
+        return lines
+    return [f"{pad}{_lean_scalar(value, pad)}"]
+
+
+def _lean_scalar(value: Any, pad: str) -> str:
+    if value is None:
+        return "null"
+    if isinstance(value, (dict, list)):
+        return "[]" if isinstance(value, list) else "{}"
+    # Continuation lines of multi-line text are indented under their key
+    first, *rest = str(value).split("\n")
+    return "\n".join([first] + [pad + line if line.strip() else "" for line in rest])
+
+
 @dataclass
 class PipelineState:
     """
@@ -42,15 +109,60 @@ class PipelineState:
     case_specifics: str = ""
 
     # Intermediate artifacts (populated as pipeline progresses)
-    extracted_components: Optional[Dict[str, Any]] = None
+    extracted_components: Optional[Components] = None
     draft_text: Optional[str] = None
-    evaluation_report: Optional[Dict[str, Any]] = None
+    evaluation_report: Optional[EvaluationReport] = None
     final_text: Optional[str] = None
 
     # Metadata
     iteration_count: int = 0
+    stop_reason: Optional[str] = None  # Why the write-evaluate-revise loop ended
+    draft_candidates: List[Dict[str, Any]] = field(default_factory=list)  # Scores of concurrently written drafts
+    prompt_tokens_saved: int = 0  # Estimated input tokens saved by prompt_data() over indented JSON
     errors: List[PipelineError] = field(default_factory=list)
     step_outputs: Dict[str, Any] = field(default_factory=dict)  # For debugging
+    llm_calls: List[CallRecord] = field(default_factory=list)  # One record per API call
+    completed_steps: List[str] = field(default_factory=list)  # Checkpoint keys, in run order
+
+    def __setattr__(self, name: str, value: Any):
+        # Raw data (checkpoints, memos) is validated into the field's model
+        if name in MODEL_FIELDS and isinstance(value, dict):
+            value = MODEL_FIELDS[name].from_dict(value)
+        # Reassigning a prompt data field drops its cached rendering
+        if name in PROMPT_DATA_FIELDS:
+            self.__dict__.get('_prompt_data_cache', {}).pop(name, None)
+        super().__setattr__(name, value)
+
+    def prompt_data(self, name: str) -> str:
+        """
+        Render extracted_components or evaluation_report for a prompt.
+
+        The rendering (settings.PROMPT_DATA_FORMAT) is cached until the field
+        is reassigned, so steps and iterations share it. Fields must be
+        replaced rather than mutated in place for the cache to notice. Each
+        use adds the estimated tokens saved over indented JSON to
+        prompt_tokens_saved.
+
+        Args:
+            name: One of PROMPT_DATA_FIELDS
+
+        Returns:
+            Rendered text; report-only keys of the evaluation are left out
+        """
+        cache = self.__dict__.setdefault('_prompt_data_cache', {})
+        if name not in cache:
+            from config import settings
+
+            value = to_data(getattr(self, name))
+            if isinstance(value, dict):
+                value = {k: v for k, v in value.items() if k not in REPORT_ONLY_KEYS}
+            text = render_prompt_data(value, settings.PROMPT_DATA_FORMAT)
+            baseline = json.dumps(value, indent=2)
+            cache[name] = (text, max(0, len(baseline) - len(text)) // 4)
+
+        text, tokens_saved = cache[name]
+        self.prompt_tokens_saved += tokens_saved
+        return text
 
     def add_error(self, step_name: str, severity: ErrorSeverity,
                   message: str, exception: Optional[Exception] = None):
@@ -67,6 +179,32 @@ class PipelineState:
         """Check if any critical errors occurred."""
         return any(e.severity == ErrorSeverity.CRITICAL for e in self.errors)
 
+    def to_dict(self) -> Dict[str, Any]:
+        """
+        Serialize the state to JSON-compatible data (see from_dict()).
+
+        Exceptions attached to errors are not kept; their message is.
+        """
+        data = {f.name: to_data(getattr(self, f.name)) for f in fields(self)}
+        data["errors"] = [
+            {"step_name": e.step_name, "severity": e.severity.value, "message": e.message}
+            for e in self.errors
+        ]
+        data["llm_calls"] = [asdict(call) for call in self.llm_calls]
+        return data
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "PipelineState":
+        """Rebuild a state serialized with to_dict(). Unknown keys are ignored."""
+        known = {f.name for f in fields(cls)}
+        values = {key: value for key, value in data.items() if key in known}
+        values["errors"] = [
+            PipelineError(e["step_name"], ErrorSeverity(e["severity"]), e["message"])
+            for e in data.get("errors", [])
+        ]
+        values["llm_calls"] = [CallRecord(**call) for call in data.get("llm_calls", [])]
+        return cls(**values)
+
     @staticmethod
     def _severity_to_log_level(severity: ErrorSeverity) -> int:
         """Map severity to logging level."""
@@ -79,12 +217,93 @@ class PipelineState:
         return mapping[severity]
 
 
+def sanitize_case_name(case_name: str) -> str:
+    """
+    Sanitize case name for use as directory name.
+
+    Args:
+        case_name: Raw case name from user
+
+    Returns:
+        Safe directory name
+    """
+    # Convert to lowercase, replace spaces with underscores
+    sanitized = case_name.lower().strip()
+    sanitized = re.sub(r'\s+', '_', sanitized)
+    # Remove any non-alphanumeric characters except underscore and hyphen
+    sanitized = re.sub(r'[^a-z0-9_-]', '', sanitized)
+    # Limit length
+    sanitized = sanitized[:50]
+    return sanitized or "case"
+
+
+def scale_progress(progress_callback: Optional[Callable[[str, int], None]],
+                   start: int, end: int) -> Optional[Callable[[str, float], None]]:
+    """
+    Map a step's local progress (0.0-1.0) onto a band of the overall progress bar.
+
+    Args:
+        progress_callback: Pipeline-level callback(message, progress_percent)
+        start: Overall percentage when the step begins
+        end: Overall percentage when the step completes
+
+    Returns:
+        Callback(message, fraction) for the step, or None if there is no callback
+    """
+    if not progress_callback:
+        return None
+
+    def report(message: str, fraction: float):
+        fraction = min(max(fraction, 0.0), 1.0)
+        progress_callback(message, int(start + fraction * (end - start)))
+
+    return report
+
+
+def size_max_tokens(source_text: str, ratio: float = 1.0,
+                    minimum: int = 1024, maximum: int = 8192) -> int:
+    """
+    Size a call's max_tokens from the text its output is derived from.
+
+    Responses that still run past the budget are continued by the client,
+    so this only needs to be a good estimate, not an upper bound.
+
+    Args:
+        source_text: Input the output scales with (notes, components, draft)
+        ratio: Expected output length relative to the source (~4 chars/token)
+        minimum: Lower bound, so short inputs still get a useful budget
+        maximum: Upper bound per call
+
+    Returns:
+        max_tokens for the call
+    """
+    estimate = int(len(source_text) / 4 * ratio)
+    return max(minimum, min(maximum, estimate))
+
+
 class PipelineStep(ABC):
     """
     Abstract base class for pipeline steps.
-    Each step implements execute() which takes state and returns updated state.
+    Each step implements execute_async() which takes state and returns updated state.
+    execute() runs it synchronously for callers without an event loop.
     """
 
+    # Set by the pipeline before execute(); receives (message, fraction of step done)
+    progress_callback: Optional[Callable[[str, float], None]] = None
+
+    # Minimum streamed output tokens between two progress updates
+    STREAM_PROGRESS_INTERVAL = 25
+
+    # PipelineState fields this step reads and writes, used by Pipeline to run
+    # independent steps concurrently. None means undeclared: the step runs
+    # alone, after everything before it. Bookkeeping fields in
+    # SHARED_STATE_FIELDS don't need declaring.
+    reads: Optional[Tuple[str, ...]] = None
+    writes: Tuple[str, ...] = ()
+
+    # Prompt files the step uses; their contents are part of its memo fingerprint
+    prompt_names: Tuple[str, ...] = ()
+
     @property
     @abstractmethod
     def name(self) -> str:
@@ -92,7 +311,7 @@ class PipelineStep(ABC):
         pass
 
     @abstractmethod
-    def execute(self, state: PipelineState) -> PipelineState:
+    async def execute_async(self, state: PipelineState) -> PipelineState:
         """
         Execute this step of the pipeline.
 
@@ -107,10 +326,72 @@ class PipelineStep(ABC):
         """
         pass
 
+    def execute(self, state: PipelineState) -> PipelineState:
+        """
+        Execute this step synchronously.
+
+        Must not be called from inside a running event loop; await
+        execute_async() there instead.
+        """
+        return asyncio.run(self.execute_async(state))
+
+    def report_progress(self, message: str, fraction: float):
+        """Report progress within this step, if the pipeline asked for it."""
+        if self.progress_callback:
+            self.progress_callback(message, fraction)
+
+    def stream_progress(self, label: str, max_tokens: int) -> Callable[[str, int], None]:
+        """
+        Build an on_delta callback for ClaudeClient.generate that reports streamed output.
+
+        Args:
+            label: Message prefix shown in the progress display
+            max_tokens: Output budget used to turn token counts into a fraction
+
+        Returns:
+            Callback(text_delta, output_tokens_so_far)
+        """
+        last_reported = [0]
+
+        def on_delta(delta: str, output_tokens: int):
+            if output_tokens - last_reported[0] < self.STREAM_PROGRESS_INTERVAL:
+                return
+            last_reported[0] = output_tokens
+            self.report_progress(f"{label} ({output_tokens} tokens)", output_tokens / max_tokens)
+
+        return on_delta
+
+
+class BlockingStep(PipelineStep):
+    """
+    Pipeline step whose work is ordinary blocking code (file I/O, docx builds, local checks).
+
+    execute_blocking() runs in a worker thread so it can overlap with other steps.
+    """
+
+    @abstractmethod
+    def execute_blocking(self, state: PipelineState) -> PipelineState:
+        """Execute this step synchronously. Same contract as execute_async()."""
+        pass
+
+    async def execute_async(self, state: PipelineState) -> PipelineState:
+        return await asyncio.to_thread(self.execute_blocking, state)
+
+
+# Append-only bookkeeping that any step may touch; not part of read/write declarations
+SHARED_STATE_FIELDS = frozenset({"errors", "step_outputs", "llm_calls"})
+
 
 class Pipeline:
     """
-    Pipeline orchestrator that runs steps sequentially.
+    Pipeline orchestrator that runs steps as a dependency graph.
+
+    Steps that declare the PipelineState fields they read and write (see
+    PipelineStep.reads/writes) only wait for earlier steps they conflict
+    with, so independent steps run at the same time. A step without
+    declarations waits for every earlier step and every later step waits
+    for it, which reproduces the original sequential behaviour. Steps update
+    the shared state object in place.
     Handles progress callbacks and error propagation.
     """
 
@@ -119,17 +400,76 @@ class Pipeline:
         Initialize pipeline.
 
         Args:
-            steps: List of pipeline steps to execute
+            steps: List of pipeline steps; list order breaks ties between conflicting steps
             max_iterations: Maximum write-evaluate-revise iterations
+
+        Raises:
+            ValueError: If a step declares a field PipelineState doesn't have
         """
         self.steps = steps
         self.max_iterations = max_iterations
 
+        state_fields = {f.name for f in fields(PipelineState)}
+        for step in steps:
+            unknown = (set(step.reads or ()) | set(step.writes or ())) - state_fields
+            if unknown:
+                raise ValueError(f"Step '{step.name}' declares unknown state fields: {sorted(unknown)}")
+
+        self.dependencies = self._build_dependencies(steps)
+
+    @staticmethod
+    def _build_dependencies(steps: List[PipelineStep]) -> List[Set[int]]:
+        """
+        Work out which earlier steps each step has to wait for.
+
+        A step depends on an earlier one if it reads what the earlier step
+        writes, writes what it reads, or writes the same field, or if
+        either step is undeclared.
+
+        Returns:
+            For each step, the indexes of the earlier steps it depends on
+        """
+        dependencies = []
+        for i, step in enumerate(steps):
+            depends_on = set()
+            for j in range(i):
+                earlier = steps[j]
+                if step.reads is None or earlier.reads is None:
+                    depends_on.add(j)
+                    continue
+                reads = set(step.reads) - SHARED_STATE_FIELDS
+                writes = set(step.writes) - SHARED_STATE_FIELDS
+                earlier_reads = set(earlier.reads) - SHARED_STATE_FIELDS
+                earlier_writes = set(earlier.writes) - SHARED_STATE_FIELDS
+                if (reads & earlier_writes) or (writes & earlier_reads) or (writes & earlier_writes):
+                    depends_on.add(j)
+            dependencies.append(depends_on)
+        return dependencies
+
     def run(self, state: PipelineState,
             progress_callback: Optional[Callable[[str, int], None]] = None) -> PipelineState:
         """
         Run the pipeline to completion.
 
+        Args:
+            state: Initial pipeline state
+            progress_callback: Optional callback(message, progress_percent)
+
+        Returns:
+            Final pipeline state
+        """
+        return asyncio.run(self.run_async(state, progress_callback))
+
+    async def run_async(self, state: PipelineState,
+                        progress_callback: Optional[Callable[[str, int], None]] = None) -> PipelineState:
+        """
+        Run the pipeline to completion on the current event loop.
+
+        Each step starts as soon as the steps it depends on have finished.
+        Overall progress is the average of the steps' own progress, and a
+        message is reported when each step starts and finishes. After a
+        critical error no further steps are started.
+
         Args:
             state: Initial pipeline state
             progress_callback: Optional callback(message, progress_percent)
@@ -138,17 +478,36 @@ class Pipeline:
             Final pipeline state
         """
         total_steps = len(self.steps)
+        step_fractions = [0.0] * total_steps
+        tasks: List[asyncio.Task] = []
 
-        for i, step in enumerate(self.steps):
-            # Report progress
+        def report(message: str):
             if progress_callback:
-                progress = int((i / total_steps) * 100)
-                progress_callback(f"Step {i+1}/{total_steps}: {step.name}", progress)
+                progress_callback(message, int(sum(step_fractions) / total_steps * 100))
+
+        def step_progress(i: int) -> Optional[Callable[[str, float], None]]:
+            if not progress_callback:
+                return None
+
+            def on_progress(message: str, fraction: float):
+                step_fractions[i] = min(max(fraction, 0.0), 1.0)
+                report(message)
+
+            return on_progress
+
+        async def run_step(i: int, step: PipelineStep):
+            if self.dependencies[i]:
+                await asyncio.wait([tasks[j] for j in self.dependencies[i]])
+            if state.has_critical_error():
+                return
+
+            report(f"Step {i+1}/{total_steps}: {step.name}")
+            step.progress_callback = step_progress(i)
 
             # Execute step
             logger.info(f"Executing step: {step.name}")
             try:
-                state = step.execute(state)
+                await self._execute_step(step, state, state.iteration_count)
             except Exception as e:
                 # Unexpected exception - treat as critical
                 state.add_error(
@@ -158,15 +517,27 @@ class Pipeline:
                     e
                 )
 
-            # Check for critical errors
-            if state.has_critical_error():
-                logger.critical("Critical error encountered, stopping pipeline")
-                if progress_callback:
-                    progress_callback("Pipeline stopped due to critical error", -1)
-                break
+            step_fractions[i] = 1.0
+            report(f"Finished step {i+1}/{total_steps}: {step.name}")
+
+        for i, step in enumerate(self.steps):
+            tasks.append(asyncio.ensure_future(run_step(i, step)))
+        if tasks:
+            await asyncio.gather(*tasks)
 
-        # Final progress update
-        if progress_callback and not state.has_critical_error():
+        # Check for critical errors
+        if state.has_critical_error():
+            logger.critical("Critical error encountered, stopping pipeline")
+            if progress_callback:
+                progress_callback("Pipeline stopped due to critical error", -1)
+        elif progress_callback:
+            # Final progress update
             progress_callback("Pipeline complete", 100)
 
         return state
+
+    async def _execute_step(self, step: PipelineStep, state: PipelineState,
+                            iteration: int) -> PipelineState:
+        """Run one step, attributing its API calls to the step in state.llm_calls."""
+        with usage_scope(state.llm_calls, step.name, iteration):
+            return await step.execute_async(state)
@@ -0,0 +1,177 @@
+"""
+Local grammar checks for the non-blocking evaluation warnings.
+
+Passive voice and continuous-tense (-ing) constructions are found with
+regular expressions over each sentence of the draft, so these warnings cost
+no API calls and come out the same every time. The patterns look for a
+form of "to be" followed (optionally after an adverb or two) by a past
+participle or an -ing verb. They are tuned to the first-person narrative
+of an affidavit and accept a few misses in exchange for few false alarms:
+adjectives that look like participles ("I was scared") or end in -ing
+("It was boring"), nouns ending in -ing ("It was morning") and gerunds
+naming what a job or thing was ("My job was cleaning") are not flagged.
+"""
+import re
+from typing import Dict, List
+
+BE_FORMS = r"(?:am|is|are|was|were|be|been|being|i'm|we're|they're|you're|he's|she's|it's)"
+
+# Adverbs and negations that may sit between the auxiliary and the verb
+# ("I was never paid", "we were always being watched")
+ADVERBS = r"(?:(?:not|never|always|often|also|still|just|usually|sometimes|constantly|repeatedly|regularly|even|only|then|already|\w+ly)\s+){0,2}"
+
+IRREGULAR_PARTICIPLES = {
+    "beaten", "bitten", "born", "bought", "brought", "caught", "chosen", "done",
+    "driven", "eaten", "fed", "forbidden", "forgotten", "given", "held", "hidden",
+    "hit", "hurt", "kept", "known", "laid", "led", "left", "lent", "made", "meant",
+    "met", "paid", "put", "sent", "set", "shown", "shut", "sold", "spoken", "stolen",
+    "struck", "taken", "taught", "thrown", "told", "torn", "woken", "worn", "written",
+}
+
+# Participle-shaped words that describe a state rather than an action done to the subject
+ADJECTIVAL_PARTICIPLES = {
+    "afraid", "alone", "ashamed", "bored", "concerned", "confused", "depressed",
+    "determined", "devastated", "disappointed", "embarrassed", "excited",
+    "exhausted", "frightened", "hired", "interested", "involved", "located",
+    "married", "naked", "need", "needed", "pleased", "prepared", "related", "relieved",
+    "scared", "supposed", "surprised", "terrified", "tired", "upset", "used",
+    "worried",
+}
+
+# Words ending in -ing that aren't verbs, and "going to" (future, not continuous)
+NON_VERB_ING = {
+    "anything", "bring", "building", "ceiling", "clothing", "during", "evening",
+    "everything", "king", "morning", "nothing", "ring", "something", "spring",
+    "sting", "string", "thing", "wedding", "wing",
+}
+
+# -ing words used as adjectives ("It was terrifying"), unless an object
+# follows and makes them verbs ("He was threatening my family")
+ADJECTIVAL_ING = {
+    "alarming", "amazing", "annoying", "appalling", "boring", "challenging",
+    "charming", "confusing", "convincing", "crushing", "degrading",
+    "depressing", "devastating", "disappointing", "disgusting", "distressing",
+    "disturbing", "embarrassing", "encouraging", "exciting", "exhausting",
+    "frightening", "frustrating", "heartbreaking", "horrifying", "humiliating",
+    "interesting", "intimidating", "missing", "overwhelming", "painstaking",
+    "promising", "punishing", "relaxing", "shocking", "sickening", "surprising",
+    "terrifying", "threatening", "tiring", "troubling", "unrelenting", "willing",
+    "worrying",
+}
+
+OBJECT_START = re.compile(r"\s+(?:me|us|him|her|them|you|my|our|his|their|your|the|a|an)\b", re.IGNORECASE)
+
+# Subjects whose -ing complement is a gerund naming an activity ("The worst
+# thing was sleeping on the floor", "My job was cleaning the rooms")
+GERUND_SUBJECTS = {
+    "activity", "chore", "chores", "duty", "duties", "goal", "hardest", "job",
+    "jobs", "part", "plan", "problem", "punishment", "responsibility", "role",
+    "routine", "rule", "task", "tasks", "thing", "things", "work", "worst",
+}
+
+PASSIVE = re.compile(
+    rf"\b{BE_FORMS}\s+{ADVERBS}(?:being\s+)?(?P<verb>[a-z]+)\b",
+    re.IGNORECASE
+)
+CONTINUOUS = re.compile(
+    rf"\b{BE_FORMS}\s+{ADVERBS}(?P<verb>[a-z]+ing)\b(?P<after>\s+to\b)?",
+    re.IGNORECASE
+)
+
+# Sentence ends, plus line breaks so bullet items count as separate sentences
+SENTENCE_BREAK = re.compile(r"(?<=[.!?])[\"')\]]*\s+|\n+")
+
+# Abbreviations a sentence break after is never real ("Mr. Smith"), and ones
+# it isn't unless the next word is capitalized ("about 5 p.m. on Sunday")
+TITLE_ABBREVIATIONS = {
+    "capt", "dr", "gen", "gov", "hon", "jr", "lt", "mr", "mrs", "ms", "mt",
+    "prof", "rev", "sgt", "sr", "st",
+}
+ABBREVIATIONS = {"a.m", "approx", "e.g", "etc", "i.e", "no", "p.m", "u.s", "vs"}
+ABBREVIATION = re.compile(r"(?:^|[\s(\"'])(?P<word>[A-Za-z]+(?:\.[A-Za-z]+)*)\.$")
+LIST_NUMBER = re.compile(r"\s*\d+\.")
+
+
+def split_sentences(text: str) -> List[str]:
+    """
+    Split draft text into sentences and bullet items, stripped of list markers.
+
+    Periods after common abbreviations, initials ("Mr.", "J. Smith") and
+    list numbers don't end a sentence, so each sentence is quoted as it
+    appears.
+    """
+    sentences = []
+    start = 0
+    for match in SENTENCE_BREAK.finditer(text):
+        before = text[start:match.start()]
+        if "\n" not in match.group() and (LIST_NUMBER.fullmatch(before)
+                                          or _ends_with_abbreviation(before, text[match.end():])):
+            continue
+        _append_sentence(sentences, text[start:match.start()])
+        start = match.end()
+    _append_sentence(sentences, text[start:])
+    return sentences
+
+
+def _append_sentence(sentences: List[str], sentence: str) -> None:
+    sentence = re.sub(r"^\s*(?:[-*•]|\d+[.)])\s+", "", sentence).strip()
+    if sentence:
+        sentences.append(sentence)
+
+
+def _ends_with_abbreviation(text: str, following: str) -> bool:
+    """Return True if text ends with an abbreviation or initial that doesn't end the sentence."""
+    match = ABBREVIATION.search(text)
+    if not match:
+        return False
+    word = match.group("word")
+    if word.lower() in TITLE_ABBREVIATIONS or (len(word) == 1 and word.isupper()):
+        return True
+    return word.lower() in ABBREVIATIONS and not following[:1].isupper()
+
+
+def _is_participle(word: str) -> bool:
+    word = word.lower()
+    if word in ADJECTIVAL_PARTICIPLES:
+        return False
+    return word in IRREGULAR_PARTICIPLES or (word.endswith("ed") and len(word) > 3)
+
+
+def is_passive(sentence: str) -> bool:
+    """Return True if the sentence contains a passive construction."""
+    return any(_is_participle(match.group("verb")) for match in PASSIVE.finditer(sentence))
+
+
+def is_continuous(sentence: str) -> bool:
+    """Return True if the sentence uses a continuous (-ing) verb form."""
+    for match in CONTINUOUS.finditer(sentence):
+        verb = match.group("verb").lower()
+        if verb in NON_VERB_ING or verb == "being":
+            continue
+        if verb in ADJECTIVAL_ING and not OBJECT_START.match(sentence, match.end("verb")):
+            continue
+        if verb == "going" and match.group("after"):
+            continue
+        subject = re.search(r"(\w+)\W*$", sentence[:match.start()])
+        if subject and subject.group(1).lower() in GERUND_SUBJECTS:
+            continue
+        return True
+    return False
+
+
+def check_grammar(text: str) -> Dict[str, List[str]]:
+    """
+    Find the grammar warnings for a draft.
+
+    Args:
+        text: Draft text
+
+    Returns:
+        Dict with "passive_voice_issues" and "ing_word_issues", each a list
+        of the flagged sentences quoted as they appear in the draft
+    """
+    sentences = split_sentences(text)
+    return {
+        "passive_voice_issues": [s for s in sentences if is_passive(s)],
+        "ing_word_issues": [s for s in sentences if is_continuous(s)],
+    }
@@ -0,0 +1,197 @@
+"""
+Local grounding index for pre-screening draft sentences against the source.
+
+The index is built once from the extracted components: normalized words
+and word pairs, capitalized names and numbers. Each draft sentence is
+scored by how much of its content the index covers. A sentence that names
+a person or place, or states a number, that never appears in the
+components can't score as supported however much else matches, since those
+are the details a hallucination gets wrong.
+
+Negators ("not", "never", "didn't") count as content words, so a sentence
+that drops or adds a negation loses the word pairs around it, and one
+that states without a negation something the components only ever state
+negated ("He paid me" against "He never paid me"), or the other way
+round, is capped like an unknown detail. Sentences
+with fewer than MIN_CONTENT_WORDS content words are never pre-verified:
+"He hit me." is fully covered by "He never hit me" word for word, and
+only the LLM can tell the two apart.
+
+High-scoring sentences are treated as pre-verified and only the rest are
+sent to the LLM grounding check. The score is a screen, not a proof; it
+errs toward sending sentences to the LLM.
+"""
+import re
+from dataclasses import dataclass
+from typing import Any, Iterable, List, Set
+
+from pipeline.grammar import split_sentences
+
+# Sentences at or above this score are pre-verified
+SUPPORT_THRESHOLD = 0.85
+
+# Score cap for a sentence with a name or number not found in the components
+UNKNOWN_DETAIL_CAP = 0.5
+
+# Sentences with fewer content words (so fewer word pairs) always go to the LLM
+MIN_CONTENT_WORDS = 4
+
+# Words that negate the content word after them
+NEGATORS = {"neither", "never", "no", "nobody", "none", "nor", "not", "nothing", "without"}
+
+STOPWORDS = {
+    "a", "about", "after", "all", "also", "an", "and", "any", "are", "as", "at",
+    "be", "because", "been", "before", "being", "but", "by", "could", "did", "do",
+    "does", "even", "every", "for", "from", "had", "has", "have", "he", "her",
+    "him", "his", "how", "i", "if", "in", "into", "is", "it", "its", "just", "me",
+    "more", "my", "of", "on", "one", "only", "or", "other", "our",
+    "out", "over", "she", "so", "some", "than", "that", "the", "their", "them",
+    "then", "there", "these", "they", "this", "those", "to", "too", "up", "us",
+    "very", "was", "we", "were", "what", "when", "where", "which", "while", "who",
+    "will", "with", "would", "you", "your",
+}
+
+# Legal vocabulary the writing prompt asks for; it never appears in the notes
+# and shouldn't count against a sentence
+LEGAL_TERMS = {
+    "coerce", "coerced", "coercion", "force", "forced", "fraud", "involuntary",
+    "labor", "servitude", "traffick", "trafficked", "trafficker", "trafficking",
+}
+
+WORD = re.compile(r"[a-z0-9]+(?:'[a-z]+)?")
+NAME = re.compile(r"\b[A-Z][a-z]+(?:\s+[A-Z][a-z]+)*")
+NUMBER = re.compile(r"\b\d+(?:[.,:/-]\d+)*\b")
+
+NUMBER_WORDS = {
+    "two": "2", "three": "3", "four": "4", "five": "5", "six": "6", "seven": "7",
+    "eight": "8", "nine": "9", "ten": "10", "eleven": "11", "twelve": "12",
+    "fifteen": "15", "twenty": "20", "thirty": "30", "forty": "40", "fifty": "50",
+    "hundred": "100",
+}
+
+
+def _stem(word: str) -> str:
+    """Crude suffix stripping so "cleaned", "cleaning" and "cleans" match."""
+    for suffix in ("ing", "ed", "es", "s"):
+        if word.endswith(suffix) and len(word) - len(suffix) >= 3:
+            return word[:-len(suffix)]
+    return word
+
+
+def _content_words(text: str) -> List[str]:
+    words = [NUMBER_WORDS.get(w, w) for w in WORD.findall(text.lower().replace("’", "'"))]
+    # "didn't", "wasn't" and "can't" carry a negation; keep it as "not"
+    words = ["not" if w.endswith("n't") else w for w in words]
+    return [_stem(w) for w in words if w not in STOPWORDS]
+
+
+def _flatten(value: Any) -> Iterable[str]:
+    if isinstance(value, dict):
+        for item in value.values():
+            yield from _flatten(item)
+    elif isinstance(value, (list, tuple)):
+        for item in value:
+            yield from _flatten(item)
+    elif value is not None:
+        yield str(value)
+
+
+LEGAL_STEMS = {_stem(term) for term in LEGAL_TERMS}
+NEGATOR_STEMS = {_stem(word) for word in NEGATORS}
+
+
+def _negated(words: List[str], index: int) -> bool:
+    return index > 0 and words[index - 1] in NEGATOR_STEMS
+
+
+@dataclass
+class SentenceSupport:
+    """How well one draft sentence is covered by the extracted components."""
+    sentence: str
+    score: float
+    unknown_details: List[str]
+    content_words: int
+
+    @property
+    def pre_verified(self) -> bool:
+        return self.score >= SUPPORT_THRESHOLD and self.content_words >= MIN_CONTENT_WORDS
+
+
+class GroundingIndex:
+    """Words, word pairs, names, numbers and negations found in the extracted components."""
+
+    def __init__(self, components: Any):
+        """
+        Build the index.
+
+        Args:
+            components: Extracted components (dict of strings and lists)
+        """
+        self.words: Set[str] = set()
+        self.pairs: Set[tuple] = set()
+        self.names: Set[str] = set()
+        self.numbers: Set[str] = set()
+        # Words the components state right after a negator, and without one
+        self.negated: Set[str] = set()
+        self.affirmed: Set[str] = set()
+
+        for text in _flatten(components):
+            if text.strip().upper() == "MISSING":
+                continue
+            words = _content_words(text)
+            self.words.update(words)
+            self.pairs.update(zip(words, words[1:]))
+            for i, word in enumerate(words):
+                (self.negated if _negated(words, i) else self.affirmed).add(word)
+            for name in re.findall(r"\b[A-Z][a-z]+\b", text):
+                self.names.add(name.lower())
+            self.numbers.update(NUMBER.findall(text))
+            self.numbers.update(NUMBER_WORDS[w] for w in WORD.findall(text.lower()) if w in NUMBER_WORDS)
+
+    def score(self, sentence: str) -> SentenceSupport:
+        """
+        Score one sentence.
+
+        The score is the fraction of the sentence's content words found in
+        the components, averaged with the fraction of its word pairs when
+        it has any. Legal terms are ignored. Names and numbers missing from
+        the components cap the score at UNKNOWN_DETAIL_CAP, and so does a
+        word negated where the components only state it plainly, or the
+        other way round. A
+        sentence with no content words scores 0.0; it has nothing to match.
+        """
+        words = [w for w in _content_words(sentence) if w not in LEGAL_STEMS]
+        if not words:
+            return SentenceSupport(sentence, 0.0, [], 0)
+
+        score = sum(w in self.words for w in words) / len(words)
+        pairs = list(zip(words, words[1:]))
+        if pairs:
+            score = (score + sum(p in self.pairs for p in pairs) / len(pairs)) / 2
+
+        # The first word of a sentence is capitalized anyway, so it only
+        # counts as a name if it's followed by more capitalized words
+        unknown = [
+            match.group() for match in NAME.finditer(sentence)
+            if (match.start() > 0 or " " in match.group())
+            and any(part.lower() not in self.names for part in match.group().split())
+        ]
+        unknown += [n for n in NUMBER.findall(sentence) if n not in self.numbers]
+        if unknown or self._flips_negation(words):
+            score = min(score, UNKNOWN_DETAIL_CAP)
+
+        return SentenceSupport(sentence, round(score, 2), unknown, len(words))
+
+    def _flips_negation(self, words: List[str]) -> bool:
+        """Return True if a word the components state only one way is stated the other way."""
+        for i, word in enumerate(words):
+            if _negated(words, i):
+                if word in self.affirmed and word not in self.negated:
+                    return True
+            elif word in self.negated and word not in self.affirmed:
+                return True
+        return False
+
+    def score_draft(self, draft: str) -> List[SentenceSupport]:
+        """Score every sentence and bullet item of a draft, in order."""
+        return [self.score(sentence) for sentence in split_sentences(draft)]
@@ -0,0 +1,339 @@
+"""
+Write-evaluate-revise pipeline used to generate an affidavit body.
+"""
+import logging
+from typing import Any, Callable, Dict, Optional, Union
+
+from pipeline.checkpoint import save_checkpoint
+from pipeline.convergence import iteration_budget, stall_reason
+from pipeline.core import Pipeline, PipelineState, PipelineStep, ErrorSeverity, scale_progress
+from pipeline.memo import StepMemo
+from pipeline.models import EvaluationReport
+from pipeline.llm_client import ClaudeClient, AsyncClaudeClient, PromptLoader
+from pipeline.steps.candidates import CandidateDraftsStep
+from pipeline.steps.extractor import ExtractorStep
+from pipeline.steps.writer import WriterStep
+from pipeline.steps.evaluator import EvaluatorStep
+from pipeline.steps.reviser import ReviserStep
+
+logger = logging.getLogger(__name__)
+
+# Pipeline steps that can be routed to their own client (see settings.STEP_MODELS)
+STEP_KEYS = ("extraction", "writing", "evaluation", "revision")
+
+
+def build_step_clients(make_client: Callable[..., Any]) -> Dict[str, Any]:
+    """
+    Create a client for each pipeline step from settings.STEP_MODELS.
+
+    Steps configured identically share a client.
+
+    Args:
+        make_client: Called with model, temperature and max_request_tokens
+            keyword arguments; returns a configured client
+
+    Returns:
+        Client per step key (see STEP_KEYS)
+    """
+    from config import settings
+
+    clients: Dict[str, Any] = {}
+    by_config: Dict[tuple, Any] = {}
+    for step in STEP_KEYS:
+        config = settings.step_model_settings(step)
+        key = (config["model"], config["temperature"], config["max_tokens"])
+        if key not in by_config:
+            by_config[key] = make_client(
+                model=config["model"],
+                temperature=config["temperature"],
+                max_request_tokens=config["max_tokens"]
+            )
+            logger.info(f"Step client: {config['model']} (temperature {config['temperature']}, "
+                        f"max_tokens {config['max_tokens'] or 'uncapped'})")
+        clients[step] = by_config[key]
+    return clients
+
+
+def build_iterative_pipeline(client: Union[ClaudeClient, AsyncClaudeClient],
+                             prompt_loader: PromptLoader,
+                             max_iterations: int = 3,
+                             checkpointing: bool = False,
+                             memoize: bool = False,
+                             pipelined: bool = False,
+                             step_clients: Optional[Dict[str, Any]] = None,
+                             candidates: int = 1,
+                             candidate_temperature: float = 0.8) -> "IterativePipeline":
+    """
+    Build the pipeline with write-evaluate-revise loop.
+
+    Pipeline flow:
+    1. Extract components
+    2. Write draft
+    3. Evaluate draft
+    4. If issues found, within the iteration budget and still making
+       progress: Revise and go back to step 3
+    5. Done (the reason is recorded in state.stop_reason)
+
+    The iteration budget is max_iterations, lowered when the first
+    evaluation finds only a few issues (see pipeline.convergence).
+
+    Steps hold per-run progress callbacks, so build one pipeline per case.
+    With checkpointing, the state is saved after every step (see
+    pipeline.checkpoint). With memoize, steps whose inputs are unchanged
+    since an earlier run of the case reuse that run's output (see
+    pipeline.memo). With pipelined, the writer grounding-checks each
+    paragraph as it streams in and the first evaluation reuses the results.
+
+    step_clients (see build_step_clients()) routes steps to their own
+    clients, and so models; steps without one use client.
+
+    With candidates above 1, steps 2-3 write that many drafts at
+    candidate_temperature and evaluate them concurrently, and the loop
+    continues from the best one (see CandidateDraftsStep). Pipelined
+    checking doesn't apply to candidates.
+    """
+    clients = {step: client for step in STEP_KEYS}
+    clients.update(step_clients or {})
+
+    eval_step = EvaluatorStep(clients["evaluation"], prompt_loader)
+    candidate_step = None
+    if candidates > 1:
+        candidate_step = CandidateDraftsStep(
+            WriterStep(clients["writing"], prompt_loader, temperature=candidate_temperature),
+            eval_step,
+            candidates,
+            candidate_temperature
+        )
+    return IterativePipeline(
+        extract_step=ExtractorStep(clients["extraction"], prompt_loader),
+        write_step=WriterStep(clients["writing"], prompt_loader,
+                              paragraph_evaluator=eval_step if pipelined else None),
+        eval_step=eval_step,
+        revise_step=ReviserStep(clients["revision"], prompt_loader),
+        max_iterations=max_iterations,
+        checkpointing=checkpointing,
+        memoize=memoize,
+        candidate_step=candidate_step
+    )
+
+
+class IterativePipeline(Pipeline):
+    """
+    Custom pipeline that handles write-evaluate-revise iterations.
+
+    Pass AsyncClaudeClient-backed steps to run many cases concurrently;
+    steps built on the sync ClaudeClient run their calls in worker threads.
+
+    Steps already listed in state.completed_steps (a state restored from a
+    checkpoint) are skipped, up to the first step that still needs to run.
+    """
+
+    def __init__(self, extract_step, write_step, eval_step, revise_step, max_iterations=3,
+                 checkpointing=False, memoize=False, candidate_step=None):
+        # Don't call super().__init__ - we'll override run_async()
+        self.extract_step = extract_step
+        self.write_step = write_step
+        self.eval_step = eval_step
+        self.revise_step = revise_step
+        self.candidate_step = candidate_step  # Replaces write_step and the first evaluation
+        self.max_iterations = max_iterations
+        self.checkpointing = checkpointing
+        self.memoize = memoize
+        self._memo: Optional[StepMemo] = None
+        self._resuming = False
+        self._resume_index = 0
+
+    async def run_async(self, state: PipelineState,
+                        progress_callback: Optional[Callable[[str, int], None]] = None) -> PipelineState:
+        """
+        Run pipeline with iterative write-evaluate-revise loop.
+
+        Awaiting this from many tasks drives many cases concurrently on one
+        event loop; run() is the synchronous wrapper used by the GUI.
+        """
+        self._resuming = bool(state.completed_steps)
+        self._resume_index = 0
+        self._memo = StepMemo.for_case(state.output_path, state.case_name) if self.memoize else None
+
+        # Step 1: Extract components (10% - 30% of progress)
+        if progress_callback:
+            progress_callback("Extracting components from notes...", 10)
+
+        self.extract_step.progress_callback = scale_progress(progress_callback, 10, 30)
+        state = await self._run_checkpointed(self.extract_step, "extraction", state, 0)
+        if state.has_critical_error():
+            return state
+
+        # Step 2: Initial write (30% - 40% of progress), or candidates written
+        # and evaluated together (30% - 50%)
+        if self.candidate_step:
+            if progress_callback:
+                progress_callback(f"Writing {self.candidate_step.count} candidate drafts...", 30)
+
+            self.candidate_step.progress_callback = scale_progress(progress_callback, 30, 50)
+            state = await self._run_checkpointed(self.candidate_step, "candidates", state, 0)
+        else:
+            if progress_callback:
+                progress_callback("Writing initial draft...", 30)
+
+            self.write_step.progress_callback = scale_progress(progress_callback, 30, 40)
+            state = await self._run_checkpointed(self.write_step, "writing", state, 0)
+        if state.has_critical_error():
+            return state
+
+        # Steps 3-4: Evaluate and revise loop (40% - 90% of progress)
+        iteration = 0
+        budget = self.max_iterations
+        evaluated = self.candidate_step is not None and state.evaluation_report is not None
+        while True:
+            # Evaluate, unless the candidates step already evaluated the draft
+            if not evaluated:
+                progress = 40 + (iteration * 20)
+                if progress_callback:
+                    progress_callback(f"Evaluating draft (iteration {iteration + 1})...", progress)
+
+                self.eval_step.progress_callback = scale_progress(progress_callback, progress, progress + 10)
+                state = await self._run_checkpointed(
+                    self.eval_step, f"evaluation_{iteration + 1}", state, iteration + 1
+                )
+                if state.has_critical_error():
+                    return state
+            evaluated = False
+
+            # Check if we're done (no revision needed)
+            if state.evaluation_report and not state.evaluation_report.needs_revision:
+                logger.info(f"Draft approved after {iteration + 1} iteration(s)")
+                self._stop(state, f"Approved after {iteration + 1} evaluation(s)")
+                break
+
+            if iteration == 0:
+                # Size the budget to the first evaluation's findings
+                budget = iteration_budget(self._first_evaluation(state), self.max_iterations)
+                logger.info(f"Iteration budget: {budget} evaluation(s) of at most {self.max_iterations}")
+            else:
+                reason = self._stall_reason(state, iteration)
+                if reason:
+                    logger.warning(reason)
+                    self._stop(state, reason)
+                    break
+
+            # Revise if we haven't used up the budget
+            iteration += 1
+            if iteration >= budget:
+                if budget < self.max_iterations:
+                    reason = f"Iteration budget reached ({budget} evaluations for the issues found)"
+                else:
+                    reason = f"Reached max iterations ({self.max_iterations})"
+                logger.warning(reason)
+                self._stop(state, reason)
+                break
+
+            progress = 30 + (iteration * 20)
+            if progress_callback:
+                progress_callback(f"Revising draft (iteration {iteration})...", progress)
+
+            self.revise_step.progress_callback = scale_progress(progress_callback, progress, progress + 10)
+            state = await self._run_checkpointed(
+                self.revise_step, f"revision_{iteration}", state, iteration
+            )
+            if state.has_critical_error():
+                return state
+
+        if self.checkpointing:
+            save_checkpoint(state, complete=True)
+
+        return state
+
+    @staticmethod
+    def _stop(state: PipelineState, reason: str) -> None:
+        """End the loop with the current draft as the final text."""
+        state.stop_reason = reason
+        state.final_text = state.draft_text
+
+    @staticmethod
+    def _first_evaluation(state: PipelineState) -> Optional[EvaluationReport]:
+        """
+        Return the first evaluation of the draft.
+
+        On a resumed run state.evaluation_report is the latest restored
+        evaluation, so the first one is read from state.step_outputs.
+        """
+        first = state.step_outputs.get("evaluation_0")
+        return EvaluationReport.from_dict(first) if first else state.evaluation_report
+
+    @staticmethod
+    def _stall_reason(state: PipelineState, iteration: int) -> Optional[str]:
+        """
+        Check whether revision `iteration` made progress.
+
+        Reads the previous evaluation and the pre-revision draft from
+        state.step_outputs, so the check also works on resumed runs. A
+        revision that failed outright isn't judged; the loop retries it.
+        """
+        if state.iteration_count != iteration:
+            return None
+
+        previous_draft_key = "writing" if iteration == 1 else f"revision_{iteration - 1}"
+        previous_report = state.step_outputs.get(f"evaluation_{iteration - 1}")
+        return stall_reason(
+            EvaluationReport.from_dict(previous_report) if previous_report else None,
+            state.evaluation_report,
+            state.step_outputs.get(previous_draft_key),
+            state.draft_text
+        )
+
+    async def _run_checkpointed(self, step: PipelineStep, key: str, state: PipelineState,
+                                iteration: int) -> PipelineState:
+        """
+        Run a step unless a restored state or the step memo already has its result.
+
+        A step counts as completed only if it added no ERROR or CRITICAL
+        errors; completed steps are recorded in state.completed_steps and,
+        with checkpointing on, saved. With memoize on, completed steps'
+        outputs are stored under their input fingerprint.
+
+        Args:
+            step: Step to run
+            key: Checkpoint key for this run of the step (e.g. "evaluation_2")
+            state: Current pipeline state
+            iteration: Iteration to attribute the step's API calls to
+
+        Returns:
+            Updated pipeline state
+        """
+        completed = state.completed_steps
+        if self._resuming:
+            if self._resume_index < len(completed) and completed[self._resume_index] == key:
+                self._resume_index += 1
+                logger.info(f"Skipping '{key}' (restored from checkpoint)")
+                return state
+
+            # From the first step that runs again, anything saved after it is stale
+            del completed[self._resume_index:]
+            self._resuming = False
+
+        fingerprint = StepMemo.fingerprint(step, state) if self._memo else None
+        if fingerprint and self._memo.restore(fingerprint, step, state):
+            logger.info(f"Reusing '{key}' from an earlier run (inputs unchanged)")
+            state.completed_steps.append(key)
+            if self.checkpointing:
+                save_checkpoint(state)
+            return state
+
+        errors_before = len(state.errors)
+        step_outputs_before = dict(state.step_outputs)
+        state = await self._execute_step(step, state, iteration)
+
+        failed = any(
+            e.severity in (ErrorSeverity.ERROR, ErrorSeverity.CRITICAL)
+            for e in state.errors[errors_before:]
+        )
+        if not failed:
+            state.completed_steps.append(key)
+            if fingerprint:
+                self._memo.store(fingerprint, step, state, step_outputs_before)
+                self._memo.save()
+            if self.checkpointing:
+                save_checkpoint(state)
+
+        return state
@@ -1,26 +1,53 @@
 """
 Claude API client wrapper with prompt loading.
 """
+import asyncio
+import contextlib
+import hashlib
+import json
 import os
+import time
 from pathlib import Path
-from typing import Dict, Optional
+from string import Formatter
+from typing import Any, AsyncIterator, Callable, Dict, Iterable, Iterator, List, Optional, Tuple, Union
 import logging
-from anthropic import Anthropic
+
+from pipeline.client_pool import get_anthropic_client, get_async_anthropic_client
+from pipeline.rate_limiter import RateLimiter, get_rate_limiter
+from pipeline.response_cache import ResponseCache
+from pipeline.usage import record_call
 
 logger = logging.getLogger(__name__)
 
 
+class TruncatedResponseError(Exception):
+    """
+    A response stopped at max_tokens and couldn't be continued.
+
+    Raised instead of returning the cut-off text as if it were complete, so
+    the step can decide whether the partial text is usable. Truncated
+    responses are never written to the response cache.
+    """
+
+    def __init__(self, text: str, output_tokens: int):
+        super().__init__(f"Response truncated at max_tokens after {output_tokens} output tokens")
+        self.text = text  # Everything generated, including continuations
+        self.output_tokens = output_tokens
+
+
 class PromptLoader:
     """Loads and manages prompts from markdown files."""
 
-    def __init__(self, prompts_dir: str = "prompts"):
+    def __init__(self, prompts_dir: str = "prompts", prompt_caching: bool = True):
         """
         Initialize prompt loader.
 
         Args:
             prompts_dir: Directory containing prompt .md files
+            prompt_caching: Mark static prompt prefixes for Anthropic prompt caching
         """
         self.prompts_dir = Path(prompts_dir)
+        self.prompt_caching = prompt_caching
         self._cache: Dict[str, str] = {}
 
     def load(self, prompt_name: str) -> str:
@@ -52,6 +79,14 @@ class PromptLoader:
 
         return content
 
+    def fingerprint(self, prompt_name: str) -> str:
+        """
+        Return a hash of a prompt file's contents.
+
+        Used to tell whether a step's output is still valid after prompts are edited.
+        """
+        return hashlib.sha256(self.load(prompt_name).encode('utf-8')).hexdigest()
+
     def format(self, prompt_name: str, **variables) -> str:
         """
         Load and format a prompt with variables.
@@ -66,64 +101,663 @@ class PromptLoader:
         template = self.load(prompt_name)
         return template.format(**variables)
 
+    def format_blocks(self, prompt_name: str, dynamic_fields: Iterable[str] = ("draft", "evaluation"),
+                      **variables) -> List[Dict[str, Any]]:
+        """
+        Load and format a prompt as content blocks split into a static and a dynamic part.
 
-class ClaudeClient:
-    """Wrapper for Claude API calls."""
+        Everything before the first dynamic field (the instructions, components
+        and case specifics) is rendered into a leading block marked with
+        cache_control, so repeated calls across iterations read it from
+        Anthropic's prompt cache. The rest of the template goes in a second,
+        uncached block.
 
-    def __init__(self, api_key: Optional[str] = None, model: str = "claude-sonnet-4-20250514"):
+        Args:
+            prompt_name: Name of prompt file (without .md extension)
+            dynamic_fields: Variables that change between calls
+            **variables: Variables to substitute in the prompt
+
+        Returns:
+            List of text content blocks for the user message
+        """
+        template = self.load(prompt_name)
+        formatter = Formatter()
+        dynamic_fields = set(dynamic_fields)
+
+        static_parts: List[str] = []
+        dynamic_parts: List[str] = []
+        target = static_parts
+
+        for literal, field_name, format_spec, conversion in formatter.parse(template):
+            target.append(literal)
+            if field_name is None:
+                continue
+            if field_name in dynamic_fields:
+                target = dynamic_parts
+            value = formatter.get_field(field_name, (), variables)[0]
+            value = formatter.convert_field(value, conversion)
+            target.append(formatter.format_field(value, format_spec or ""))
+
+        blocks = []
+        static_text = "".join(static_parts)
+        dynamic_text = "".join(dynamic_parts)
+
+        if static_text:
+            block = {"type": "text", "text": static_text}
+            if self.prompt_caching:
+                block["cache_control"] = {"type": "ephemeral"}
+            blocks.append(block)
+        if dynamic_text:
+            blocks.append({"type": "text", "text": dynamic_text})
+
+        return blocks
+
+
+class _ClaudeClientBase:
+    """Shared configuration and request building for the sync and async clients."""
+
+    # Multiplier on list prices for usage records
+    price_factor = 1.0
+
+    def __init__(self, api_key: Optional[str] = None, model: str = "claude-sonnet-4-20250514",
+                 cache: Optional[ResponseCache] = None, streaming: bool = True,
+                 max_output_tokens: int = 32000, temperature: float = 0.0,
+                 max_request_tokens: Optional[int] = None):
         """
         Initialize Claude client.
 
         Args:
             api_key: Anthropic API key (defaults to ANTHROPIC_API_KEY env var)
             model: Claude model to use
+            cache: Optional on-disk response cache for deterministic calls
+            streaming: Stream responses when the caller asks for progress updates
+            max_output_tokens: Cap on total output per generate() call, including
+                continuations of responses that stopped at max_tokens
+            temperature: Sampling temperature for calls that don't pass one
+            max_request_tokens: Cap on max_tokens of each request (None for no cap)
         """
         self.api_key = api_key or os.getenv("ANTHROPIC_API_KEY")
+        self.model = model
+        self.cache = cache
+        self.streaming = streaming
+        self.max_output_tokens = max_output_tokens
+        self.temperature = temperature
+        self.max_request_tokens = max_request_tokens
+
+    def _require_api_key(self) -> str:
+        """Return the API key, raising if none was configured."""
         if not self.api_key:
             raise ValueError("ANTHROPIC_API_KEY not found in environment or constructor")
+        return self.api_key
+
+    def _call_params(self, max_tokens: int, temperature: Optional[float]) -> Tuple[int, float]:
+        """Apply the client's max_tokens cap and default temperature to a call."""
+        if self.max_request_tokens:
+            max_tokens = min(max_tokens, self.max_request_tokens)
+        return max_tokens, self.temperature if temperature is None else temperature
+
+    def _cache_key(self, prompt, max_tokens: int, temperature: float,
+                   system: Optional[str], use_cache: bool,
+                   tool: Optional[Dict[str, Any]] = None) -> Optional[str]:
+        """Return the response cache key, or None if this call is not cacheable."""
+        if self.cache and use_cache and temperature == 0.0:
+            return self.cache.make_key(self.model, prompt, system, max_tokens, temperature, tool)
+        return None
+
+    def _cache_get(self, cache_key: Optional[str]) -> Optional[str]:
+        """Look up a cached response for a cacheable call."""
+        if not cache_key:
+            return None
+        cached = self.cache.get(cache_key)
+        if cached is not None:
+            logger.debug(f"Using cached response ({len(cached)} chars)")
+            record_call(self.model, response_cached=True)
+        return cached
+
+    def _build_kwargs(self, prompt, max_tokens: int, temperature: float,
+                      system: Optional[str], tool: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """Build keyword arguments for messages.create / messages.stream."""
+        kwargs = {
+            "model": self.model,
+            "max_tokens": max_tokens,
+            "temperature": temperature,
+            "messages": [{"role": "user", "content": prompt}]
+        }
+
+        if system:
+            kwargs["system"] = system
+
+        if tool:
+            # Force the call, so the answer arrives as schema-shaped tool input
+            kwargs["tools"] = [tool]
+            kwargs["tool_choice"] = {"type": "tool", "name": tool["name"]}
+
+        return kwargs
+
+    def _continuation_kwargs(self, kwargs: Dict[str, Any], response, text: str,
+                             output_tokens: int) -> Optional[Dict[str, Any]]:
+        """
+        Build the follow-up request for a response that stopped at max_tokens.
 
-        self.model = model
-        self.client = Anthropic(api_key=self.api_key)
+        The text so far is sent back as a prefilled assistant turn, so the
+        model picks up exactly where it stopped.
+
+        Args:
+            kwargs: Arguments of the original request
+            response: Response that was just received
+            text: All text generated so far, without trailing whitespace
+                (the API rejects prefills that end in whitespace)
+            output_tokens: Output tokens used so far across all parts
+
+        Returns:
+            Arguments for the next request, or None if the response is complete
+            or the output cap has been reached
+        """
+        if getattr(response, "stop_reason", None) != "max_tokens":
+            return None
+
+        if "tools" in kwargs:
+            # Tool input can't be continued with a prefill; it's raised as truncated
+            logger.warning(f"Structured response truncated at max_tokens after {output_tokens} output tokens")
+            return None
+
+        remaining = self.max_output_tokens - output_tokens
+        if remaining <= 0 or not text:
+            logger.warning(f"Response truncated at max_tokens after {output_tokens} output tokens "
+                           f"(cap {self.max_output_tokens})")
+            return None
+
+        logger.info(f"Response hit max_tokens after {output_tokens} output tokens, continuing")
+        continued = dict(kwargs)
+        continued["max_tokens"] = min(kwargs["max_tokens"], remaining)
+        continued["messages"] = [kwargs["messages"][0], {"role": "assistant", "content": text}]
+        return continued
+
+    @staticmethod
+    def _timeout_kwargs(timeout: Optional[float]) -> Dict[str, Any]:
+        """Per-request timeout override for the SDK (empty to use the client default)."""
+        return {"timeout": timeout} if timeout else {}
+
+    @staticmethod
+    def _estimate_input_tokens(kwargs: Dict[str, Any]) -> int:
+        """Rough input token estimate (~4 characters per token) for rate limiting."""
+        chars = len(json.dumps(kwargs["messages"], ensure_ascii=False))
+        chars += len(kwargs.get("system") or "")
+        return max(1, chars // 4)
+
+    @staticmethod
+    def _response_text(response) -> str:
+        """Extract the generated text (or forced tool call's input, as JSON) from a response."""
+        for block in response.content:
+            if getattr(block, "type", None) == "tool_use":
+                return json.dumps(block.input, ensure_ascii=False)
+        return response.content[0].text
+
+    @staticmethod
+    def _raise_if_truncated(response, text: str, output_tokens: int) -> None:
+        """Raise TruncatedResponseError if the last part of a response stopped at max_tokens."""
+        if getattr(response, "stop_reason", None) == "max_tokens":
+            raise TruncatedResponseError(text, output_tokens)
+
+    def _finish(self, response, text: str, cache_key: Optional[str], started: float,
+                ttft_seconds: Optional[float] = None) -> None:
+        """
+        Record usage for a completed response and store it in the response cache.
+
+        A response that stopped at max_tokens isn't cached; it is either
+        continued or raised as truncated.
+
+        Args:
+            response: Messages API response
+            text: Generated text
+            cache_key: Response cache key, or None if the call is not cacheable
+            started: time.perf_counter() when the call was made
+            ttft_seconds: Time to first streamed token, if streamed
+        """
+        seconds = time.perf_counter() - started
+        logger.debug(f"Received response ({len(text)} chars) in {seconds:.1f}s")
+        self._log_prompt_cache_usage(response)
+        record_call(
+            getattr(response, "model", None) or self.model,
+            usage=getattr(response, "usage", None),
+            seconds=seconds,
+            ttft_seconds=ttft_seconds,
+            stop_reason=getattr(response, "stop_reason", None),
+            price_factor=self.price_factor,
+        )
+
+        if cache_key and getattr(response, "stop_reason", None) != "max_tokens":
+            self.cache.put(cache_key, text, model=self.model)
+
+    @staticmethod
+    def _log_prompt_cache_usage(response) -> None:
+        """Log prompt cache read/write token counts from the response usage."""
+        usage = getattr(response, "usage", None)
+        if usage is None:
+            return
+
+        cache_read = getattr(usage, "cache_read_input_tokens", None) or 0
+        cache_write = getattr(usage, "cache_creation_input_tokens", None) or 0
+
+        if cache_read or cache_write:
+            logger.info(f"Prompt cache: {cache_read} tokens read, {cache_write} tokens written "
+                        f"({usage.input_tokens} uncached input tokens)")
+
+
+class ClaudeClient(_ClaudeClientBase):
+    """
+    Wrapper for Claude API calls.
+
+    Calls go through the process-wide RateLimiter for the client's model,
+    which queues them when the model's budget is exhausted and retries
+    transient API errors.
+    """
+
+    def __init__(self, api_key: Optional[str] = None, model: str = "claude-sonnet-4-20250514",
+                 cache: Optional[ResponseCache] = None, streaming: bool = True,
+                 rate_limiter: Optional[RateLimiter] = None, max_output_tokens: int = 32000,
+                 temperature: float = 0.0, max_request_tokens: Optional[int] = None):
+        super().__init__(api_key, model, cache, streaming, max_output_tokens, temperature,
+                         max_request_tokens)
+        self.rate_limiter = rate_limiter or get_rate_limiter(model)
+        # Shared across clients and threads so HTTP connections are reused
+        self.client = get_anthropic_client(self._require_api_key())
         logger.info(f"Initialized Claude client with model: {model}")
 
-    def generate(self, prompt: str, max_tokens: int = 4096,
-                 temperature: float = 0.0, system: Optional[str] = None) -> str:
+    def generate(self, prompt: Union[str, List[Dict[str, Any]]], max_tokens: int = 4096,
+                 temperature: Optional[float] = None, system: Optional[str] = None,
+                 use_cache: bool = True,
+                 on_delta: Optional[Callable[[str, int], None]] = None,
+                 timeout: Optional[float] = None,
+                 tool: Optional[Dict[str, Any]] = None) -> str:
         """
         Generate text using Claude.
 
+        Deterministic calls (temperature 0.0) are served from the response
+        cache when one is configured. A response that stops at max_tokens is
+        continued in follow-up calls until it completes or max_output_tokens
+        is reached, so max_tokens is a per-call budget, not a hard limit.
+        A response that is still cut off raises TruncatedResponseError.
+
         Args:
-            prompt: User prompt
+            prompt: User prompt, as a string or a list of content blocks
+                (see PromptLoader.format_blocks)
             max_tokens: Maximum tokens to generate
-            temperature: Sampling temperature (0.0 = deterministic)
+            temperature: Sampling temperature (0.0 = deterministic; default: the client's)
             system: Optional system prompt
+            use_cache: Set to False to bypass the response cache for this call
+            on_delta: Optional callback(text_delta, output_tokens_so_far); when
+                given, the response is streamed and the callback fires per delta
+            timeout: Optional per-call timeout in seconds (defaults to API_TIMEOUT_SECONDS)
+            tool: Optional tool definition (name, description, input_schema);
+                the model is made to call it and the call's input is returned
+                as JSON text. Such calls aren't streamed or continued.
 
         Returns:
             Generated text
 
         Raises:
+            TruncatedResponseError: If the response reached max_output_tokens
+                (or max_tokens, for a tool call, whose input can't be
+                continued) without finishing
+            Exception: If API call fails after retries
+        """
+        if on_delta and self.streaming and not tool:
+            parts = []
+            chars = 0
+            for delta in self.generate_stream(prompt, max_tokens, temperature, system, use_cache, timeout):
+                parts.append(delta)
+                chars += len(delta)
+                # Usage is only reported at the end of a stream; estimate ~4 chars/token
+                on_delta(delta, max(1, chars // 4))
+            return "".join(parts)
+
+        max_tokens, temperature = self._call_params(max_tokens, temperature)
+
+        cache_key = self._cache_key(prompt, max_tokens, temperature, system, use_cache, tool)
+        cached = self._cache_get(cache_key)
+        if cached is not None:
+            return cached
+
+        try:
+            logger.debug(f"Calling Claude API (tokens: {max_tokens}, temp: {temperature})")
+
+            kwargs = self._build_kwargs(prompt, max_tokens, temperature, system, tool)
+            text = ""
+            output_tokens = 0
+            while kwargs:
+                started = time.perf_counter()
+                response = self._create(kwargs, timeout)
+
+                # Extract text from response
+                text += self._response_text(response)
+                output_tokens += response.usage.output_tokens
+                kwargs = self._continuation_kwargs(kwargs, response, text.rstrip(), output_tokens)
+                if kwargs:
+                    text = text.rstrip()
+                self._finish(response, text, None if kwargs else cache_key, started)
+
+        except Exception as e:
+            logger.error(f"Claude API error: {str(e)}")
+            raise
+
+        self._raise_if_truncated(response, text, output_tokens)
+        return text
+
+    def generate_stream(self, prompt: Union[str, List[Dict[str, Any]]], max_tokens: int = 4096,
+                        temperature: Optional[float] = None, system: Optional[str] = None,
+                        use_cache: bool = True, timeout: Optional[float] = None) -> Iterator[str]:
+        """
+        Generate text using Claude, yielding text deltas as they arrive.
+
+        A response cache hit is yielded as a single delta. Responses that stop
+        at max_tokens are continued as in generate(); if one is still cut off,
+        TruncatedResponseError is raised after the last delta. Errors opening
+        the stream are retried; errors after output has started are raised.
+
+        Args:
+            prompt: User prompt, as a string or a list of content blocks
+            max_tokens: Maximum tokens to generate
+            temperature: Sampling temperature (0.0 = deterministic; default: the client's)
+            system: Optional system prompt
+            use_cache: Set to False to bypass the response cache for this call
+            timeout: Optional per-call timeout in seconds
+
+        Yields:
+            Text deltas in order
+
+        Raises:
+            TruncatedResponseError: If the response reached max_output_tokens without finishing
             Exception: If API call fails
         """
+        max_tokens, temperature = self._call_params(max_tokens, temperature)
+        cache_key = self._cache_key(prompt, max_tokens, temperature, system, use_cache)
+        cached = self._cache_get(cache_key)
+        if cached is not None:
+            yield cached
+            return
+
+        try:
+            logger.debug(f"Streaming Claude API (tokens: {max_tokens}, temp: {temperature})")
+
+            kwargs = self._build_kwargs(prompt, max_tokens, temperature, system)
+            parts = []
+            output_tokens = 0
+            while kwargs:
+                started = time.perf_counter()
+                ttft = None
+                # Trailing whitespace is held back until we know the response is
+                # complete, since a continuation prefill can't end in whitespace
+                pending = ""
+                with contextlib.ExitStack() as stack:
+                    stream = self._open_stream(kwargs, stack, timeout)
+                    # The reservation is returned even if the stream fails or is abandoned
+                    streamed_tokens = 0
+                    try:
+                        for text in stream.text_stream:
+                            if ttft is None:
+                                ttft = time.perf_counter() - started
+                            body = (pending + text).rstrip()
+                            pending = (pending + text)[len(body):]
+                            if body:
+                                parts.append(body)
+                                yield body
+                        response = stream.get_final_message()
+                        streamed_tokens = response.usage.output_tokens
+                        self.rate_limiter.update_from_headers(stream.response.headers)
+                    finally:
+                        self.rate_limiter.settle(kwargs["max_tokens"], streamed_tokens)
+
+                output_tokens += response.usage.output_tokens
+                kwargs = self._continuation_kwargs(kwargs, response, "".join(parts), output_tokens)
+                if not kwargs and pending:
+                    parts.append(pending)
+                    yield pending
+                self._finish(response, "".join(parts), None if kwargs else cache_key, started, ttft)
+
+        except Exception as e:
+            logger.error(f"Claude API error: {str(e)}")
+            raise
+
+        self._raise_if_truncated(response, "".join(parts), output_tokens)
+
+    async def agenerate(self, prompt: Union[str, List[Dict[str, Any]]], max_tokens: int = 4096,
+                        temperature: Optional[float] = None, system: Optional[str] = None,
+                        use_cache: bool = True,
+                        on_delta: Optional[Callable[[str, int], None]] = None,
+                        timeout: Optional[float] = None,
+                        tool: Optional[Dict[str, Any]] = None) -> str:
+        """
+        Awaitable generate() for use from async steps.
+
+        Runs the blocking call in a worker thread so a sync client can still
+        drive the async pipeline. Arguments match generate().
+        """
+        return await asyncio.to_thread(
+            self.generate, prompt, max_tokens, temperature, system, use_cache, on_delta, timeout, tool
+        )
+
+    def _create(self, kwargs: Dict[str, Any], timeout: Optional[float] = None):
+        """Call messages.create through the rate limiter, retrying transient errors."""
+        max_tokens = kwargs["max_tokens"]
+        input_estimate = self._estimate_input_tokens(kwargs)
+
+        attempt = 0
+        while True:
+            self.rate_limiter.acquire(input_estimate, max_tokens)
+            try:
+                raw = self.client.messages.with_raw_response.create(**kwargs, **self._timeout_kwargs(timeout))
+            except Exception as e:
+                self.rate_limiter.settle(max_tokens, 0)
+                delay = self.rate_limiter.retry_delay(e, attempt)
+                if delay is None:
+                    raise
+                attempt += 1
+                logger.warning(f"Claude API error ({str(e)}), retry {attempt} in {delay:.1f}s")
+                time.sleep(delay)
+                continue
+
+            self.rate_limiter.update_from_headers(raw.headers)
+            response = raw.parse()
+            self.rate_limiter.settle(max_tokens, response.usage.output_tokens)
+            return response
+
+    def _open_stream(self, kwargs: Dict[str, Any], stack: contextlib.ExitStack,
+                     timeout: Optional[float] = None):
+        """Open messages.stream through the rate limiter, retrying transient errors."""
+        max_tokens = kwargs["max_tokens"]
+        input_estimate = self._estimate_input_tokens(kwargs)
+
+        attempt = 0
+        while True:
+            self.rate_limiter.acquire(input_estimate, max_tokens)
+            try:
+                return stack.enter_context(self.client.messages.stream(**kwargs, **self._timeout_kwargs(timeout)))
+            except Exception as e:
+                self.rate_limiter.settle(max_tokens, 0)
+                delay = self.rate_limiter.retry_delay(e, attempt)
+                if delay is None:
+                    raise
+                attempt += 1
+                logger.warning(f"Claude API error ({str(e)}), retry {attempt} in {delay:.1f}s")
+                time.sleep(delay)
+
+
+class AsyncClaudeClient(_ClaudeClientBase):
+    """
+    Asyncio wrapper for Claude API calls.
+
+    Built on the SDK's AsyncAnthropic client, so many pipelines can share one
+    event loop without a thread per in-flight request. Shares the
+    process-wide per-model RateLimiter with ClaudeClient.
+    """
+
+    def __init__(self, api_key: Optional[str] = None, model: str = "claude-sonnet-4-20250514",
+                 cache: Optional[ResponseCache] = None, streaming: bool = True,
+                 rate_limiter: Optional[RateLimiter] = None, max_output_tokens: int = 32000,
+                 temperature: float = 0.0, max_request_tokens: Optional[int] = None):
+        super().__init__(api_key, model, cache, streaming, max_output_tokens, temperature,
+                         max_request_tokens)
+        self.rate_limiter = rate_limiter or get_rate_limiter(model)
+        self._require_api_key()
+        logger.info(f"Initialized async Claude client with model: {model}")
+
+    @property
+    def client(self):
+        """Shared AsyncAnthropic client for the running event loop."""
+        return get_async_anthropic_client(self.api_key)
+
+    async def generate(self, prompt: Union[str, List[Dict[str, Any]]], max_tokens: int = 4096,
+                       temperature: Optional[float] = None, system: Optional[str] = None,
+                       use_cache: bool = True,
+                       on_delta: Optional[Callable[[str, int], None]] = None,
+                       timeout: Optional[float] = None,
+                       tool: Optional[Dict[str, Any]] = None) -> str:
+        """
+        Generate text using Claude. Arguments and behaviour match ClaudeClient.generate().
+        """
+        if on_delta and self.streaming and not tool:
+            parts = []
+            chars = 0
+            async for delta in self.generate_stream(prompt, max_tokens, temperature, system, use_cache,
+                                                    timeout):
+                parts.append(delta)
+                chars += len(delta)
+                on_delta(delta, max(1, chars // 4))
+            return "".join(parts)
+
+        max_tokens, temperature = self._call_params(max_tokens, temperature)
+
+        cache_key = self._cache_key(prompt, max_tokens, temperature, system, use_cache, tool)
+        cached = self._cache_get(cache_key)
+        if cached is not None:
+            return cached
+
         try:
             logger.debug(f"Calling Claude API (tokens: {max_tokens}, temp: {temperature})")
 
-            kwargs = {
-                "model": self.model,
-                "max_tokens": max_tokens,
-                "temperature": temperature,
-                "messages": [{"role": "user", "content": prompt}]
-            }
+            kwargs = self._build_kwargs(prompt, max_tokens, temperature, system, tool)
+            text = ""
+            output_tokens = 0
+            while kwargs:
+                started = time.perf_counter()
+                response = await self._create(kwargs, timeout)
 
-            if system:
-                kwargs["system"] = system
+                text += self._response_text(response)
+                output_tokens += response.usage.output_tokens
+                kwargs = self._continuation_kwargs(kwargs, response, text.rstrip(), output_tokens)
+                if kwargs:
+                    text = text.rstrip()
+                self._finish(response, text, None if kwargs else cache_key, started)
 
-            response = self.client.messages.create(**kwargs)
+        except Exception as e:
+            logger.error(f"Claude API error: {str(e)}")
+            raise
 
-            # Extract text from response
-            text = response.content[0].text
+        self._raise_if_truncated(response, text, output_tokens)
+        return text
 
-            logger.debug(f"Received response ({len(text)} chars)")
-            return text
+    async def generate_stream(self, prompt: Union[str, List[Dict[str, Any]]], max_tokens: int = 4096,
+                              temperature: Optional[float] = None, system: Optional[str] = None,
+                              use_cache: bool = True,
+                              timeout: Optional[float] = None) -> AsyncIterator[str]:
+        """
+        Generate text using Claude, yielding text deltas as they arrive.
+
+        Arguments and behaviour match ClaudeClient.generate_stream().
+        """
+        max_tokens, temperature = self._call_params(max_tokens, temperature)
+        cache_key = self._cache_key(prompt, max_tokens, temperature, system, use_cache)
+        cached = self._cache_get(cache_key)
+        if cached is not None:
+            yield cached
+            return
+
+        try:
+            logger.debug(f"Streaming Claude API (tokens: {max_tokens}, temp: {temperature})")
+
+            kwargs = self._build_kwargs(prompt, max_tokens, temperature, system)
+            parts = []
+            output_tokens = 0
+            while kwargs:
+                started = time.perf_counter()
+                ttft = None
+                pending = ""  # Trailing whitespace, held back as in ClaudeClient.generate_stream()
+                async with contextlib.AsyncExitStack() as stack:
+                    stream = await self._open_stream(kwargs, stack, timeout)
+                    streamed_tokens = 0
+                    try:
+                        async for text in stream.text_stream:
+                            if ttft is None:
+                                ttft = time.perf_counter() - started
+                            body = (pending + text).rstrip()
+                            pending = (pending + text)[len(body):]
+                            if body:
+                                parts.append(body)
+                                yield body
+                        response = await stream.get_final_message()
+                        streamed_tokens = response.usage.output_tokens
+                        self.rate_limiter.update_from_headers(stream.response.headers)
+                    finally:
+                        self.rate_limiter.settle(kwargs["max_tokens"], streamed_tokens)
+
+                output_tokens += response.usage.output_tokens
+                kwargs = self._continuation_kwargs(kwargs, response, "".join(parts), output_tokens)
+                if not kwargs and pending:
+                    parts.append(pending)
+                    yield pending
+                self._finish(response, "".join(parts), None if kwargs else cache_key, started, ttft)
 
         except Exception as e:
             logger.error(f"Claude API error: {str(e)}")
             raise
+
+        self._raise_if_truncated(response, "".join(parts), output_tokens)
+
+    # Steps call agenerate() so they work with either client
+    agenerate = generate
+
+    async def _create(self, kwargs: Dict[str, Any], timeout: Optional[float] = None):
+        """Call messages.create through the rate limiter, retrying transient errors."""
+        max_tokens = kwargs["max_tokens"]
+        input_estimate = self._estimate_input_tokens(kwargs)
+
+        attempt = 0
+        while True:
+            await self.rate_limiter.acquire_async(input_estimate, max_tokens)
+            try:
+                raw = await self.client.messages.with_raw_response.create(**kwargs, **self._timeout_kwargs(timeout))
+            except Exception as e:
+                self.rate_limiter.settle(max_tokens, 0)
+                delay = self.rate_limiter.retry_delay(e, attempt)
+                if delay is None:
+                    raise
+                attempt += 1
+                logger.warning(f"Claude API error ({str(e)}), retry {attempt} in {delay:.1f}s")
+                await asyncio.sleep(delay)
+                continue
+
+            self.rate_limiter.update_from_headers(raw.headers)
+            response = raw.parse()
+            self.rate_limiter.settle(max_tokens, response.usage.output_tokens)
+            return response
+
+    async def _open_stream(self, kwargs: Dict[str, Any], stack: contextlib.AsyncExitStack,
+                           timeout: Optional[float] = None):
+        """Open messages.stream through the rate limiter, retrying transient errors."""
+        max_tokens = kwargs["max_tokens"]
+        input_estimate = self._estimate_input_tokens(kwargs)
+
+        attempt = 0
+        while True:
+            await self.rate_limiter.acquire_async(input_estimate, max_tokens)
+            try:
+                return await stack.enter_async_context(self.client.messages.stream(**kwargs, **self._timeout_kwargs(timeout)))
+            except Exception as e:
+                self.rate_limiter.settle(max_tokens, 0)
+                delay = self.rate_limiter.retry_delay(e, attempt)
+                if delay is None:
+                    raise
+                attempt += 1
+                logger.warning(f"Claude API error ({str(e)}), retry {attempt} in {delay:.1f}s")
+                await asyncio.sleep(delay)
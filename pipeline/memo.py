@@ -0,0 +1,140 @@
+"""
+Step memoization on input fingerprints.
+
+A step's fingerprint covers everything its output depends on: the
+PipelineState fields it declares in `reads`, the text of the prompts it
+uses, the model and temperature of its client and any memo_options the
+step declares. When a case is regenerated and a step's
+fingerprint matches a previous run, the stored outputs (its declared
+`writes` plus the step_outputs entries it made) are restored instead of
+running the step. Editing 02-writing.md, for example, reuses extraction and
+reruns everything from writing on.
+
+Memos are kept per case in <output>/<case>/memo.json.
+"""
+import hashlib
+import json
+import os
+import tempfile
+from pathlib import Path
+from typing import Any, Dict, Optional
+import logging
+
+from pipeline.core import PipelineState, PipelineStep, sanitize_case_name
+from pipeline.models import to_data
+
+logger = logging.getLogger(__name__)
+
+MEMO_FILENAME = "memo.json"
+
+# Oldest entries are dropped beyond this many per case
+MAX_MEMO_ENTRIES = 50
+
+
+class StepMemo:
+    """Stored step outputs for one case, keyed by input fingerprint."""
+
+    def __init__(self, path: Path):
+        """
+        Initialize memo, loading any entries saved by earlier runs.
+
+        Args:
+            path: memo.json file for the case
+        """
+        self.path = Path(path)
+        self.entries: Dict[str, Dict[str, Any]] = {}
+
+        if self.path.exists():
+            try:
+                with open(self.path, 'r', encoding='utf-8') as f:
+                    self.entries = json.load(f)
+            except (OSError, ValueError) as e:
+                logger.warning(f"Ignoring unreadable step memo {self.path}: {str(e)}")
+
+    @classmethod
+    def for_case(cls, output_path: str, case_name: str) -> "StepMemo":
+        """Open the memo for a case (next to its Word documents)."""
+        return cls(Path(output_path) / sanitize_case_name(case_name) / MEMO_FILENAME)
+
+    @staticmethod
+    def fingerprint(step: PipelineStep, state: PipelineState) -> Optional[str]:
+        """
+        Hash a step's inputs.
+
+        Returns:
+            Hex digest, or None if the step doesn't declare its reads and so
+            can't be memoized
+        """
+        if step.reads is None:
+            return None
+
+        prompt_loader = getattr(step, "prompt_loader", None)
+        payload = {
+            "step": type(step).__name__,
+            "model": getattr(getattr(step, "client", None), "model", None),
+            "temperature": getattr(getattr(step, "client", None), "temperature", None),
+            "options": getattr(step, "memo_options", None),
+            "prompts": {name: prompt_loader.fingerprint(name) for name in step.prompt_names}
+                       if prompt_loader else {},
+            "inputs": {name: to_data(getattr(state, name)) for name in step.reads},
+        }
+        data = json.dumps(payload, sort_keys=True, ensure_ascii=False, default=str)
+        return hashlib.sha256(data.encode('utf-8')).hexdigest()
+
+    def restore(self, fingerprint: str, step: PipelineStep, state: PipelineState) -> bool:
+        """
+        Apply stored outputs for a fingerprint to the state.
+
+        Returns:
+            True if there was an entry and it was applied
+        """
+        entry = self.entries.get(fingerprint)
+        if entry is None:
+            return False
+
+        for name, value in entry["writes"].items():
+            setattr(state, name, value)
+        state.step_outputs.update(entry["step_outputs"])
+
+        # Re-insert so the entry counts as recently used
+        self.entries[fingerprint] = self.entries.pop(fingerprint)
+        return True
+
+    def store(self, fingerprint: str, step: PipelineStep, state: PipelineState,
+              step_outputs_before: Dict[str, Any]) -> None:
+        """
+        Record a step's outputs after it ran.
+
+        Args:
+            fingerprint: Fingerprint of the step's inputs
+            step: Step that ran
+            state: State after the step
+            step_outputs_before: Copy of state.step_outputs from before the step
+        """
+        self.entries.pop(fingerprint, None)
+        self.entries[fingerprint] = {
+            "step": step.name,
+            "writes": {name: to_data(getattr(state, name)) for name in step.writes},
+            "step_outputs": {
+                key: value for key, value in state.step_outputs.items()
+                if key not in step_outputs_before or step_outputs_before[key] is not value
+            },
+        }
+
+        while len(self.entries) > MAX_MEMO_ENTRIES:
+            del self.entries[next(iter(self.entries))]
+
+    def save(self) -> None:
+        """Write the memo to disk atomically. Failures are logged, not raised."""
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(dir=self.path.parent, suffix=".tmp")
+            try:
+                with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                    json.dump(self.entries, f, ensure_ascii=False)
+                os.replace(tmp_path, self.path)
+            except BaseException:
+                os.unlink(tmp_path)
+                raise
+        except (OSError, TypeError, ValueError) as e:
+            logger.warning(f"Failed to save step memo {self.path}: {str(e)}")
@@ -0,0 +1,226 @@
+"""
+Typed models for extracted components and evaluation reports.
+
+PipelineState holds these instead of plain dicts, so steps read attributes
+rather than probing keys with defaults. They are slotted dataclasses: a
+batch run keeps one of each per case and per evaluation, and slots keep
+them small.
+
+from_dict() is the single place raw data (LLM tool input, checkpoints,
+memos) is validated. It coerces rather than rejects, since a slightly off
+response is still worth using: missing or blank text becomes MISSING, a
+task list given as one string becomes a list, findings become lists of
+strings. to_dict() gives back the JSON layout the prompts and the
+checkpoint files have always used.
+"""
+import json
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional
+
+MISSING = "MISSING"
+
+# Findings that trigger a revision; the rest are warnings
+BLOCKING_CATEGORIES = ("unsupported_statements", "uncertain_statements", "missing_elements")
+WARNING_CATEGORIES = ("passive_voice_issues", "ing_word_issues")
+
+
+def is_missing(value: Any) -> bool:
+    """Return True for None, blank text, "MISSING" or a list with nothing else in it."""
+    if value is None:
+        return True
+    if isinstance(value, str):
+        return not value.strip() or value.strip().upper() == MISSING
+    if isinstance(value, list):
+        return all(is_missing(item) for item in value)
+    return False
+
+
+def _text(value: Any) -> str:
+    if is_missing(value):
+        return MISSING
+    if isinstance(value, list):
+        return "\n\n".join(str(item).strip() for item in value if not is_missing(item))
+    return str(value).strip()
+
+
+def _strings(value: Any) -> List[str]:
+    if is_missing(value):
+        return []
+    if not isinstance(value, list):
+        value = [value]
+    return [str(item).strip() for item in value if not is_missing(item)]
+
+
+@dataclass(slots=True)
+class Components:
+    """Affidavit components extracted from the interview notes."""
+    trafficker_identity: str = MISSING
+    tasks: List[str] = field(default_factory=list)
+    forced_labor_abuse: str = MISSING
+    force_fraud_coercion: str = MISSING
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "Components":
+        """
+        Validate extracted components. Unknown keys are dropped.
+
+        Raises:
+            TypeError: If data isn't a dict
+        """
+        if not isinstance(data, dict):
+            raise TypeError(f"Expected components as a dict, got {type(data).__name__}")
+        return cls(
+            trafficker_identity=_text(data.get("trafficker_identity")),
+            tasks=_strings(data.get("tasks")),
+            forced_labor_abuse=_text(data.get("forced_labor_abuse")),
+            force_fraud_coercion=_text(data.get("force_fraud_coercion")),
+        )
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Return the extraction JSON layout; an empty task list is "MISSING"."""
+        return {
+            "trafficker_identity": self.trafficker_identity,
+            "tasks": list(self.tasks) if self.tasks else MISSING,
+            "forced_labor_abuse": self.forced_labor_abuse,
+            "force_fraud_coercion": self.force_fraud_coercion,
+        }
+
+    @classmethod
+    def from_json(cls, text: str) -> "Components":
+        return cls.from_dict(json.loads(text))
+
+    def to_json(self) -> str:
+        return json.dumps(self.to_dict(), separators=(",", ":"), ensure_ascii=False)
+
+    def missing(self) -> List[str]:
+        """Return the names of components the notes didn't provide."""
+        return [name for name, value in self.to_dict().items() if is_missing(value)]
+
+
+@dataclass(slots=True)
+class SentenceScore:
+    """Grounding index score of one draft sentence (see pipeline.grounding)."""
+    sentence: str
+    score: float
+    pre_verified: bool
+    unknown_details: List[str] = field(default_factory=list)
+
+
+@dataclass(slots=True)
+class GroundingScores:
+    """Per-sentence grounding index scores, kept for the report."""
+    threshold: float
+    sentences: List[SentenceScore] = field(default_factory=list)
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "GroundingScores":
+        return cls(
+            threshold=float(data.get("threshold", 0.0)),
+            sentences=[
+                SentenceScore(
+                    sentence=str(s["sentence"]),
+                    score=float(s["score"]),
+                    pre_verified=bool(s["pre_verified"]),
+                    unknown_details=_strings(s.get("unknown_details")),
+                )
+                for s in data.get("sentences") or []
+            ],
+        )
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "threshold": self.threshold,
+            "sentences": [
+                {"sentence": s.sentence, "score": s.score, "pre_verified": s.pre_verified,
+                 "unknown_details": list(s.unknown_details)}
+                for s in self.sentences
+            ],
+        }
+
+
+@dataclass(slots=True)
+class EvaluationReport:
+    """Merged findings of one evaluation of a draft."""
+    unsupported_statements: List[str] = field(default_factory=list)
+    uncertain_statements: List[str] = field(default_factory=list)
+    missing_elements: List[str] = field(default_factory=list)
+    passive_voice_issues: List[str] = field(default_factory=list)
+    ing_word_issues: List[str] = field(default_factory=list)
+    needs_revision: bool = True
+    summary: str = ""
+    grounding: Optional[GroundingScores] = None  # Report only; left out of prompts
+    error: Optional[str] = None  # Set when a check failed; the draft then needs revision
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "EvaluationReport":
+        """
+        Validate an evaluation report. Unknown keys are dropped.
+
+        Raises:
+            TypeError: If data isn't a dict
+        """
+        if not isinstance(data, dict):
+            raise TypeError(f"Expected an evaluation report as a dict, got {type(data).__name__}")
+        grounding = data.get("grounding")
+        return cls(
+            unsupported_statements=_strings(data.get("unsupported_statements")),
+            uncertain_statements=_strings(data.get("uncertain_statements")),
+            missing_elements=_strings(data.get("missing_elements")),
+            passive_voice_issues=_strings(data.get("passive_voice_issues")),
+            ing_word_issues=_strings(data.get("ing_word_issues")),
+            needs_revision=bool(data.get("needs_revision", True)),
+            summary=str(data.get("summary") or ""),
+            grounding=GroundingScores.from_dict(grounding) if grounding else None,
+            error=data.get("error"),
+        )
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Return the report JSON layout; grounding and error only when set."""
+        data: Dict[str, Any] = {
+            "unsupported_statements": list(self.unsupported_statements),
+            "uncertain_statements": list(self.uncertain_statements),
+            "missing_elements": list(self.missing_elements),
+            "passive_voice_issues": list(self.passive_voice_issues),
+            "ing_word_issues": list(self.ing_word_issues),
+            "needs_revision": self.needs_revision,
+            "summary": self.summary,
+        }
+        if self.grounding is not None:
+            data["grounding"] = self.grounding.to_dict()
+        if self.error is not None:
+            data["error"] = self.error
+        return data
+
+    @classmethod
+    def from_json(cls, text: str) -> "EvaluationReport":
+        return cls.from_dict(json.loads(text))
+
+    def to_json(self) -> str:
+        return json.dumps(self.to_dict(), separators=(",", ":"), ensure_ascii=False)
+
+    def findings(self, category: str) -> List[str]:
+        """Return the findings of one category (e.g. "unsupported_statements")."""
+        return getattr(self, category)
+
+    def blocking_count(self) -> int:
+        """Return the number of findings that trigger a revision."""
+        return sum(len(self.findings(category)) for category in BLOCKING_CATEGORIES)
+
+    @property
+    def all_supported(self) -> bool:
+        """True if no statement was flagged as unsupported or uncertain."""
+        return not self.unsupported_statements and not self.uncertain_statements
+
+
+# State fields holding a model, and the model each is validated as
+MODEL_FIELDS = {
+    "extracted_components": Components,
+    "evaluation_report": EvaluationReport,
+}
+
+
+def to_data(value: Any) -> Any:
+    """Return JSON-compatible data for a model; other values are returned unchanged."""
+    if isinstance(value, (Components, EvaluationReport)):
+        return value.to_dict()
+    return value
@@ -0,0 +1,250 @@
+"""
+Process-wide rate limiting and retry scheduling for Claude API calls.
+
+Anthropic's limits apply per model, so clients share one RateLimiter per
+model (see get_rate_limiter()). Each tracks requests, input tokens and
+output tokens per minute as token buckets. Callers wait in line for budget instead of failing, the buckets
+are re-synced from the API's rate-limit response headers, and rate-limit
+(429) and overload (529) errors are retried with jittered exponential
+backoff that honours retry-after.
+"""
+import asyncio
+import random
+import threading
+import time
+from typing import Dict, Mapping, Optional
+import logging
+
+import anthropic
+
+logger = logging.getLogger(__name__)
+
+# HTTP statuses worth retrying: timeouts, conflicts, rate limits, server errors, overload
+RETRYABLE_STATUS_CODES = {408, 409, 429, 500, 502, 503, 504, 529}
+
+
+class _TokenBucket:
+    """Token bucket refilled continuously at capacity-per-minute."""
+
+    def __init__(self, per_minute: float):
+        self.capacity = float(per_minute)
+        self.tokens = float(per_minute)
+        self.updated = time.monotonic()
+
+    def refill(self, now: float) -> None:
+        elapsed = now - self.updated
+        self.tokens = min(self.capacity, self.tokens + elapsed * self.capacity / 60.0)
+        self.updated = now
+
+    def wait_time(self, amount: float) -> float:
+        """Seconds until `amount` tokens are available (0 if available now)."""
+        # A single request larger than the whole bucket only needs a full bucket
+        amount = min(amount, self.capacity)
+        if self.tokens >= amount:
+            return 0.0
+        return (amount - self.tokens) * 60.0 / self.capacity
+
+
+class RateLimiter:
+    """
+    Token-bucket limiter for requests, input tokens and output tokens per minute.
+
+    Thread-safe; acquire() blocks a thread and acquire_async() suspends a
+    coroutine until the request fits within all three budgets.
+    """
+
+    def __init__(self, requests_per_minute: int = 1000,
+                 input_tokens_per_minute: int = 450000,
+                 output_tokens_per_minute: int = 90000,
+                 max_retries: int = 6, retry_base_seconds: float = 1.0,
+                 retry_max_seconds: float = 60.0):
+        """
+        Initialize rate limiter.
+
+        Args:
+            requests_per_minute: Initial request budget (updated from response headers)
+            input_tokens_per_minute: Initial input token budget (updated from response headers)
+            output_tokens_per_minute: Initial output token budget (updated from response headers)
+            max_retries: Retries per call before the error is raised
+            retry_base_seconds: Backoff for the first retry; doubles per attempt
+            retry_max_seconds: Upper bound for a single backoff
+        """
+        self.requests = _TokenBucket(requests_per_minute)
+        self.input_tokens = _TokenBucket(input_tokens_per_minute)
+        self.output_tokens = _TokenBucket(output_tokens_per_minute)
+        self.max_retries = max_retries
+        self.retry_base_seconds = retry_base_seconds
+        self.retry_max_seconds = retry_max_seconds
+
+        self._blocked_until = 0.0
+        self._lock = threading.Lock()
+
+    def _reserve(self, input_tokens: int, output_tokens: int) -> float:
+        """Take budget if available; otherwise return seconds to wait before retrying."""
+        with self._lock:
+            now = time.monotonic()
+            if now < self._blocked_until:
+                return self._blocked_until - now
+
+            for bucket in (self.requests, self.input_tokens, self.output_tokens):
+                bucket.refill(now)
+
+            wait = max(
+                self.requests.wait_time(1),
+                self.input_tokens.wait_time(input_tokens),
+                self.output_tokens.wait_time(output_tokens),
+            )
+            if wait > 0:
+                return wait
+
+            self.requests.tokens -= 1
+            self.input_tokens.tokens -= min(input_tokens, self.input_tokens.capacity)
+            self.output_tokens.tokens -= min(output_tokens, self.output_tokens.capacity)
+            return 0.0
+
+    def acquire(self, input_tokens: int, output_tokens: int) -> None:
+        """
+        Block until a request fits within the budgets, then reserve it.
+
+        Args:
+            input_tokens: Estimated input tokens for the request
+            output_tokens: Output tokens to reserve (max_tokens of the request)
+        """
+        waited = 0.0
+        while True:
+            wait = self._reserve(input_tokens, output_tokens)
+            if wait <= 0:
+                break
+            waited += wait
+            time.sleep(wait)
+
+        if waited > 1.0:
+            logger.info(f"Rate limiter queued request for {waited:.1f}s")
+
+    async def acquire_async(self, input_tokens: int, output_tokens: int) -> None:
+        """Async version of acquire()."""
+        waited = 0.0
+        while True:
+            wait = self._reserve(input_tokens, output_tokens)
+            if wait <= 0:
+                break
+            waited += wait
+            await asyncio.sleep(wait)
+
+        if waited > 1.0:
+            logger.info(f"Rate limiter queued request for {waited:.1f}s")
+
+    def settle(self, reserved_output_tokens: int, actual_output_tokens: int) -> None:
+        """Return the unused part of an output token reservation."""
+        unused = reserved_output_tokens - actual_output_tokens
+        if unused <= 0:
+            return
+        with self._lock:
+            self.output_tokens.tokens = min(
+                self.output_tokens.capacity, self.output_tokens.tokens + unused
+            )
+
+    def update_from_headers(self, headers: Mapping[str, str]) -> None:
+        """
+        Sync budgets with the anthropic-ratelimit-* response headers.
+
+        Capacities follow the account's actual limits, and available tokens
+        never exceed what the server says remains.
+        """
+        with self._lock:
+            now = time.monotonic()
+            for name, bucket in (("requests", self.requests),
+                                 ("input-tokens", self.input_tokens),
+                                 ("output-tokens", self.output_tokens)):
+                limit = _int_header(headers, f"anthropic-ratelimit-{name}-limit")
+                remaining = _int_header(headers, f"anthropic-ratelimit-{name}-remaining")
+
+                bucket.refill(now)
+                if limit:
+                    bucket.capacity = float(limit)
+                if remaining is not None:
+                    bucket.tokens = min(bucket.tokens, float(remaining))
+
+    def retry_delay(self, error: Exception, attempt: int) -> Optional[float]:
+        """
+        Decide whether and when to retry a failed call.
+
+        A retry-after on a rate-limit error also pauses every other caller
+        of this limiter, since the account is over its limit for the model.
+
+        Args:
+            error: Exception raised by the API call
+            attempt: Number of retries already made for this call
+
+        Returns:
+            Seconds to wait before retrying, or None to give up and raise
+        """
+        if attempt >= self.max_retries or not is_retryable(error):
+            return None
+
+        backoff = min(self.retry_max_seconds, self.retry_base_seconds * (2 ** attempt))
+        delay = backoff * random.uniform(0.5, 1.5)  # Jitter so queued callers don't stampede
+
+        retry_after = _retry_after_seconds(error)
+        if retry_after is not None:
+            delay = max(delay, retry_after)
+            if getattr(error, "status_code", None) == 429:
+                with self._lock:
+                    self._blocked_until = max(self._blocked_until, time.monotonic() + retry_after)
+
+        return delay
+
+
+def is_retryable(error: Exception) -> bool:
+    """Return True for transient API errors (connection problems, 429, 5xx, 529)."""
+    if isinstance(error, (anthropic.APIConnectionError, anthropic.APITimeoutError)):
+        return True
+    if isinstance(error, anthropic.APIStatusError):
+        return error.status_code in RETRYABLE_STATUS_CODES
+    return False
+
+
+def _retry_after_seconds(error: Exception) -> Optional[float]:
+    """Read the retry-after header from an API error, if present."""
+    response = getattr(error, "response", None)
+    if response is None:
+        return None
+    try:
+        return float(response.headers.get("retry-after"))
+    except (TypeError, ValueError):
+        return None
+
+
+def _int_header(headers: Mapping[str, str], name: str) -> Optional[int]:
+    """Parse an integer header, returning None if missing or malformed."""
+    try:
+        return int(headers.get(name))
+    except (TypeError, ValueError):
+        return None
+
+
+_shared_limiters: Dict[str, RateLimiter] = {}
+_shared_lock = threading.Lock()
+
+
+def get_rate_limiter(model: str = "") -> RateLimiter:
+    """
+    Return the process-wide rate limiter for a model, creating it from settings on first use.
+
+    Every model starts from the same configured budgets; the response
+    headers of its first call bring them in line with that model's limits
+    without touching the other models' limiters.
+
+    Args:
+        model: Model the calls are made with
+    """
+    with _shared_lock:
+        if model not in _shared_limiters:
+            from config import settings
+            _shared_limiters[model] = RateLimiter(
+                requests_per_minute=settings.RATE_LIMIT_REQUESTS_PER_MINUTE,
+                input_tokens_per_minute=settings.RATE_LIMIT_INPUT_TOKENS_PER_MINUTE,
+                output_tokens_per_minute=settings.RATE_LIMIT_OUTPUT_TOKENS_PER_MINUTE,
+                max_retries=settings.API_MAX_RETRIES,
+            )
+        return _shared_limiters[model]
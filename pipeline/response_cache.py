@@ -0,0 +1,205 @@
+"""
+Persistent on-disk cache for Claude API responses.
+
+Responses are stored as small JSON files named by a content hash of the
+request (model, prompt, system prompt, max_tokens, temperature), so
+re-running a case after a crash replays completed calls locally instead of
+paying for them again.
+"""
+import hashlib
+import json
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class ResponseCache:
+    """
+    Content-addressed response cache with size-bounded LRU eviction.
+
+    Entries live under cache_dir/<first two hex chars>/<key>.json. File
+    modification time doubles as the last-access time, so recency survives
+    process restarts without a separate index file.
+    """
+
+    def __init__(self, cache_dir: str, max_bytes: int = 200 * 1024 * 1024,
+                 enabled: bool = True):
+        """
+        Initialize response cache.
+
+        Args:
+            cache_dir: Directory where cache entries are stored
+            max_bytes: Total size limit; least recently used entries are evicted beyond it
+            enabled: Set to False to bypass the cache entirely
+        """
+        self.cache_dir = Path(cache_dir)
+        self.max_bytes = max_bytes
+        self.enabled = enabled
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._lock = threading.Lock()
+        self._total_bytes: Optional[int] = None  # Computed lazily on first write
+
+    @staticmethod
+    def make_key(model: str, prompt: Any, system: Optional[str],
+                 max_tokens: int, temperature: float, tool: Optional[Dict[str, Any]] = None) -> str:
+        """
+        Build the cache key for a request.
+
+        Args:
+            model: Claude model name
+            prompt: User prompt (string or list of content blocks)
+            system: Optional system prompt
+            max_tokens: Maximum tokens requested
+            temperature: Sampling temperature
+            tool: Tool the model is made to call, if any
+
+        Returns:
+            Hex SHA-256 digest identifying the request
+        """
+        request = {
+            "model": model,
+            "prompt": prompt,
+            "system": system,
+            "max_tokens": max_tokens,
+            "temperature": temperature,
+        }
+        if tool is not None:
+            # Only added when set, so keys of plain text calls are unchanged
+            request["tool"] = tool
+        payload = json.dumps(
+            request,
+            sort_keys=True,
+            ensure_ascii=False,
+        )
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def get(self, key: str) -> Optional[str]:
+        """
+        Look up a cached response.
+
+        Args:
+            key: Cache key from make_key()
+
+        Returns:
+            Cached response text, or None on a miss
+        """
+        if not self.enabled:
+            return None
+
+        path = self._entry_path(key)
+        with self._lock:
+            try:
+                with open(path, 'r', encoding='utf-8') as f:
+                    entry = json.load(f)
+                # Touch the file so eviction treats it as recently used
+                os.utime(path, None)
+            except (OSError, ValueError):
+                self.misses += 1
+                return None
+
+            self.hits += 1
+
+        logger.debug(f"Response cache hit: {key[:12]}")
+        return entry.get("text")
+
+    def put(self, key: str, text: str, model: str = "") -> None:
+        """
+        Store a response in the cache.
+
+        Args:
+            key: Cache key from make_key()
+            text: Response text to store
+            model: Model that produced the response (informational)
+        """
+        if not self.enabled:
+            return
+
+        path = self._entry_path(key)
+        data = json.dumps(
+            {"text": text, "model": model, "created": time.time()},
+            ensure_ascii=False,
+        )
+
+        with self._lock:
+            try:
+                path.parent.mkdir(parents=True, exist_ok=True)
+                old_size = path.stat().st_size if path.exists() else 0
+
+                # Write atomically so a crash never leaves a half-written entry
+                tmp_path = path.with_suffix(".tmp")
+                with open(tmp_path, 'w', encoding='utf-8') as f:
+                    f.write(data)
+                os.replace(tmp_path, path)
+
+                if self._total_bytes is None:
+                    self._total_bytes = sum(size for _, size, _ in self._scan())
+                else:
+                    self._total_bytes += path.stat().st_size - old_size
+
+                if self._total_bytes > self.max_bytes:
+                    self._evict()
+            except OSError as e:
+                # A cache write failure must never fail the pipeline
+                logger.warning(f"Failed to write response cache entry: {str(e)}")
+
+    def stats(self) -> Dict[str, int]:
+        """Return hit/miss/eviction counters."""
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+            }
+
+    def clear(self) -> None:
+        """Remove all cache entries."""
+        with self._lock:
+            for path, _, _ in self._scan():
+                try:
+                    path.unlink()
+                except OSError:
+                    pass
+            self._total_bytes = 0
+
+    def _entry_path(self, key: str) -> Path:
+        """Map a cache key to its file path."""
+        return self.cache_dir / key[:2] / f"{key}.json"
+
+    def _scan(self) -> List[Tuple[Path, int, float]]:
+        """List (path, size, mtime) for all entries."""
+        entries = []
+        if not self.cache_dir.exists():
+            return entries
+
+        for path in self.cache_dir.glob("*/*.json"):
+            try:
+                st = path.stat()
+            except OSError:
+                continue
+            entries.append((path, st.st_size, st.st_mtime))
+        return entries
+
+    def _evict(self) -> None:
+        """Delete least recently used entries until under the size limit (lock held)."""
+        entries = sorted(self._scan(), key=lambda e: e[2])
+        total = sum(size for _, size, _ in entries)
+
+        for path, size, _ in entries:
+            if total <= self.max_bytes:
+                break
+            try:
+                path.unlink()
+            except OSError:
+                continue
+            total -= size
+            self.evictions += 1
+
+        self._total_bytes = total
+        logger.debug(f"Response cache evicted entries, now {total} bytes")
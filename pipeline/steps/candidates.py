@@ -0,0 +1,224 @@
+"""
+Candidate drafts step - writes several drafts concurrently and keeps the best.
+
+Trades tokens for wall-clock time: instead of one draft followed by serial
+revisions, N drafts are written at a higher temperature (so they differ)
+and evaluated at the same time. The draft with the fewest blocking issues
+is carried forward with its evaluation, and the revision loop starts from
+there - or doesn't start at all if a candidate passed.
+"""
+import asyncio
+import dataclasses
+from typing import Any, Dict, List, Optional, Tuple
+import logging
+from pipeline.core import PipelineStep, PipelineState, PipelineError, ErrorSeverity
+from pipeline.models import EvaluationReport
+from pipeline.steps.evaluator import EvaluatorStep
+from pipeline.steps.writer import WriterStep
+from pipeline.usage import usage_scope
+
+logger = logging.getLogger(__name__)
+
+
+class CandidateDraftsStep(PipelineStep):
+    """Writes and evaluates candidate drafts concurrently, keeping the best one."""
+
+    reads = ("extracted_components", "case_specifics")
+    writes = ("draft_text", "evaluation_report", "draft_candidates")
+
+    def __init__(self, write_step: WriterStep, eval_step: EvaluatorStep, count: int,
+                 temperature: float):
+        """
+        Args:
+            write_step: Writer used for every candidate; it should sample at
+                a temperature above 0.0 or the candidates come out identical
+            eval_step: Evaluator used for every candidate
+            count: Number of candidate drafts
+            temperature: Sampling temperature the candidates are written at
+        """
+        self.write_step = write_step
+        self.eval_step = eval_step
+        self.count = max(1, count)
+        self.temperature = temperature
+
+        # For StepMemo: the writer's client and prompts, plus the evaluation's
+        self.client = write_step.client
+        self.prompt_loader = write_step.prompt_loader
+        self.prompt_names = write_step.prompt_names + eval_step.prompt_names
+
+    @property
+    def name(self) -> str:
+        return "Writing candidate drafts"
+
+    @property
+    def memo_options(self) -> Dict[str, Any]:
+        """Settings besides the inputs that change this step's output (see StepMemo)."""
+        return {
+            "count": self.count,
+            "temperature": self.temperature,
+            "evaluation_model": getattr(self.eval_step.client, "model", None),
+        }
+
+    async def execute_async(self, state: PipelineState) -> PipelineState:
+        """
+        Write and evaluate the candidates, then adopt the best one.
+
+        Updates state.draft_text and state.evaluation_report with the chosen
+        candidate, and state.draft_candidates with every candidate's scores.
+        """
+        logger.info("=" * 60)
+        logger.info(f"STEP 2: WRITING {self.count} CANDIDATE DRAFTS")
+        logger.info("=" * 60)
+
+        if not state.extracted_components:
+            logger.error("ERROR: Cannot write - no components extracted")
+            state.add_error(
+                self.name,
+                ErrorSeverity.CRITICAL,
+                "Cannot write draft: no extracted components available"
+            )
+            return state
+
+        finished = [0]
+
+        async def run(index: int) -> PipelineState:
+            candidate = await self._run_candidate(index, state)
+            finished[0] += 1
+            self.report_progress(f"Evaluated {finished[0]}/{self.count} candidate draft(s)",
+                                 finished[0] / self.count)
+            return candidate
+
+        candidates = await asyncio.gather(*(run(i) for i in range(self.count)))
+
+        scored = [(self._score(candidate), candidate) for candidate in candidates]
+        usable = [(score, c) for score, c in scored if score is not None]
+        if not usable:
+            state.add_error(
+                self.name,
+                ErrorSeverity.CRITICAL,
+                f"All {self.count} candidate drafts failed: "
+                + "; ".join(self._failure(c) for c in candidates)
+            )
+            return state
+
+        best_score, best = min(usable, key=lambda item: item[0])
+        best_index = candidates.index(best)
+
+        state.draft_text = best.draft_text
+        state.evaluation_report = best.evaluation_report
+        state.draft_candidates = [
+            self._summary(i, candidate, i == best_index)
+            for i, candidate in enumerate(candidates)
+        ]
+
+        # Bookkeeping the revision loop expects from the writer and first evaluation
+        state.step_outputs['writing'] = best.draft_text
+        state.step_outputs['evaluation_0'] = best.evaluation_report.to_dict()
+        state.step_outputs['candidate_drafts'] = [c.draft_text for c in candidates]
+
+        # Only the chosen candidate's problems concern the final draft
+        state.errors.extend(best.errors)
+        for i, candidate in enumerate(candidates):
+            if i != best_index and any(e.severity != ErrorSeverity.INFO for e in candidate.errors):
+                state.add_error(
+                    self.name,
+                    ErrorSeverity.WARNING,
+                    f"Candidate {i + 1} discarded: {self._failure(candidate)}"
+                )
+
+        logger.info("")
+        logger.info(f"CANDIDATES COMPLETE: kept candidate {best_index + 1} of {self.count} "
+                    f"({best_score[1]} blocking issue(s))")
+        for entry in state.draft_candidates:
+            logger.info(f"  {'✓' if entry['selected'] else ' '} Candidate {entry['candidate']}: "
+                        f"{self._describe(entry)}")
+        logger.info("")
+
+        return state
+
+    async def _run_candidate(self, index: int, state: PipelineState) -> PipelineState:
+        """
+        Write and evaluate one candidate on its own copy of the state.
+
+        The copy shares llm_calls with the real state, so every call is
+        recorded, but keeps its own errors and step_outputs so candidates
+        don't overwrite each other.
+        """
+        candidate = dataclasses.replace(state, errors=[], step_outputs={})
+        tokens_saved_before = candidate.prompt_tokens_saved
+
+        with usage_scope(state.llm_calls, self.write_step.name, 0):
+            await self.write_step.execute_async(candidate)
+        if candidate.draft_text and not candidate.has_critical_error():
+            with usage_scope(state.llm_calls, self.eval_step.name, 1):
+                await self.eval_step.execute_async(candidate)
+
+        state.prompt_tokens_saved += candidate.prompt_tokens_saved - tokens_saved_before
+        logger.info(f"Candidate {index + 1}/{self.count} finished")
+        return candidate
+
+    @staticmethod
+    def _score(candidate: PipelineState) -> Optional[Tuple[int, int, int]]:
+        """
+        Rank a candidate; lower is better.
+
+        Returns:
+            (failed check, blocking issues, grammar warnings), or None if the
+            candidate has no draft or no evaluation
+        """
+        report = candidate.evaluation_report
+        if not candidate.draft_text or report is None or candidate.has_critical_error():
+            return None
+        warnings = len(report.passive_voice_issues) + len(report.ing_word_issues)
+        return (int(report.error is not None), report.blocking_count(), warnings)
+
+    @staticmethod
+    def _summary(index: int, candidate: PipelineState, selected: bool) -> Dict[str, Any]:
+        """Scores of one candidate for the report."""
+        report: Optional[EvaluationReport] = candidate.evaluation_report
+        entry: Dict[str, Any] = {
+            "candidate": index + 1,
+            "selected": selected,
+            "words": len(candidate.draft_text.split()) if candidate.draft_text else 0,
+        }
+        if report is None:
+            entry["error"] = CandidateDraftsStep._failure(candidate)
+            return entry
+
+        entry.update({
+            "passed": not report.needs_revision,
+            "blocking_issues": report.blocking_count(),
+            "unsupported": len(report.unsupported_statements),
+            "uncertain": len(report.uncertain_statements),
+            "missing": len(report.missing_elements),
+            "grammar_warnings": len(report.passive_voice_issues) + len(report.ing_word_issues),
+        })
+        if report.error:
+            entry["error"] = report.error
+        return entry
+
+    @staticmethod
+    def _describe(entry: Dict[str, Any]) -> str:
+        """One-line description of a candidate's scores."""
+        if "blocking_issues" not in entry:
+            return f"failed ({entry.get('error')})"
+        text = (f"{entry['blocking_issues']} blocking issue(s) ({entry['unsupported']} unsupported, "
+                f"{entry['uncertain']} uncertain, {entry['missing']} missing), "
+                f"{entry['grammar_warnings']} grammar warning(s), {entry['words']} words")
+        if entry["passed"]:
+            text += ", passed evaluation"
+        return text
+
+    @staticmethod
+    def _failure(candidate: PipelineState) -> str:
+        """The most severe error message of a candidate."""
+        errors: List[PipelineError] = sorted(
+            candidate.errors,
+            key=lambda e: list(ErrorSeverity).index(e.severity),
+            reverse=True
+        )
+        if errors:
+            return errors[0].message
+        if candidate.evaluation_report and candidate.evaluation_report.error:
+            return candidate.evaluation_report.error
+        return "no draft was written"
@@ -1,10 +1,23 @@
 """
 Evaluation step - verifies draft against extracted components.
+
+The evaluation runs as independent LLM checks (grounding, structure), each
+with its own smaller prompt, concurrently. Draft sentences that the local
+grounding index (pipeline.grounding) finds well supported are reported as
+pre-verified and left out of the grounding check. The grammar warnings come
+from the local checker in pipeline.grammar. All findings are merged into a
+single evaluation report.
 """
+import asyncio
 import json
+from typing import Any, Dict, List, Optional, Tuple, Union
 import logging
-from pipeline.core import PipelineStep, PipelineState, ErrorSeverity
-from pipeline.llm_client import ClaudeClient, PromptLoader
+from pipeline.core import PipelineStep, PipelineState, ErrorSeverity, size_max_tokens
+from pipeline.grammar import check_grammar
+from pipeline.grounding import GroundingIndex, SUPPORT_THRESHOLD
+from pipeline.llm_client import ClaudeClient, AsyncClaudeClient, PromptLoader
+from pipeline.models import BLOCKING_CATEGORIES, EvaluationReport, GroundingScores, SentenceScore
+from pipeline.structured import generate_structured, make_tool, string_list
 
 logger = logging.getLogger(__name__)
 
@@ -12,15 +25,37 @@ logger = logging.getLogger(__name__)
 class EvaluatorStep(PipelineStep):
     """Evaluates draft affidavit against source components."""
 
-    def __init__(self, client: ClaudeClient, prompt_loader: PromptLoader):
+    reads = ("draft_text", "extracted_components", "case_specifics", "iteration_count")
+    writes = ("evaluation_report",)
+    prompt_names = ("03-evaluation-grounding", "03-evaluation-structure")
+
+    # (check name, prompt, report categories it fills)
+    CHECKS: Tuple[Tuple[str, str, Tuple[str, ...]], ...] = (
+        ("grounding", "03-evaluation-grounding", ("unsupported_statements", "uncertain_statements")),
+        ("structure", "03-evaluation-structure", ("missing_elements",)),
+    )
+
+    # Schema descriptions of the categories the LLM checks fill
+    CATEGORY_DESCRIPTIONS = {
+        "unsupported_statements": "Exact text of statements the source material doesn't support",
+        "uncertain_statements": "Exact text of statements the source only partly or ambiguously supports",
+        "missing_elements": "Required affidavit elements the draft is missing",
+    }
+
+    # Each check quotes flagged statements, at most a fraction of the draft
+    OUTPUT_RATIO = 0.5
+
+    def __init__(self, client: Union[ClaudeClient, AsyncClaudeClient], prompt_loader: PromptLoader):
         self.client = client
         self.prompt_loader = prompt_loader
+        self._grounding_index: Optional[GroundingIndex] = None
+        self._grounding_source: Optional[str] = None
 
     @property
     def name(self) -> str:
         return "Evaluating draft against sources"
 
-    def execute(self, state: PipelineState) -> PipelineState:
+    async def execute_async(self, state: PipelineState) -> PipelineState:
         """
         Evaluate draft for unsupported statements.
 
@@ -50,42 +85,27 @@ class EvaluatorStep(PipelineStep):
             return state
 
         try:
-            # Format inputs
-            components_json = json.dumps(state.extracted_components, indent=2)
-
-            # Load and format prompt
             logger.info("Checking draft for accuracy and quality...")
-            prompt = self.prompt_loader.format(
-                "03-evaluation",
-                components=components_json,
-                draft=state.draft_text,
-                case_specifics=state.case_specifics or "None provided"
-            )
-
-            # Call LLM
-            response = self.client.generate(prompt, max_tokens=4096)
-
-            # Parse evaluation report
-            evaluation = self._parse_response(response)
+            evaluation = await self._evaluate(state)
 
             # Store evaluation
             state.evaluation_report = evaluation
-            state.step_outputs[f'evaluation_{state.iteration_count}'] = evaluation
+            state.step_outputs[f'evaluation_{state.iteration_count}'] = evaluation.to_dict()
 
             # Log findings
             logger.info("")
 
             # Count issues
-            unsupported = len(evaluation.get('unsupported_statements', []))
-            uncertain = len(evaluation.get('uncertain_statements', []))
-            passive = len(evaluation.get('passive_voice_issues', []))
-            ing = len(evaluation.get('ing_word_issues', []))
-            missing = len(evaluation.get('missing_elements', []))
+            unsupported = len(evaluation.unsupported_statements)
+            uncertain = len(evaluation.uncertain_statements)
+            passive = len(evaluation.passive_voice_issues)
+            ing = len(evaluation.ing_word_issues)
+            missing = len(evaluation.missing_elements)
 
-            blocking_issues = unsupported + uncertain + missing
+            blocking_issues = evaluation.blocking_count()
             grammar_warnings = passive + ing
 
-            if not evaluation.get('needs_revision', True):
+            if not evaluation.needs_revision:
                 logger.info("✓ EVALUATION COMPLETE: Draft approved!")
                 if grammar_warnings > 0:
                     logger.info(f"  {grammar_warnings} grammar warnings present (non-blocking)")
@@ -112,23 +132,6 @@ class EvaluatorStep(PipelineStep):
                 logger.info("  → Will revise and check again")
             logger.info("")
 
-        except json.JSONDecodeError as e:
-            state.add_error(
-                self.name,
-                ErrorSeverity.ERROR,
-                f"Failed to parse evaluation JSON: {str(e)}",
-                e
-            )
-            # Create a safe default to allow pipeline to continue
-            state.evaluation_report = {
-                'needs_revision': True,
-                'unsupported_statements': [],
-                'uncertain_statements': [],
-                'passive_voice_issues': [],
-                'ing_word_issues': [],
-                'missing_elements': [],
-                'error': str(e)
-            }
         except Exception as e:
             state.add_error(
                 self.name,
@@ -139,18 +142,160 @@ class EvaluatorStep(PipelineStep):
 
         return state
 
-    def _parse_response(self, response: str) -> dict:
-        """Parse LLM evaluation response to extract JSON."""
-        # Try to extract JSON from markdown code blocks if present
-        if "```json" in response:
-            start = response.find("```json") + 7
-            end = response.find("```", start)
-            json_str = response[start:end].strip()
-        elif "```" in response:
-            start = response.find("```") + 3
-            end = response.find("```", start)
-            json_str = response[start:end].strip()
-        else:
-            json_str = response.strip()
-
-        return json.loads(json_str)
+    async def _evaluate(self, state: PipelineState) -> EvaluationReport:
+        """
+        Run the LLM checks concurrently and merge their findings with the local grammar check.
+
+        A check whose response can't be parsed is recorded as an error; its
+        categories stay empty and the draft is sent for revision, so a
+        failed check never approves a draft.
+
+        Returns:
+            Evaluation report
+        """
+        components_text = state.prompt_data("extracted_components")
+        supports = self._grounding(components_text, state).score_draft(state.draft_text)
+        to_check = [s.sentence for s in supports if not s.pre_verified]
+        logger.info(
+            f"Grounding index pre-verified {len(supports) - len(to_check)}/{len(supports)} sentences; "
+            f"{len(to_check)} left for the grounding check"
+        )
+
+        variables = {
+            "components": components_text,
+            "trafficker_identity": state.extracted_components.trafficker_identity,
+            "case_specifics": state.case_specifics or "None provided",
+            "draft": state.draft_text,
+            "statements": "\n".join(f"- {sentence}" for sentence in to_check),
+        }
+
+        streamed = self._streamed_grounding(state)
+
+        async def run_check(check: str, prompt_name: str) -> Dict[str, Any]:
+            checked_text = state.draft_text
+            if check == "grounding":
+                if streamed is not None:
+                    logger.info("Using grounding results gathered while the draft was written")
+                    return streamed
+                if not to_check:
+                    return {"summary": "Every sentence matched the source material locally."}
+                checked_text = variables["statements"]
+
+            prompt = self.prompt_loader.format_blocks(
+                prompt_name, dynamic_fields=("draft", "statements"), **variables
+            )
+            max_tokens = size_max_tokens(checked_text, self.OUTPUT_RATIO, maximum=4096)
+            return await generate_structured(
+                self.client, prompt, self._check_tool(check), max_tokens, self.prompt_loader
+            )
+
+        results = await asyncio.gather(
+            *(run_check(check, prompt_name) for check, prompt_name, _ in self.CHECKS),
+            return_exceptions=True
+        )
+
+        findings: Dict[str, Any] = {}
+        summaries: List[str] = []
+        errors: List[str] = []
+
+        for (check, _, categories), result in zip(self.CHECKS, results):
+            if isinstance(result, json.JSONDecodeError):
+                state.add_error(
+                    self.name,
+                    ErrorSeverity.ERROR,
+                    f"Failed to parse {check} evaluation JSON: {str(result)}",
+                    result
+                )
+                errors.append(f"{check}: {str(result)}")
+                result = {}
+            elif isinstance(result, BaseException):
+                raise result
+
+            for category in categories:
+                findings[category] = result.get(category)
+            if result.get("summary"):
+                summaries.append(f"{check.capitalize()}: {result['summary']}")
+
+        grammar = check_grammar(state.draft_text)
+        findings.update(grammar)
+        summaries.append(
+            f"Grammar: {len(grammar['passive_voice_issues'])} passive voice and "
+            f"{len(grammar['ing_word_issues'])} -ing warning(s)."
+        )
+
+        evaluation = EvaluationReport.from_dict(findings)
+        evaluation.needs_revision = bool(errors) or any(
+            evaluation.findings(category) for category in BLOCKING_CATEGORIES
+        )
+        evaluation.summary = " ".join(summaries)
+        evaluation.grounding = GroundingScores(
+            threshold=SUPPORT_THRESHOLD,
+            sentences=[
+                SentenceScore(s.sentence, s.score, s.pre_verified, s.unknown_details)
+                for s in supports
+            ],
+        )
+        if errors:
+            evaluation.error = "; ".join(errors)
+
+        return evaluation
+
+    async def check_paragraph(self, paragraph: str, state: PipelineState) -> Dict[str, Any]:
+        """
+        Run the grounding check on one paragraph.
+
+        Used by WriterStep to check paragraphs while the rest of the draft is
+        still being generated.
+
+        Returns:
+            Dict with "unsupported_statements" and "uncertain_statements"
+
+        Raises:
+            json.JSONDecodeError: If the response isn't a valid JSON object,
+                even after repair and a reformat call
+        """
+        components_text = state.prompt_data("extracted_components")
+        supports = self._grounding(components_text, state).score_draft(paragraph)
+        to_check = [s.sentence for s in supports if not s.pre_verified]
+        if not to_check:
+            return {"unsupported_statements": [], "uncertain_statements": []}
+
+        statements = "\n".join(f"- {sentence}" for sentence in to_check)
+        prompt = self.prompt_loader.format_blocks(
+            "03-evaluation-grounding",
+            dynamic_fields=("statements",),
+            components=components_text,
+            case_specifics=state.case_specifics or "None provided",
+            statements=statements
+        )
+        max_tokens = size_max_tokens(statements, self.OUTPUT_RATIO, maximum=4096)
+        return await generate_structured(
+            self.client, prompt, self._check_tool("grounding"), max_tokens, self.prompt_loader
+        )
+
+    def _streamed_grounding(self, state: PipelineState) -> Optional[Dict[str, Any]]:
+        """
+        Return grounding results WriterStep gathered for the current draft, if any.
+
+        They only apply to the exact draft they were gathered for, checked
+        with the current grounding prompt.
+        """
+        entry = state.step_outputs.get('streamed_grounding')
+        if (not entry or entry.get('draft') != state.draft_text
+                or entry.get('prompt') != self.prompt_loader.fingerprint("03-evaluation-grounding")):
+            return None
+        return entry['result']
+
+    def _grounding(self, components_text: str, state: PipelineState) -> GroundingIndex:
+        """Return the grounding index for the components, building it on first use."""
+        if self._grounding_index is None or self._grounding_source != components_text:
+            self._grounding_index = GroundingIndex(state.extracted_components.to_dict())
+            self._grounding_source = components_text
+        return self._grounding_index
+
+    def _check_tool(self, check: str) -> Dict[str, Any]:
+        """Return the tool the LLM calls to record one check's findings."""
+        categories = next(c for name, _, c in self.CHECKS if name == check)
+        properties = {category: string_list(self.CATEGORY_DESCRIPTIONS[category]) for category in categories}
+        properties["summary"] = {"type": "string", "description": "One or two sentences on the findings"}
+        return make_tool(f"record_{check}_findings", f"Record the findings of the {check} check.", properties)
@@ -1,11 +1,15 @@
 """
 Component extraction step - extracts structured components from interview notes.
 """
+import asyncio
 import json
-from typing import Dict, Any
+from typing import Dict, Any, List, Union
 import logging
-from pipeline.core import PipelineStep, PipelineState, ErrorSeverity
-from pipeline.llm_client import ClaudeClient, PromptLoader
+from pipeline.chunking import merge_components, split_notes
+from pipeline.core import PipelineStep, PipelineState, ErrorSeverity, size_max_tokens
+from pipeline.llm_client import ClaudeClient, AsyncClaudeClient, PromptLoader
+from pipeline.models import Components, is_missing
+from pipeline.structured import generate_structured, make_tool
 
 logger = logging.getLogger(__name__)
 
@@ -13,7 +17,43 @@ logger = logging.getLogger(__name__)
 class ExtractorStep(PipelineStep):
     """Extracts affidavit components from raw interview notes."""
 
-    def __init__(self, client: ClaudeClient, prompt_loader: PromptLoader):
+    reads = ("raw_notes",)
+    writes = ("extracted_components",)
+    prompt_names = ("01-extraction",)
+
+    # Extraction JSON quotes evidence from the notes, so it scales with them
+    OUTPUT_RATIO = 1.0
+
+    OUTPUT_TOOL = make_tool(
+        "record_components",
+        "Record the affidavit components extracted from the interview notes. "
+        "Use the string MISSING for any component the notes don't contain.",
+        {
+            "trafficker_identity": {
+                "type": "string",
+                "description": "Trafficker's name and identifying information",
+            },
+            "tasks": {
+                "type": ["array", "string"],
+                "items": {"type": "string"},
+                "description": "Labor the trafficker forced the client to do, one task per item",
+            },
+            "forced_labor_abuse": {
+                "type": "string",
+                "description": "Abuse and conditions of the forced labor",
+            },
+            "force_fraud_coercion": {
+                "type": "string",
+                "description": "Specific instances of force, fraud and coercion",
+            },
+        }
+    )
+
+    # Notes longer than this are split into chunks extracted concurrently
+    CHUNK_CHARS = 20000
+    CHUNK_OVERLAP_CHARS = 1500
+
+    def __init__(self, client: Union[ClaudeClient, AsyncClaudeClient], prompt_loader: PromptLoader):
         self.client = client
         self.prompt_loader = prompt_loader
 
@@ -21,10 +61,13 @@ class ExtractorStep(PipelineStep):
     def name(self) -> str:
         return "Extracting components from notes"
 
-    def execute(self, state: PipelineState) -> PipelineState:
+    async def execute_async(self, state: PipelineState) -> PipelineState:
         """
         Extract components from notes using LLM.
 
+        Long notes are split into chunks (see pipeline.chunking) that are
+        extracted concurrently and merged in chunk order.
+
         Updates state.extracted_components with structured data.
         """
         logger.info("=" * 60)
@@ -32,19 +75,14 @@ class ExtractorStep(PipelineStep):
         logger.info("=" * 60)
 
         try:
-            # Load and format prompt
             logger.info(f"Reading interview notes ({len(state.raw_notes)} characters)")
-            prompt = self.prompt_loader.format(
-                "01-extraction",
-                notes=state.raw_notes
-            )
+            chunks = split_notes(state.raw_notes, self.CHUNK_CHARS, self.CHUNK_OVERLAP_CHARS)
 
-            # Call LLM
             logger.info("Analyzing notes with AI to extract key information...")
-            response = self.client.generate(prompt, max_tokens=4096)
-
-            # Parse JSON response
-            extracted = self._parse_response(response)
+            if len(chunks) == 1:
+                extracted = await self._extract(state.raw_notes)
+            else:
+                extracted = await self._extract_chunked(chunks, state)
 
             # Validate extraction
             if not extracted:
@@ -55,14 +93,15 @@ class ExtractorStep(PipelineStep):
                     "Extraction returned empty result"
                 )
             else:
-                state.extracted_components = extracted
-                state.step_outputs['extraction'] = extracted
+                components = Components.from_dict(extracted)
+                state.extracted_components = components
+                state.step_outputs['extraction'] = components.to_dict()
 
                 # Log what was found
                 logger.info("")
                 logger.info("EXTRACTION COMPLETE - Found the following:")
-                for key, value in extracted.items():
-                    if value == "MISSING" or not value:
+                for key, value in components.to_dict().items():
+                    if is_missing(value):
                         logger.info(f"  ❌ {key}: MISSING")
                     elif isinstance(value, list):
                         logger.info(f"  ✓ {key}: {len(value)} items")
@@ -88,26 +127,63 @@ class ExtractorStep(PipelineStep):
 
         return state
 
-    def _parse_response(self, response: str) -> Dict[str, Any]:
+    async def _extract(self, notes: str) -> Dict[str, Any]:
         """
-        Parse LLM response to extract JSON.
+        Extract components from (part of) the notes with one LLM call.
 
-        Args:
-            response: Raw LLM response
+        Raises:
+            json.JSONDecodeError: If the response isn't a valid JSON object,
+                even after repair and a reformat call
+        """
+        prompt = self.prompt_loader.format(
+            "01-extraction",
+            notes=notes
+        )
+        max_tokens = size_max_tokens(notes, self.OUTPUT_RATIO, minimum=2048)
+        return await generate_structured(
+            self.client, prompt, self.OUTPUT_TOOL, max_tokens, self.prompt_loader
+        )
+
+    async def _extract_chunked(self, chunks: List[str], state: PipelineState) -> Dict[str, Any]:
+        """
+        Extract components from each chunk concurrently and merge them.
 
-        Returns:
-            Parsed component dictionary
+        A chunk whose response can't be parsed is recorded as an ERROR and
+        the merge uses the remaining chunks. The run can go on with those
+        components, but since the step failed they are neither checkpointed
+        nor memoized, so the next run extracts again. Any other exception
+        is raised once every chunk has settled, so no chunk is left running.
         """
-        # Try to extract JSON from markdown code blocks if present
-        if "```json" in response:
-            start = response.find("```json") + 7
-            end = response.find("```", start)
-            json_str = response[start:end].strip()
-        elif "```" in response:
-            start = response.find("```") + 3
-            end = response.find("```", start)
-            json_str = response[start:end].strip()
-        else:
-            json_str = response.strip()
-
-        return json.loads(json_str)
+        logger.info(f"Notes split into {len(chunks)} chunks for extraction")
+        finished = [0]
+
+        async def extract_chunk(chunk: str) -> Dict[str, Any]:
+            try:
+                return await self._extract(chunk)
+            finally:
+                finished[0] += 1
+                self.report_progress(
+                    f"Extracted {finished[0]}/{len(chunks)} parts of the notes",
+                    finished[0] / len(chunks)
+                )
+
+        results = await asyncio.gather(*(extract_chunk(chunk) for chunk in chunks), return_exceptions=True)
+
+        parts: List[Dict[str, Any]] = []
+        for index, result in enumerate(results):
+            if isinstance(result, json.JSONDecodeError):
+                state.add_error(
+                    self.name,
+                    ErrorSeverity.ERROR,
+                    f"Failed to parse extraction JSON for chunk {index + 1}/{len(chunks)}: {str(result)}. "
+                    "Components from that part of the notes are missing.",
+                    result
+                )
+                result = {}
+            elif isinstance(result, BaseException):
+                raise result
+            parts.append(result)
+        state.step_outputs['extraction_chunks'] = parts
+
+        parts = [part for part in parts if part]
+        return merge_components(parts) if parts else {}
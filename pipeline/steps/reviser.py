@@ -1,10 +1,18 @@
 """
 Revision step - revises draft based on evaluation feedback.
+
+When every flagged statement can be found in a paragraph of the draft, only
+those paragraphs are rewritten (concurrently) and spliced back, leaving the
+rest of the draft byte-identical. Missing elements, or flagged statements
+that can't be located, fall back to rewriting the whole draft.
 """
-import json
+import asyncio
+import re
+from typing import Dict, List, Optional, Union
 import logging
-from pipeline.core import PipelineStep, PipelineState, ErrorSeverity
-from pipeline.llm_client import ClaudeClient, PromptLoader
+from pipeline.core import PipelineStep, PipelineState, ErrorSeverity, size_max_tokens
+from pipeline.llm_client import ClaudeClient, AsyncClaudeClient, PromptLoader
+from pipeline.models import BLOCKING_CATEGORIES, WARNING_CATEGORIES, EvaluationReport
 
 logger = logging.getLogger(__name__)
 
@@ -12,7 +20,18 @@ logger = logging.getLogger(__name__)
 class ReviserStep(PipelineStep):
     """Revises draft based on evaluation feedback."""
 
-    def __init__(self, client: ClaudeClient, prompt_loader: PromptLoader):
+    reads = ("evaluation_report", "draft_text", "extracted_components", "case_specifics",
+             "iteration_count")
+    writes = ("draft_text", "final_text", "iteration_count")
+    prompt_names = ("04-revision", "04-revision-paragraph")
+
+    # A revision is the full draft (or paragraph) again, sometimes with added detail
+    OUTPUT_RATIO = 1.25
+
+    # Blank lines between paragraphs, kept as-is when splicing
+    PARAGRAPH_SEPARATOR = re.compile(r'(\n[ \t]*\n\s*)')
+
+    def __init__(self, client: Union[ClaudeClient, AsyncClaudeClient], prompt_loader: PromptLoader):
         self.client = client
         self.prompt_loader = prompt_loader
 
@@ -20,7 +39,7 @@ class ReviserStep(PipelineStep):
     def name(self) -> str:
         return "Revising draft based on feedback"
 
-    def execute(self, state: PipelineState) -> PipelineState:
+    async def execute_async(self, state: PipelineState) -> PipelineState:
         """
         Revise draft to fix unsupported/uncertain statements.
 
@@ -32,7 +51,7 @@ class ReviserStep(PipelineStep):
             logger.info("No evaluation report - skipping revision")
             return state
 
-        if not state.evaluation_report.get('needs_revision', True):
+        if not state.evaluation_report.needs_revision:
             logger.info("No issues found - no revision needed")
             state.final_text = state.draft_text
             return state
@@ -52,22 +71,16 @@ class ReviserStep(PipelineStep):
             return state
 
         try:
-            # Format inputs
-            components_json = json.dumps(state.extracted_components, indent=2)
-            evaluation_json = json.dumps(state.evaluation_report, indent=2)
-
-            # Load and format prompt
             logger.info("Fixing identified issues...")
-            prompt = self.prompt_loader.format(
-                "04-revision",
-                components=components_json,
-                draft=state.draft_text,
-                evaluation=evaluation_json,
-                case_specifics=state.case_specifics or "None provided"
-            )
+            pieces = self.PARAGRAPH_SEPARATOR.split(state.draft_text)
+            flagged = None
+            if not state.evaluation_report.missing_elements:
+                flagged = self._locate_issues(pieces[::2], state.evaluation_report)
 
-            # Call LLM
-            response = self.client.generate(prompt, max_tokens=4096)
+            if flagged:
+                response = await self._revise_paragraphs(state, pieces, flagged)
+            else:
+                response = await self._revise_full(state)
 
             # Update draft with revised version
             old_word_count = len(state.draft_text.split())
@@ -92,3 +105,135 @@ class ReviserStep(PipelineStep):
             )
 
         return state
+
+    async def _revise_full(self, state: PipelineState) -> str:
+        """Rewrite the whole draft with the full evaluation report."""
+        components_text = state.prompt_data("extracted_components")
+        # Per-sentence grounding scores are left out; they're for the report
+        evaluation_text = state.prompt_data("evaluation_report")
+
+        prompt = self.prompt_loader.format_blocks(
+            "04-revision",
+            components=components_text,
+            draft=state.draft_text,
+            evaluation=evaluation_text,
+            case_specifics=state.case_specifics or "None provided"
+        )
+
+        # Call LLM, streaming partial output to the progress display
+        max_tokens = size_max_tokens(state.draft_text, self.OUTPUT_RATIO, minimum=2048)
+        return await self.client.agenerate(
+            prompt,
+            max_tokens=max_tokens,
+            on_delta=self.stream_progress(
+                f"Revising draft (iteration {state.iteration_count + 1})", max_tokens
+            )
+        )
+
+    async def _revise_paragraphs(self, state: PipelineState, pieces: List[str],
+                                 flagged: Dict[int, List[str]]) -> str:
+        """
+        Rewrite the flagged paragraphs concurrently and splice them back.
+
+        Args:
+            state: Current pipeline state
+            pieces: Draft split by PARAGRAPH_SEPARATOR (paragraphs at even indices)
+            flagged: Issue lines per paragraph number
+
+        Returns:
+            Revised draft; unflagged paragraphs and separators are unchanged
+        """
+        paragraphs = pieces[::2]
+        logger.info(f"Revising {len(flagged)} of {len(paragraphs)} paragraph(s)")
+        components_text = state.prompt_data("extracted_components")
+        finished = [0]
+
+        async def revise(index: int, issues: List[str]) -> str:
+            context = [f"(Before) {paragraphs[index - 1]}"] if index > 0 else []
+            if index + 1 < len(paragraphs):
+                context.append(f"(After) {paragraphs[index + 1]}")
+
+            prompt = self.prompt_loader.format_blocks(
+                "04-revision-paragraph",
+                dynamic_fields=("context", "paragraph", "issues"),
+                components=components_text,
+                case_specifics=state.case_specifics or "None provided",
+                context="\n\n".join(context) or "None",
+                paragraph=paragraphs[index],
+                issues="\n".join(issues)
+            )
+            max_tokens = size_max_tokens(paragraphs[index], self.OUTPUT_RATIO, minimum=512)
+            response = await self.client.agenerate(prompt, max_tokens=max_tokens)
+
+            finished[0] += 1
+            self.report_progress(
+                f"Revised {finished[0]}/{len(flagged)} paragraph(s)",
+                finished[0] / len(flagged)
+            )
+            return response.strip()
+
+        indices = sorted(flagged)
+        revised = await asyncio.gather(*(revise(i, flagged[i]) for i in indices))
+
+        pieces = list(pieces)
+        for index, text in zip(indices, revised):
+            pieces[index * 2] = text
+
+        # Drop paragraphs the reviser removed entirely, with one adjoining separator
+        result: List[str] = []
+        for i in range(0, len(pieces), 2):
+            if not pieces[i]:
+                continue
+            if result:
+                result.append(pieces[i - 1])
+            result.append(pieces[i])
+        return "".join(result)
+
+    def _locate_issues(self, paragraphs: List[str],
+                       evaluation: EvaluationReport) -> Optional[Dict[int, List[str]]]:
+        """
+        Find the paragraph containing each flagged statement.
+
+        Returns:
+            Issue lines ("CATEGORY: statement") per paragraph number, or None
+            if a blocking statement can't be found in any single paragraph
+        """
+        normalized = [self._normalize(p) for p in paragraphs]
+        flagged: Dict[int, List[str]] = {}
+
+        def find(statement: str) -> Optional[int]:
+            needle = self._normalize(statement)
+            if not needle:
+                return None
+            return next((i for i, p in enumerate(normalized) if needle in p), None)
+
+        # Missing elements never get here (they need a full rewrite), so only
+        # flagged statements are located
+        for category in BLOCKING_CATEGORIES:
+            for statement in evaluation.findings(category):
+                index = find(str(statement))
+                if index is None:
+                    logger.info(f"Flagged statement not found verbatim; revising whole draft: {statement}")
+                    return None
+                flagged.setdefault(index, []).append(f"{self._label(category)}: {statement}")
+
+        if not flagged:
+            return None
+
+        # Grammar warnings ride along only in paragraphs being rewritten anyway
+        for category in WARNING_CATEGORIES:
+            for statement in evaluation.findings(category):
+                index = find(str(statement))
+                if index in flagged:
+                    flagged[index].append(f"{self._label(category)} (optional): {statement}")
+
+        return flagged
+
+    @staticmethod
+    def _normalize(text: str) -> str:
+        """Collapse whitespace and strip surrounding quotes for matching."""
+        return " ".join(text.split()).strip('"\'“”‘’').casefold()
+
+    @staticmethod
+    def _label(category: str) -> str:
+        return category.rsplit('_', 1)[0].upper()
@@ -1,30 +1,60 @@
 """
 Draft writing step - generates affidavit body from extracted components.
+
+Given an evaluator, the writer also runs the grounding check on each
+paragraph as soon as the stream completes it, so most of the first
+evaluation happens while the rest of the draft is still being written.
 """
-import json
+import asyncio
+import re
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple, Union
 import logging
-from pipeline.core import PipelineStep, PipelineState, ErrorSeverity
-from pipeline.llm_client import ClaudeClient, PromptLoader
+from pipeline.core import PipelineStep, PipelineState, ErrorSeverity, size_max_tokens
+from pipeline.llm_client import ClaudeClient, AsyncClaudeClient, PromptLoader, TruncatedResponseError
+from pipeline.steps.evaluator import EvaluatorStep
+from pipeline.usage import usage_scope
 
 logger = logging.getLogger(__name__)
 
+PARAGRAPH_BREAK = re.compile(r'\n[ \t]*\n')
+
 
 class WriterStep(PipelineStep):
     """Writes affidavit draft from extracted components."""
 
-    def __init__(self, client: ClaudeClient, prompt_loader: PromptLoader):
+    reads = ("extracted_components", "case_specifics")
+    writes = ("draft_text",)
+    prompt_names = ("02-writing",)
+
+    # The draft is a lengthy narrative of the extracted components
+    OUTPUT_RATIO = 1.5
+
+    def __init__(self, client: Union[ClaudeClient, AsyncClaudeClient], prompt_loader: PromptLoader,
+                 paragraph_evaluator: Optional[EvaluatorStep] = None,
+                 temperature: Optional[float] = None):
+        """
+        Args:
+            client: Claude client
+            prompt_loader: Prompt loader
+            paragraph_evaluator: Evaluator to check paragraphs with as they
+                stream in; only used when the client streams
+            temperature: Sampling temperature (None for the client's)
+        """
         self.client = client
         self.prompt_loader = prompt_loader
+        self.paragraph_evaluator = paragraph_evaluator
+        self.temperature = temperature
 
     @property
     def name(self) -> str:
         return "Writing affidavit draft"
 
-    def execute(self, state: PipelineState) -> PipelineState:
+    async def execute_async(self, state: PipelineState) -> PipelineState:
         """
         Generate affidavit draft from extracted components.
 
-        Updates state.draft_text with generated affidavit body.
+        Updates state.draft_text with generated affidavit body. A draft cut
+        off at the client's output limit is kept, with an ERROR.
         """
         logger.info("=" * 60)
         logger.info("STEP 2: WRITING FORCED LABOR SECTION")
@@ -41,8 +71,8 @@ class WriterStep(PipelineStep):
             return state
 
         try:
-            # Format components as JSON string for prompt
-            components_json = json.dumps(state.extracted_components, indent=2)
+            # Render components for the prompt (cached on the state)
+            components_text = state.prompt_data("extracted_components")
 
             # Load and format prompt
             logger.info("Generating section using AI...")
@@ -51,17 +81,46 @@ class WriterStep(PipelineStep):
 
             prompt = self.prompt_loader.format(
                 "02-writing",
-                components=components_json,
+                components=components_text,
                 case_specifics=state.case_specifics or "None provided"
             )
 
-            # Call LLM
-            response = self.client.generate(prompt, max_tokens=4096)
+            # Call LLM, streaming partial output to the progress display
+            max_tokens = size_max_tokens(components_text, self.OUTPUT_RATIO, minimum=4096)
+            on_delta = self.stream_progress("Writing initial draft", max_tokens)
+
+            dispatcher = None
+            if self.paragraph_evaluator and getattr(self.client, "streaming", False):
+                dispatcher = _ParagraphDispatcher(lambda p: self._check_paragraph(p, state), on_delta)
+                on_delta = dispatcher.feed
+
+            try:
+                response = await self.client.agenerate(
+                    prompt, max_tokens=max_tokens, temperature=self.temperature, on_delta=on_delta
+                )
+            except TruncatedResponseError as e:
+                # Go on with what was written, so the evaluation can flag what's
+                # missing, but as a failed step it isn't checkpointed or memoized
+                response = e.text
+                state.add_error(
+                    self.name,
+                    ErrorSeverity.ERROR,
+                    f"Draft cut off at the output limit ({e.output_tokens} tokens); "
+                    "the end of the draft is missing",
+                    e
+                )
+            except BaseException:
+                if dispatcher:
+                    dispatcher.cancel()
+                raise
 
             # Store draft
             state.draft_text = response.strip()
             state.step_outputs['writing'] = response.strip()
 
+            if dispatcher:
+                await self._collect_grounding(dispatcher, state)
+
             # Count words and paragraphs
             word_count = len(response.split())
             para_count = len([p for p in response.split('\n\n') if p.strip()])
@@ -81,3 +140,96 @@ class WriterStep(PipelineStep):
             )
 
         return state
+
+    async def _check_paragraph(self, paragraph: str, state: PipelineState) -> Dict[str, Any]:
+        """Grounding-check one paragraph, attributing its calls to the first evaluation."""
+        with usage_scope(state.llm_calls, self.paragraph_evaluator.name, 1):
+            return await self.paragraph_evaluator.check_paragraph(paragraph, state)
+
+    async def _collect_grounding(self, dispatcher: "_ParagraphDispatcher", state: PipelineState):
+        """
+        Wait for the paragraph checks and store the merged result for EvaluatorStep.
+
+        If any paragraph's check failed, nothing is stored and the evaluator
+        runs its own grounding check on the whole draft.
+        """
+        results = await dispatcher.finish(state.draft_text)
+        failed = [r for _, r in results if isinstance(r, BaseException)]
+        if failed:
+            logger.warning(
+                f"Grounding check failed for {len(failed)} paragraph(s) while writing: "
+                f"{str(failed[0])}; the evaluator will check the whole draft"
+            )
+            return
+
+        merged: Dict[str, Any] = {"unsupported_statements": [], "uncertain_statements": []}
+        for _, result in results:
+            for category in merged:
+                merged[category].extend(result.get(category) or [])
+        merged["summary"] = (
+            f"{len(results)} paragraph(s) checked while the draft was written; "
+            f"{sum(len(v) for v in merged.values())} statement(s) flagged."
+        )
+
+        state.step_outputs['streamed_grounding'] = {
+            "draft": state.draft_text,
+            "prompt": self.prompt_loader.fingerprint("03-evaluation-grounding"),
+            "result": merged,
+        }
+        logger.info(f"Grounding-checked {len(results)} paragraph(s) while writing")
+
+
+class _ParagraphDispatcher:
+    """
+    Starts a check for each paragraph as soon as the stream completes it.
+
+    feed() is the on_delta callback and may run in a worker thread (the sync
+    client streams there); checks are started on the event loop.
+    """
+
+    def __init__(self, check: Callable[[str], Awaitable[Dict[str, Any]]],
+                 on_delta: Callable[[str, int], None]):
+        self.loop = asyncio.get_running_loop()
+        self.check = check
+        self.on_delta = on_delta
+        self.buffer = ""
+        self.tasks: Dict[str, asyncio.Task] = {}
+        self.cancelled = False
+
+    def feed(self, delta: str, output_tokens: int):
+        self.on_delta(delta, output_tokens)
+        self.buffer += delta
+        *complete, self.buffer = PARAGRAPH_BREAK.split(self.buffer)
+        for paragraph in complete:
+            if paragraph.strip():
+                self.loop.call_soon_threadsafe(self._start, paragraph.strip())
+
+    def _start(self, paragraph: str):
+        if not self.cancelled and paragraph not in self.tasks:
+            self.tasks[paragraph] = self.loop.create_task(self.check(paragraph))
+
+    async def finish(self, text: str) -> List[Tuple[str, Any]]:
+        """
+        Check any paragraphs of the final text not started yet and wait for all.
+
+        Returns:
+            (paragraph, result or exception) for each paragraph of the text
+        """
+        await asyncio.sleep(0)  # Let starts queued from the worker thread run
+        paragraphs = [p.strip() for p in PARAGRAPH_BREAK.split(text) if p.strip()]
+        for paragraph in paragraphs:
+            self._start(paragraph)
+
+        # Paragraphs seen mid-stream but not in the final text (shouldn't happen) aren't needed
+        for paragraph, task in self.tasks.items():
+            if paragraph not in paragraphs:
+                task.cancel()
+
+        results = await asyncio.gather(*(self.tasks[p] for p in paragraphs), return_exceptions=True)
+        return list(zip(paragraphs, results))
+
+    def cancel(self):
+        """Cancel all checks (the draft failed)."""
+        self.cancelled = True
+        for task in self.tasks.values():
+            task.cancel()
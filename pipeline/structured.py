@@ -0,0 +1,209 @@
+"""
+Structured (JSON) output for pipeline steps.
+
+Steps describe the object they want as a tool schema; the client forces the
+model to call that tool, so the answer arrives as schema-shaped JSON rather
+than prose with a fenced code block. Parsing is shared here:
+
+1. The response is parsed as JSON (code fences are tolerated, for cached
+   responses from before tool use and for clients that ignore tools).
+2. If that fails, the JSON is repaired locally: surrounding prose is cut,
+   trailing commas dropped, and open strings, arrays and objects closed.
+3. Only if repair fails is one short "reformat only" call made, which
+   turns the broken output into valid JSON without re-doing the work.
+
+A tool call cut off at max_tokens is different: its input parses, but
+whole categories may be missing, and an evaluation missing its findings
+would approve the draft. It is retried once with a larger budget and
+otherwise fails like unparseable output, never repaired.
+"""
+import json
+import re
+from typing import Any, Dict, Iterable, Optional
+import logging
+
+from pipeline.llm_client import TruncatedResponseError
+
+logger = logging.getLogger(__name__)
+
+REFORMAT_PROMPT = "reformat-json"
+
+# A tool call cut off at max_tokens is retried once with this many times the budget
+TRUNCATED_RETRY_FACTOR = 2
+
+TRAILING_COMMA = re.compile(r',(\s*[}\]])')
+
+
+def make_tool(name: str, description: str, properties: Dict[str, Any],
+              required: Optional[Iterable[str]] = None) -> Dict[str, Any]:
+    """
+    Build a tool definition for a structured response.
+
+    Args:
+        name: Tool name
+        description: What the tool input represents
+        properties: JSON schema properties of the object
+        required: Required properties (default: all)
+
+    Returns:
+        Tool definition for the Messages API
+    """
+    return {
+        "name": name,
+        "description": description,
+        "input_schema": {
+            "type": "object",
+            "properties": properties,
+            "required": list(required if required is not None else properties),
+        },
+    }
+
+
+def string_list(description: str) -> Dict[str, Any]:
+    """JSON schema for a list of strings."""
+    return {"type": "array", "items": {"type": "string"}, "description": description}
+
+
+def parse_json(text: str) -> Any:
+    """
+    Parse a response as JSON, repairing it locally if needed.
+
+    Raises:
+        json.JSONDecodeError: If the text can't be parsed even after repair
+    """
+    body = _strip_fences(text)
+    try:
+        return json.loads(body)
+    except json.JSONDecodeError as e:
+        repaired = repair_json(body)
+        if repaired is None:
+            raise
+        try:
+            value = json.loads(repaired)
+        except json.JSONDecodeError:
+            raise e
+        logger.info("Repaired malformed JSON response locally")
+        return value
+
+
+def repair_json(text: str) -> Optional[str]:
+    """
+    Best-effort fix of truncated or slightly malformed JSON.
+
+    Returns:
+        Repaired text, or None if there is no JSON object or array to repair
+    """
+    start = min((i for i in (text.find("{"), text.find("[")) if i >= 0), default=-1)
+    if start < 0:
+        return None
+    text = text[start:]
+
+    # Walk the text tracking open strings and brackets; cut anything after
+    # the outermost value closes
+    stack = []
+    in_string = False
+    escaped = False
+    end = len(text)
+    for i, char in enumerate(text):
+        if in_string:
+            if escaped:
+                escaped = False
+            elif char == "\\":
+                escaped = True
+            elif char == '"':
+                in_string = False
+        elif char == '"':
+            in_string = True
+        elif char in "{[":
+            stack.append("}" if char == "{" else "]")
+        elif char in "}]":
+            if stack:
+                stack.pop()
+            if not stack:
+                end = i + 1
+                break
+
+    text = text[:end]
+    if in_string:
+        text = text.rstrip("\\") + '"'
+    if stack:
+        # Drop a dangling separator, or an object key with no value, left by truncation
+        text = text.rstrip()
+        if stack[-1] == "}":
+            text = re.sub(r'[{,]\s*"[^"]*"\s*:?$', lambda m: m.group()[0] if m.group()[0] == "{" else "", text)
+        text = re.sub(r'[,:]$', "", text.rstrip())
+        text += "".join(reversed(stack))
+    return TRAILING_COMMA.sub(r'\1', text)
+
+
+def _strip_fences(text: str) -> str:
+    """Return the contents of a markdown code block, if the text has one."""
+    if "```json" in text:
+        start = text.find("```json") + 7
+        end = text.find("```", start)
+        return text[start:end if end >= 0 else None].strip()
+    if "```" in text:
+        start = text.find("```") + 3
+        end = text.find("```", start)
+        return text[start:end if end >= 0 else None].strip()
+    return text.strip()
+
+
+async def generate_structured(client, prompt, tool: Dict[str, Any], max_tokens: int,
+                              prompt_loader=None) -> Dict[str, Any]:
+    """
+    Request a structured response and parse it.
+
+    Args:
+        client: ClaudeClient, AsyncClaudeClient or BulkClaudeClient
+        prompt: User prompt (string or content blocks)
+        tool: Tool definition from make_tool()
+        max_tokens: Output budget for the call
+        prompt_loader: PromptLoader for the reformat prompt; without it,
+            unrepairable output raises instead of being reformatted
+
+    Returns:
+        Parsed tool input
+
+    Raises:
+        json.JSONDecodeError: If neither repair nor the reformat call yields a
+            JSON object, or the call is cut off at max_tokens even on retry
+    """
+    response = await _call_tool(client, prompt, tool, max_tokens)
+    try:
+        return _parse_object(response)
+    except json.JSONDecodeError as e:
+        if prompt_loader is None:
+            raise
+        logger.warning(f"Response isn't valid JSON ({str(e)}); asking for a reformat")
+
+    reformat = prompt_loader.format(
+        REFORMAT_PROMPT,
+        schema=json.dumps(tool["input_schema"], ensure_ascii=False),
+        response=response
+    )
+    # Reformatting copies the content, so it needs about as many tokens as the original
+    return _parse_object(await _call_tool(client, reformat, tool, max_tokens))
+
+
+async def _call_tool(client, prompt, tool: Dict[str, Any], max_tokens: int) -> str:
+    """Make a forced tool call, retrying once with a larger budget if it's cut off."""
+    try:
+        return await client.agenerate(prompt, max_tokens=max_tokens, tool=tool)
+    except TruncatedResponseError:
+        logger.warning(f"Structured response cut off at {max_tokens} tokens; "
+                       f"retrying with {max_tokens * TRUNCATED_RETRY_FACTOR}")
+
+    try:
+        return await client.agenerate(prompt, max_tokens=max_tokens * TRUNCATED_RETRY_FACTOR, tool=tool)
+    except TruncatedResponseError as e:
+        raise json.JSONDecodeError(
+            f"Structured response truncated at max_tokens ({e.output_tokens} output tokens)", e.text, len(e.text)
+        ) from e
+
+
+def _parse_object(text: str) -> Dict[str, Any]:
+    value = parse_json(text)
+    if not isinstance(value, dict):
+        raise json.JSONDecodeError("Expected a JSON object", text, 0)
+    return value
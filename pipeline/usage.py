@@ -0,0 +1,191 @@
+"""
+Per-call token, latency and cost accounting for Claude API calls.
+
+The pipeline opens a usage scope around each step. Every API call made
+inside it - including calls run in worker threads or child tasks, which
+inherit the scope through contextvars - appends a CallRecord to the
+state's llm_calls list, so a finished run can be broken down by step and
+by iteration.
+"""
+import contextlib
+from contextvars import ContextVar
+from dataclasses import dataclass
+from typing import Any, Dict, Iterator, List, Optional
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class CallRecord:
+    """Resource use of one Claude API call (or response cache hit)."""
+    step: str
+    iteration: int
+    model: str
+    input_tokens: int = 0
+    output_tokens: int = 0
+    cache_read_tokens: int = 0
+    cache_write_tokens: int = 0
+    seconds: float = 0.0
+    ttft_seconds: Optional[float] = None  # Only known for streamed calls
+    cost_usd: float = 0.0
+    stop_reason: Optional[str] = None
+    response_cached: bool = False  # Served from the on-disk response cache
+
+
+@dataclass
+class UsageTotals:
+    """Aggregated usage over a group of calls."""
+    calls: int = 0
+    cached_calls: int = 0
+    input_tokens: int = 0
+    output_tokens: int = 0
+    cache_read_tokens: int = 0
+    cache_write_tokens: int = 0
+    seconds: float = 0.0
+    cost_usd: float = 0.0
+
+    def add(self, record: CallRecord) -> None:
+        self.calls += 1
+        self.cached_calls += int(record.response_cached)
+        self.input_tokens += record.input_tokens
+        self.output_tokens += record.output_tokens
+        self.cache_read_tokens += record.cache_read_tokens
+        self.cache_write_tokens += record.cache_write_tokens
+        self.seconds += record.seconds
+        self.cost_usd += record.cost_usd
+
+
+@dataclass
+class _UsageScope:
+    records: List[CallRecord]
+    step: str
+    iteration: int
+
+
+_current_scope: ContextVar[Optional[_UsageScope]] = ContextVar("usage_scope", default=None)
+
+
+@contextlib.contextmanager
+def usage_scope(records: List[CallRecord], step: str, iteration: int) -> Iterator[None]:
+    """
+    Attribute API calls made inside the block to a pipeline step.
+
+    Args:
+        records: List to append CallRecords to (usually state.llm_calls)
+        step: Step name recorded on each call
+        iteration: Write-evaluate-revise iteration (0 for setup steps)
+    """
+    token = _current_scope.set(_UsageScope(records, step, iteration))
+    try:
+        yield
+    finally:
+        _current_scope.reset(token)
+
+
+def record_call(model: str, usage: Any = None, seconds: float = 0.0,
+                ttft_seconds: Optional[float] = None, stop_reason: Optional[str] = None,
+                response_cached: bool = False, price_factor: float = 1.0) -> Optional[CallRecord]:
+    """
+    Record one API call in the current usage scope.
+
+    Args:
+        model: Model the call was made with
+        usage: Usage object from the API response (None for cache hits)
+        seconds: Wall time of the call, including rate-limit queueing and retries
+        ttft_seconds: Time to the first streamed token, if streamed
+        stop_reason: Stop reason from the API response
+        response_cached: True if the response came from the response cache
+        price_factor: Multiplier on list prices (e.g. 0.5 for Message Batches)
+
+    Returns:
+        The record, or None if no usage scope is active
+    """
+    scope = _current_scope.get()
+    if scope is None:
+        return None
+
+    input_tokens = getattr(usage, "input_tokens", None) or 0
+    output_tokens = getattr(usage, "output_tokens", None) or 0
+    cache_read = getattr(usage, "cache_read_input_tokens", None) or 0
+    cache_write = getattr(usage, "cache_creation_input_tokens", None) or 0
+
+    record = CallRecord(
+        step=scope.step,
+        iteration=scope.iteration,
+        model=model,
+        input_tokens=input_tokens,
+        output_tokens=output_tokens,
+        cache_read_tokens=cache_read,
+        cache_write_tokens=cache_write,
+        seconds=seconds,
+        ttft_seconds=ttft_seconds,
+        cost_usd=estimate_cost(model, input_tokens, output_tokens, cache_read, cache_write) * price_factor,
+        stop_reason=stop_reason,
+        response_cached=response_cached,
+    )
+    scope.records.append(record)
+    return record
+
+
+def estimate_cost(model: str, input_tokens: int, output_tokens: int,
+                  cache_read_tokens: int = 0, cache_write_tokens: int = 0) -> float:
+    """
+    Estimate the USD cost of a call from settings.MODEL_PRICING.
+
+    Prices are matched on the longest model-name prefix in the table;
+    unknown models cost 0.0.
+    """
+    from config import settings
+
+    prefixes = [p for p in settings.MODEL_PRICING if model.startswith(p)]
+    if not prefixes:
+        return 0.0
+    prices = settings.MODEL_PRICING[max(prefixes, key=len)]
+
+    return (
+        input_tokens * prices["input"]
+        + output_tokens * prices["output"]
+        + cache_read_tokens * prices["cache_read"]
+        + cache_write_tokens * prices["cache_write"]
+    ) / 1_000_000
+
+
+def summarize(records: List[CallRecord]) -> Dict[str, Any]:
+    """
+    Aggregate call records.
+
+    Returns:
+        Dict with "total" (UsageTotals), "by_step" (step name -> UsageTotals,
+        in first-call order), "by_iteration" (iteration -> UsageTotals,
+        ascending) and "by_model" (model -> UsageTotals, in first-call order)
+    """
+    total = UsageTotals()
+    by_step: Dict[str, UsageTotals] = {}
+    by_iteration: Dict[int, UsageTotals] = {}
+    by_model: Dict[str, UsageTotals] = {}
+
+    for record in records:
+        total.add(record)
+        by_step.setdefault(record.step, UsageTotals()).add(record)
+        by_iteration.setdefault(record.iteration, UsageTotals()).add(record)
+        by_model.setdefault(record.model, UsageTotals()).add(record)
+
+    return {
+        "total": total,
+        "by_step": by_step,
+        "by_iteration": dict(sorted(by_iteration.items())),
+        "by_model": by_model,
+    }
+
+
+def format_totals(totals: UsageTotals) -> str:
+    """One-line human-readable description of aggregated usage."""
+    text = (f"{totals.calls} call(s), {totals.input_tokens:,} input / "
+            f"{totals.output_tokens:,} output tokens")
+    if totals.cache_read_tokens or totals.cache_write_tokens:
+        text += (f" ({totals.cache_read_tokens:,} read from / "
+                 f"{totals.cache_write_tokens:,} written to prompt cache)")
+    if totals.cached_calls:
+        text += f", {totals.cached_calls} replayed from response cache"
+    return text + f", {totals.seconds:.1f}s API time, ${totals.cost_usd:.4f}"
@@ -0,0 +1,12 @@
+"""
+Shared test setup.
+
+The tests run from the repository root without installing anything, the
+same way main.py does: the project root goes on sys.path so `pipeline` and
+`config` import as top-level packages. No test touches the network.
+"""
+import sys
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
@@ -0,0 +1,182 @@
+"""
+Offline stand-ins for Claude clients and pipeline steps, shared by the tests.
+"""
+import asyncio
+from types import SimpleNamespace
+from typing import Any, Callable, Dict, List, Optional, Union
+
+from pipeline.core import ErrorSeverity, PipelineState, PipelineStep
+from pipeline.models import Components, EvaluationReport
+
+COMPONENTS = {
+    "trafficker_identity": "Marco Diaz, owner of Diaz Farms",
+    "tasks": ["Picked strawberries for 14 hours a day", "Cleaned the bunkhouse"],
+    "forced_labor_abuse": "He never paid her and kept her passport.",
+    "force_fraud_coercion": "He said her family would be arrested if she left.",
+}
+
+
+class FakeClient:
+    """
+    Client whose agenerate() answers from a responder instead of the API.
+
+    Records every prompt it is given, so tests can check what was asked.
+    The responder may raise to simulate an API error.
+    """
+
+    def __init__(self, responder: Callable[[Any], str], model: str = "fake-model",
+                 temperature: float = 0.0, delay: float = 0.0):
+        self.responder = responder
+        self.model = model
+        self.temperature = temperature
+        self.delay = delay
+        self.prompts: List[Any] = []
+        self.answered: List[Any] = []
+
+    async def agenerate(self, prompt, max_tokens: int = 4096, temperature: Optional[float] = None,
+                        system: Optional[str] = None, use_cache: bool = True, on_delta=None,
+                        timeout: Optional[float] = None, tool: Optional[Dict[str, Any]] = None) -> str:
+        self.prompts.append(prompt)
+        await asyncio.sleep(self.delay)
+        response = self.responder(prompt)
+        self.answered.append(prompt)
+        return response
+
+
+def prompt_text(prompt) -> str:
+    """Join a prompt given as content blocks (see PromptLoader.format_blocks) into one string."""
+    if isinstance(prompt, str):
+        return prompt
+    return "".join(block["text"] for block in prompt)
+
+
+class ScriptedStep(PipelineStep):
+    """Step that applies a function to the state and counts how often it ran."""
+
+    def __init__(self, name: str, action: Callable[[PipelineState], None],
+                 reads=(), writes=()):
+        self._name = name
+        self.action = action
+        self.reads = reads
+        self.writes = writes
+        self.runs = 0
+
+    @property
+    def name(self) -> str:
+        return self._name
+
+    async def execute_async(self, state: PipelineState) -> PipelineState:
+        self.runs += 1
+        self.action(state)
+        return state
+
+
+def iterative_steps(reports: List[Dict[str, Any]], fail_revision: int = 0) -> Dict[str, ScriptedStep]:
+    """
+    Fake extract, write, evaluate and revise steps for IterativePipeline.
+
+    They keep the same state bookkeeping as the real steps.
+
+    Args:
+        reports: Evaluation reports to return, in order
+        fail_revision: Make this many revision runs fail with a CRITICAL error
+    """
+    reports = list(reports)
+    failures = [fail_revision]
+
+    def extract(state):
+        state.extracted_components = Components.from_dict(COMPONENTS)
+
+    def write(state):
+        state.draft_text = "First paragraph of the draft.\n\nSecond paragraph of the draft."
+        state.step_outputs["writing"] = state.draft_text
+
+    def evaluate(state):
+        state.evaluation_report = EvaluationReport.from_dict(reports.pop(0))
+        state.step_outputs[f"evaluation_{state.iteration_count}"] = state.evaluation_report.to_dict()
+
+    def revise(state):
+        if failures[0]:
+            failures[0] -= 1
+            state.add_error("revise", ErrorSeverity.CRITICAL, "API unavailable")
+            return
+        state.iteration_count += 1
+        state.draft_text = f"Revised draft number {state.iteration_count}, with new wording throughout."
+        state.step_outputs[f"revision_{state.iteration_count}"] = state.draft_text
+
+    return {
+        "extract_step": ScriptedStep("extract", extract, ("raw_notes",), ("extracted_components",)),
+        "write_step": ScriptedStep("write", write, ("extracted_components",), ("draft_text",)),
+        "eval_step": ScriptedStep("evaluate", evaluate, ("draft_text", "iteration_count"),
+                                  ("evaluation_report",)),
+        "revise_step": ScriptedStep("revise", revise, ("draft_text", "evaluation_report", "iteration_count"),
+                                    ("draft_text", "iteration_count")),
+    }
+
+
+def message(text: str = "", stop_reason: str = "end_turn", output_tokens: int = 10, tool_input=None):
+    """A Messages API response with one text or tool_use block."""
+    if tool_input is not None:
+        block = SimpleNamespace(type="tool_use", input=tool_input)
+    else:
+        block = SimpleNamespace(type="text", text=text)
+    return SimpleNamespace(content=[block], stop_reason=stop_reason, model="fake-model",
+                           usage=SimpleNamespace(input_tokens=100, output_tokens=output_tokens))
+
+
+class FakeStream:
+    """messages.stream() context streaming one response's text."""
+
+    def __init__(self, response):
+        self.final = response
+        self.response = SimpleNamespace(headers={})
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    @property
+    def text_stream(self):
+        return iter([self.final.content[0].text])
+
+    def get_final_message(self):
+        return self.final
+
+
+class FakeAnthropic:
+    """
+    SDK client answering messages.create and messages.stream.
+
+    Answers come from a list of responses, in order, or from a function of
+    the request's keyword arguments. Every request is recorded.
+    """
+
+    def __init__(self, responses: Union[List[Any], Callable[[Dict[str, Any]], Any]]):
+        self.responses = responses if callable(responses) else list(responses)
+        self.requests: List[Dict[str, Any]] = []
+        self.messages = self
+        self.with_raw_response = self
+
+    def _respond(self, kwargs: Dict[str, Any]):
+        self.requests.append(kwargs)
+        return self.responses(kwargs) if callable(self.responses) else self.responses.pop(0)
+
+    def create(self, **kwargs):
+        response = self._respond(kwargs)
+        return SimpleNamespace(headers={}, parse=lambda: response)
+
+    def stream(self, **kwargs):
+        return FakeStream(self._respond(kwargs))
+
+
+class AsyncFakeAnthropic(FakeAnthropic):
+    async def create(self, **kwargs):
+        return FakeAnthropic.create(self, **kwargs)
@@ -0,0 +1,125 @@
+"""
+Offline tests for BulkClaudeClient, driven through LocalBatchBackend.
+"""
+import asyncio
+import json
+
+import pytest
+
+from pipeline.bulk import BulkClaudeClient, LocalBatchBackend
+from pipeline.response_cache import ResponseCache
+from pipeline.usage import estimate_cost, usage_scope
+
+
+def prompt_of(params) -> str:
+    return params["messages"][0]["content"]
+
+
+def echo(params) -> str:
+    prompt = prompt_of(params)
+    if prompt.startswith("fail"):
+        raise RuntimeError(f"rejected {prompt}")
+    return f"answer to {prompt}"
+
+
+def make_client(backend, **kwargs) -> BulkClaudeClient:
+    return BulkClaudeClient(backend, gather_seconds=0.01, poll_seconds=0.01, **kwargs)
+
+
+def test_concurrent_calls_share_one_batch():
+    backend = LocalBatchBackend(echo, polls_until_done=3)
+    client = make_client(backend)
+
+    async def run():
+        return await asyncio.gather(*(client.agenerate(f"prompt {i}") for i in range(3)))
+
+    assert asyncio.run(run()) == ["answer to prompt 0", "answer to prompt 1", "answer to prompt 2"]
+    assert len(backend.batches) == 1
+    batch = next(iter(backend.batches.values()))
+    assert batch["polls"] == 3
+    assert sorted(prompt_of(r["params"]) for r in batch["requests"]) == ["prompt 0", "prompt 1", "prompt 2"]
+
+
+def test_failed_request_only_fails_its_own_call():
+    client = make_client(LocalBatchBackend(echo))
+
+    async def run():
+        return await asyncio.gather(client.agenerate("ok"), client.agenerate("fail me"),
+                                    return_exceptions=True)
+
+    ok, failed = asyncio.run(run())
+    assert ok == "answer to ok"
+    assert isinstance(failed, RuntimeError) and "rejected fail me" in str(failed)
+
+
+def test_submission_failure_fails_every_queued_call():
+    class RejectingBackend(LocalBatchBackend):
+        def submit(self, requests):
+            raise ConnectionError("batch API down")
+
+    client = make_client(RejectingBackend(echo))
+
+    async def run():
+        return await asyncio.gather(client.agenerate("a"), client.agenerate("b"),
+                                    return_exceptions=True)
+
+    assert all(isinstance(result, ConnectionError) for result in asyncio.run(run()))
+
+
+def test_missing_result_fails_the_call():
+    class LosingBackend(LocalBatchBackend):
+        def results(self, batch_id):
+            return {}
+
+    client = make_client(LosingBackend(echo))
+
+    with pytest.raises(RuntimeError, match="No result for"):
+        asyncio.run(client.agenerate("lost"))
+
+
+def test_later_calls_join_a_new_batch():
+    backend = LocalBatchBackend(echo)
+    client = make_client(backend)
+
+    async def run():
+        first = await client.agenerate("first")
+        second = await client.agenerate("second")
+        return first, second
+
+    assert asyncio.run(run()) == ("answer to first", "answer to second")
+    assert len(backend.batches) == 2
+
+
+def test_usage_is_recorded_at_batch_prices():
+    client = make_client(LocalBatchBackend(echo), model="claude-sonnet-4-20250514")
+    calls = []
+
+    async def run():
+        with usage_scope(calls, "Extracting components", 0):
+            await client.agenerate("prompt")
+
+    asyncio.run(run())
+
+    assert len(calls) == 1
+    record = calls[0]
+    assert (record.step, record.model) == ("Extracting components", "claude-sonnet-4-20250514")
+    list_price = estimate_cost(record.model, record.input_tokens, record.output_tokens, 0, 0)
+    assert record.cost_usd == pytest.approx(list_price * 0.5)
+    assert record.cost_usd > 0
+
+
+def test_cached_response_skips_the_batch(tmp_path):
+    backend = LocalBatchBackend(echo)
+    client = make_client(backend, cache=ResponseCache(str(tmp_path)))
+
+    assert asyncio.run(client.agenerate("cached")) == "answer to cached"
+    assert asyncio.run(client.agenerate("cached")) == "answer to cached"
+    assert len(backend.batches) == 1
+
+
+def test_requests_carry_the_forced_tool():
+    backend = LocalBatchBackend(lambda params: json.dumps({"tool": params["tool_choice"]["name"]}))
+    client = make_client(backend)
+    tool = {"name": "record_findings", "description": "Record.", "input_schema": {"type": "object"}}
+
+    assert json.loads(asyncio.run(client.agenerate("prompt", tool=tool))) == {"tool": "record_findings"}
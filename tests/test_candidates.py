@@ -0,0 +1,153 @@
+"""
+Tests for writing candidate drafts concurrently and keeping the best one.
+"""
+import asyncio
+import json
+
+from conftest import PROJECT_ROOT
+from fakes import COMPONENTS, FakeClient, ScriptedStep, prompt_text
+
+from pipeline.core import ErrorSeverity, PipelineState
+from pipeline.iterative import IterativePipeline
+from pipeline.llm_client import PromptLoader
+from pipeline.models import Components
+from pipeline.steps.candidates import CandidateDraftsStep
+from pipeline.steps.evaluator import EvaluatorStep
+from pipeline.steps.writer import WriterStep
+
+PROMPTS = PromptLoader(PROJECT_ROOT / "prompts")
+
+# Blocking findings of each draft, by the marker sentence it opens with
+FINDINGS = {
+    "Draft A.": {"unsupported_statements": ["He hit me.", "He kicked me."]},
+    "Draft B.": {"unsupported_statements": ["He hit me."]},
+    "Draft C.": {"unsupported_statements": ["He hit me."], "missing_elements": ["Task list", "Coercion"]},
+    "Draft P.": {},
+    "Draft R.": {},
+}
+
+
+def responder(drafts, broken_structure=()):
+    """
+    Write the given drafts in order, and evaluate each one with its FINDINGS.
+
+    The structure check of the markers in broken_structure answers with bad JSON.
+    """
+    drafts = list(drafts)
+
+    def respond(prompt):
+        text = prompt_text(prompt)
+        if "Writing Prompt" in text:
+            return drafts.pop(0)
+        marker = next(m for m in FINDINGS if m in text)
+        findings = FINDINGS[marker]
+        if "Evaluation: Grounding" in text:
+            return json.dumps({
+                "unsupported_statements": findings.get("unsupported_statements", []),
+                "uncertain_statements": [],
+                "summary": f"{marker} checked.",
+            })
+        if marker in broken_structure:
+            return "Not JSON."
+        return json.dumps({"missing_elements": findings.get("missing_elements", []), "summary": "Checked."})
+
+    return respond
+
+
+def draft(marker: str) -> str:
+    return f"{marker} He hit me.\n\nHe kicked me."
+
+
+def make_step(client, count: int = 3) -> CandidateDraftsStep:
+    return CandidateDraftsStep(WriterStep(client, PROMPTS, temperature=0.8), EvaluatorStep(client, PROMPTS),
+                               count, 0.8)
+
+
+def make_state() -> PipelineState:
+    return PipelineState(raw_notes="Notes", output_path="out", case_name="Jane Doe",
+                         extracted_components=Components.from_dict(COMPONENTS))
+
+
+def test_candidate_with_fewest_blocking_issues_is_kept():
+    client = FakeClient(responder([draft("Draft A."), draft("Draft B."), draft("Draft C.")]))
+
+    state = asyncio.run(make_step(client).execute_async(make_state()))
+
+    assert state.draft_text == draft("Draft B.")
+    assert state.evaluation_report.unsupported_statements == ["He hit me."]
+    assert [c["selected"] for c in state.draft_candidates] == [False, True, False]
+    assert [c["blocking_issues"] for c in state.draft_candidates] == [2, 1, 3]
+    assert state.step_outputs["writing"] == state.draft_text
+    assert state.step_outputs["evaluation_0"] == state.evaluation_report.to_dict()
+    assert state.step_outputs["candidate_drafts"] == [draft(m) for m in ("Draft A.", "Draft B.", "Draft C.")]
+    assert not state.errors
+
+
+def test_candidate_with_a_failed_check_ranks_last_and_is_reported_when_discarded():
+    client = FakeClient(responder([draft("Draft A."), draft("Draft B.")], broken_structure=["Draft B."]))
+
+    state = asyncio.run(make_step(client, count=2).execute_async(make_state()))
+
+    # B has fewer issues, but its structure check failed
+    assert state.draft_text == draft("Draft A.")
+    assert [(e.severity, e.message.split(":")[0]) for e in state.errors] == \
+        [(ErrorSeverity.WARNING, "Candidate 2 discarded")]
+
+
+def test_every_candidate_failing_is_critical():
+    def fail(prompt):
+        raise ConnectionError("API unavailable")
+
+    state = asyncio.run(make_step(FakeClient(fail)).execute_async(make_state()))
+
+    assert state.has_critical_error()
+    assert state.errors[-1].message.startswith("All 3 candidate drafts failed: Draft generation failed")
+    assert state.draft_text is None
+
+
+def pipeline(client, revise) -> IterativePipeline:
+    def extract(state):
+        state.extracted_components = Components.from_dict(COMPONENTS)
+
+    def unused(state):
+        raise AssertionError("the candidates step replaces the writer")
+
+    return IterativePipeline(
+        extract_step=ScriptedStep("extract", extract),
+        write_step=ScriptedStep("write", unused),
+        eval_step=EvaluatorStep(client, PROMPTS),
+        revise_step=ScriptedStep("revise", revise),
+        max_iterations=3,
+        candidate_step=make_step(client),
+    )
+
+
+def test_passing_candidate_skips_the_revision_loop():
+    client = FakeClient(responder([draft("Draft A."), draft("Draft P."), draft("Draft C.")]))
+    steps = pipeline(client, revise=lambda state: None)
+
+    state = asyncio.run(steps.run_async(make_state()))
+
+    assert state.final_text == draft("Draft P.")
+    assert state.stop_reason == "Approved after 1 evaluation(s)"
+    assert steps.revise_step.runs == 0
+    assert state.completed_steps == ["extraction", "candidates"]
+
+
+def test_revision_loop_continues_from_the_chosen_candidate():
+    client = FakeClient(responder([draft("Draft A."), draft("Draft B."), draft("Draft C.")]))
+    revised_from = []
+
+    def revise(state):
+        revised_from.append((state.draft_text, state.evaluation_report.unsupported_statements))
+        state.iteration_count += 1
+        state.draft_text = draft("Draft R.")
+        state.step_outputs[f"revision_{state.iteration_count}"] = state.draft_text
+
+    steps = pipeline(client, revise)
+    state = asyncio.run(steps.run_async(make_state()))
+
+    assert revised_from == [(draft("Draft B."), ["He hit me."])]
+    assert state.final_text == draft("Draft R.")
+    assert state.stop_reason == "Approved after 2 evaluation(s)"
+    assert state.completed_steps == ["extraction", "candidates", "revision_1", "evaluation_2"]
@@ -0,0 +1,112 @@
+"""
+Tests for PipelineState serialization, checkpoint files and resuming interrupted runs.
+"""
+import json
+
+from fakes import COMPONENTS, iterative_steps
+
+from pipeline.checkpoint import checkpoint_path, load_checkpoint, resume_state, save_checkpoint
+from pipeline.core import ErrorSeverity, PipelineState
+from pipeline.iterative import IterativePipeline
+from pipeline.models import Components, EvaluationReport
+from pipeline.usage import CallRecord
+
+FLAGGED = {"unsupported_statements": ["She worked 20 hours a day."], "needs_revision": True}
+APPROVED = {"needs_revision": False, "summary": "All supported."}
+
+
+def make_state(output_path, notes: str = "Interview notes") -> PipelineState:
+    return PipelineState(raw_notes=notes, output_path=str(output_path), case_name="Jane Doe",
+                         case_specifics="Farm work")
+
+
+def test_state_round_trips_through_json(tmp_path):
+    state = make_state(tmp_path)
+    state.extracted_components = Components.from_dict(COMPONENTS)
+    state.draft_text = "Draft."
+    state.evaluation_report = EvaluationReport.from_dict({
+        **FLAGGED,
+        "grounding": {"threshold": 0.85, "sentences": [
+            {"sentence": "Draft.", "score": 0.5, "pre_verified": False, "unknown_details": []}
+        ]},
+    })
+    state.iteration_count = 1
+    state.add_error("Writing", ErrorSeverity.WARNING, "Short draft", ValueError("not kept"))
+    state.llm_calls.append(CallRecord(step="Writing", iteration=0, model="m", input_tokens=10))
+    state.completed_steps = ["extraction", "writing"]
+    state.step_outputs["writing"] = "Draft."
+
+    restored = PipelineState.from_dict(json.loads(json.dumps(state.to_dict())))
+
+    assert restored.extracted_components == state.extracted_components
+    assert restored.evaluation_report == state.evaluation_report
+    assert restored.evaluation_report.grounding.sentences[0].score == 0.5
+    assert [(e.step_name, e.severity, e.message, e.exception) for e in restored.errors] == \
+        [("Writing", ErrorSeverity.WARNING, "Short draft", None)]
+    assert restored.llm_calls == state.llm_calls
+    assert (restored.draft_text, restored.iteration_count, restored.completed_steps, restored.step_outputs) == \
+        (state.draft_text, state.iteration_count, state.completed_steps, state.step_outputs)
+
+
+def test_from_dict_ignores_unknown_keys(tmp_path):
+    data = make_state(tmp_path).to_dict()
+    data["field_from_a_newer_version"] = 1
+
+    assert PipelineState.from_dict(data).case_name == "Jane Doe"
+
+
+def test_checkpoint_save_and_load(tmp_path):
+    state = make_state(tmp_path)
+    state.completed_steps = ["extraction"]
+
+    save_checkpoint(state)
+    checkpoint = load_checkpoint(str(tmp_path), "Jane Doe")
+
+    assert checkpoint["complete"] is False
+    assert checkpoint["state"].completed_steps == ["extraction"]
+    assert checkpoint_path(str(tmp_path), "Jane Doe") == tmp_path / "jane_doe" / "checkpoint.json"
+    assert not list(checkpoint_path(str(tmp_path), "Jane Doe").parent.glob("*.tmp"))
+
+
+def test_unreadable_or_old_checkpoints_are_ignored(tmp_path):
+    path = checkpoint_path(str(tmp_path), "Jane Doe")
+    path.parent.mkdir(parents=True)
+
+    path.write_text("{not json")
+    assert load_checkpoint(str(tmp_path), "Jane Doe") is None
+
+    path.write_text(json.dumps({"version": 0, "complete": False, "state": {}}))
+    assert load_checkpoint(str(tmp_path), "Jane Doe") is None
+
+
+def test_resume_only_unfinished_runs_with_the_same_inputs(tmp_path):
+    state = make_state(tmp_path)
+    state.completed_steps = ["extraction"]
+    save_checkpoint(state)
+
+    assert resume_state(make_state(tmp_path)).completed_steps == ["extraction"]
+    assert resume_state(make_state(tmp_path, notes="Edited notes")) is None
+
+    save_checkpoint(state, complete=True)
+    assert resume_state(make_state(tmp_path)) is None
+
+
+def test_interrupted_run_resumes_after_its_last_completed_step(tmp_path):
+    # First run: the revision fails, so the run stops after the first evaluation
+    steps = iterative_steps([FLAGGED], fail_revision=1)
+    first = IterativePipeline(**steps, checkpointing=True).run(make_state(tmp_path))
+    assert first.has_critical_error()
+    assert load_checkpoint(str(tmp_path), "Jane Doe")["state"].completed_steps == \
+        ["extraction", "writing", "evaluation_1"]
+
+    # Second run picks up at the revision
+    resumed = resume_state(make_state(tmp_path))
+    steps = iterative_steps([APPROVED])
+    final = IterativePipeline(**steps, checkpointing=True).run(resumed)
+
+    assert [steps[name].runs for name in ("extract_step", "write_step", "eval_step", "revise_step")] == \
+        [0, 0, 1, 1]
+    assert not final.has_critical_error()
+    assert final.completed_steps == ["extraction", "writing", "evaluation_1", "revision_1", "evaluation_2"]
+    assert final.final_text == final.draft_text
+    assert load_checkpoint(str(tmp_path), "Jane Doe")["complete"] is True
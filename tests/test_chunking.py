@@ -0,0 +1,88 @@
+"""
+Tests for splitting long interview notes and merging chunk extractions.
+"""
+from pipeline.chunking import merge_components, split_notes
+
+PARAGRAPH = ("The client described another long day in the fields without pay. " * 3).strip()
+
+
+def test_short_notes_are_one_chunk():
+    assert split_notes("Short notes.", max_chars=100) == ["Short notes."]
+
+
+def test_chunks_stay_within_the_limit_and_keep_every_paragraph():
+    paragraphs = [f"Paragraph {i}. {PARAGRAPH}" for i in range(12)]
+    notes = "\n\n".join(paragraphs)
+
+    chunks = split_notes(notes, max_chars=600)
+
+    assert len(chunks) > 1
+    assert all(len(chunk) <= 600 + 2 * len(chunk.split("\n\n")) for chunk in chunks)
+    assert all(any(p in chunk for chunk in chunks) for p in paragraphs)
+
+
+def test_chunks_break_at_session_boundaries():
+    sessions = [f"Session {i}\n\n" + "\n\n".join([PARAGRAPH] * 2) for i in range(1, 4)]
+
+    chunks = split_notes("\n\n".join(sessions), max_chars=700)
+
+    assert [chunk.splitlines()[0] for chunk in chunks] == ["Session 1", "Session 2", "Session 3"]
+
+
+def test_chunks_split_mid_session_repeat_the_previous_paragraph():
+    paragraphs = [f"Paragraph {i}. {PARAGRAPH}" for i in range(6)]
+
+    chunks = split_notes("\n\n".join(paragraphs), max_chars=500, overlap_chars=300)
+
+    first_paragraphs = [chunk.split("\n\n") for chunk in chunks]
+    assert first_paragraphs[1][0] == first_paragraphs[0][-1]
+
+
+def test_oversized_paragraph_is_split_at_sentences():
+    paragraph = " ".join(f"Sentence number {i} of the account." for i in range(40))
+
+    chunks = split_notes(paragraph, max_chars=200)
+
+    assert all(len(chunk) <= 200 for chunk in chunks)
+    assert all(chunk.endswith(".") for chunk in chunks)
+    assert " ".join(chunks) == paragraph
+
+
+def test_splitting_is_deterministic():
+    notes = "\n\n".join(f"Paragraph {i}. {PARAGRAPH}" for i in range(12))
+
+    assert split_notes(notes, 600, 200) == split_notes(notes, 600, 200)
+
+
+def test_merge_combines_lists_without_duplicates():
+    merged = merge_components([
+        {"tasks": ["Picked strawberries", "Cleaned the bunkhouse"]},
+        {"tasks": ["picked strawberries.", "Cooked for the crew"]},
+    ])
+
+    assert merged["tasks"] == ["Picked strawberries", "Cleaned the bunkhouse", "Cooked for the crew"]
+
+
+def test_merge_joins_text_in_chunk_order_skipping_overlap():
+    merged = merge_components([
+        {"forced_labor_abuse": "He kept her passport.\n\nShe slept on the floor."},
+        {"forced_labor_abuse": "She slept on the floor.\n\nHe never paid her."},
+    ])
+
+    assert merged["forced_labor_abuse"] == \
+        "He kept her passport.\n\nShe slept on the floor.\n\nHe never paid her."
+
+
+def test_merge_keeps_missing_only_when_every_chunk_lacks_it():
+    merged = merge_components([
+        {"trafficker_identity": "MISSING", "force_fraud_coercion": "MISSING"},
+        {"trafficker_identity": "Marco Diaz", "force_fraud_coercion": ""},
+    ])
+
+    assert merged == {"trafficker_identity": "Marco Diaz", "force_fraud_coercion": "MISSING"}
+
+
+def test_merge_accepts_a_task_given_as_text():
+    merged = merge_components([{"tasks": "Picked strawberries"}, {"tasks": ["Cleaned the bunkhouse"]}])
+
+    assert merged["tasks"] == ["Picked strawberries", "Cleaned the bunkhouse"]
@@ -0,0 +1,88 @@
+"""
+Tests for the shared, pooled Anthropic clients.
+
+Requests go to a throwaway HTTP server on localhost, never to the API.
+"""
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import httpx
+import pytest
+
+from pipeline import client_pool
+from pipeline.client_pool import _PooledTransport, get_anthropic_client, pool_stats
+
+
+class OkHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # Keep-alive, so connections can be reused
+
+    def do_GET(self):
+        self.send_response(200)
+        self.send_header("Content-Length", "2")
+        self.end_headers()
+        self.wfile.write(b"ok")
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def server_url():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), OkHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_address[1]}/"
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture
+def transport(monkeypatch):
+    """A pooled transport registered with pool_stats() in place of the shared ones."""
+    transport = _PooledTransport()
+    monkeypatch.setattr(client_pool, "_sync_transports", [transport])
+    monkeypatch.setattr(client_pool, "_async_transports", [])
+    return transport
+
+
+def test_one_client_per_api_key():
+    assert get_anthropic_client("key-a") is get_anthropic_client("key-a")
+    assert get_anthropic_client("key-a") is not get_anthropic_client("key-b")
+
+
+def test_stats_count_reused_connections(server_url, transport):
+    with httpx.Client(transport=transport) as http:
+        for _ in range(3):
+            assert http.get(server_url).text == "ok"
+
+    stats = pool_stats()
+    assert stats["requests"] == 3
+    assert stats["connections_opened"] == 1
+    assert stats["connections_reused"] == 2
+    assert stats["in_flight"] == 0
+
+
+class HiddenConnections:
+    """Connection pool proxy without a `connections` attribute, as a future httpx might have."""
+
+    def __init__(self, pool):
+        self._inner = pool
+
+    def __getattr__(self, name):
+        if name == "connections":
+            raise AttributeError(name)
+        return getattr(self._inner, name)
+
+
+def test_stats_degrade_when_httpx_hides_its_pool(server_url, transport):
+    transport._pool = HiddenConnections(transport._pool)
+
+    http = httpx.Client(transport=transport)
+    assert http.get(server_url).text == "ok"
+    http.close()
+
+    stats = pool_stats()
+    assert stats["requests"] == 1
+    assert stats["connections_open"] == "unavailable"
+    assert stats["connections_opened"] == "unavailable"
+    assert stats["in_flight"] == 0
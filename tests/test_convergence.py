@@ -0,0 +1,169 @@
+"""
+Tests for the convergence checks that end the revision loop early.
+"""
+import asyncio
+
+import pytest
+from fakes import iterative_steps
+
+from config import settings
+from pipeline.checkpoint import resume_state
+from pipeline.convergence import (change_ratio, flagged_overlap, iteration_budget, revised_change_ratio,
+                                  stall_reason)
+from pipeline.core import ErrorSeverity, PipelineState
+from pipeline.iterative import IterativePipeline
+from pipeline.models import EvaluationReport
+
+DRAFT = " ".join(f"word{i}" for i in range(100))
+
+# Twelve paragraphs of 100 words
+LONG_DRAFT = "\n\n".join(" ".join(f"p{p}w{i}" for i in range(100)) for p in range(12))
+
+
+@pytest.fixture(autouse=True)
+def convergence_settings(monkeypatch):
+    monkeypatch.setattr(settings, "ISSUES_PER_ITERATION", 3)
+    monkeypatch.setattr(settings, "CONVERGENCE_MIN_CHANGE", 0.02)
+    monkeypatch.setattr(settings, "CONVERGENCE_MAX_OVERLAP", 0.8)
+
+
+def report(unsupported=(), uncertain=(), missing=(), **warnings) -> EvaluationReport:
+    return EvaluationReport.from_dict({
+        "unsupported_statements": list(unsupported),
+        "uncertain_statements": list(uncertain),
+        "missing_elements": list(missing),
+        **warnings,
+    })
+
+
+def test_change_ratio_ignores_whitespace():
+    assert change_ratio(DRAFT, DRAFT.replace(" ", "\n  ")) == 0.0
+    assert change_ratio("a b c d", "a b x d") == pytest.approx(0.25)
+
+
+def test_flagged_overlap_normalizes_and_ignores_warnings():
+    previous = report(["He  beat me."], ["I was paid."], passive_voice_issues=["I was paid."])
+    current = report(["he beat me."], missing=["Task list"])
+
+    assert flagged_overlap(previous, current) == pytest.approx(1 / 3)
+    assert flagged_overlap(previous, report()) == 0.0
+    assert flagged_overlap(None, current) == 0.0
+
+
+@pytest.mark.parametrize("issues, expected", [(0, 2), (1, 2), (3, 2), (4, 3), (7, 3)])
+def test_iteration_budget_scales_with_issues(issues, expected):
+    first = report([f"Statement {i}." for i in range(issues)])
+
+    assert iteration_budget(first, max_iterations=3) == expected
+
+
+def test_iteration_budget_follows_settings(monkeypatch):
+    monkeypatch.setattr(settings, "ISSUES_PER_ITERATION", 1)
+    first = report(["One.", "Two.", "Three."])
+
+    assert iteration_budget(first, max_iterations=10) == 4
+    assert iteration_budget(first, max_iterations=2) == 2
+    assert iteration_budget(None, max_iterations=3) == 2
+
+
+def test_small_revision_stalls():
+    revised = DRAFT.replace("word50", "changed")
+
+    reason = stall_reason(report(["A."]), report(["B."]), DRAFT, revised)
+
+    assert reason == "Stalled: the last revision changed only 1.0% of the paragraphs it rewrote"
+
+
+def test_revised_change_ratio_counts_only_rewritten_paragraphs():
+    paragraphs = LONG_DRAFT.split("\n\n")
+    rewritten = paragraphs[5].replace("p5w1 ", "changed ").replace("p5w2 ", "changed ")
+
+    revised = "\n\n".join(paragraphs[:5] + [rewritten] + paragraphs[6:])
+
+    assert revised_change_ratio(LONG_DRAFT, revised) == pytest.approx(change_ratio(paragraphs[5], rewritten))
+    assert revised_change_ratio(LONG_DRAFT, LONG_DRAFT.replace("\n\n", "\n  \n")) == 0.0
+    assert revised_change_ratio(LONG_DRAFT, "\n\n".join(paragraphs[:11])) == 1.0
+
+
+def test_paragraph_revision_with_new_findings_keeps_going():
+    # One paragraph of a 1,200-word draft rewritten: 15 words, about 1% of the draft
+    paragraphs = LONG_DRAFT.split("\n\n")
+    rewritten = " ".join(["rewritten"] * 15 + paragraphs[3].split()[15:])
+    revised = "\n\n".join(paragraphs[:3] + [rewritten] + paragraphs[4:])
+    assert change_ratio(LONG_DRAFT, revised) < settings.CONVERGENCE_MIN_CHANGE
+
+    assert stall_reason(report(["He beat me."]), report(["He hit me."]), LONG_DRAFT, revised) is None
+
+
+def test_same_findings_stall():
+    revised = DRAFT.replace("word1 ", "new ").replace("word2 ", "new ").replace("word3 ", "new ")
+    previous = report(["A.", "B.", "C.", "D.", "E."])
+
+    assert stall_reason(previous, report(["A.", "B.", "C.", "D."]), DRAFT, revised) == \
+        "Stalled: 80% of the flagged statements were flagged again after revision"
+    assert stall_reason(previous, report(["A.", "B.", "C."]), DRAFT, revised) is None
+
+
+def test_missing_drafts_skip_change_check():
+    assert stall_reason(report(["A."]), report(["B."]), None, DRAFT) is None
+
+
+def test_loop_stops_at_iteration_budget():
+    flagged = {"unsupported_statements": ["He beat me."], "needs_revision": True}
+    steps = iterative_steps([flagged, {**flagged, "unsupported_statements": ["He hit me."]}, flagged])
+    state = PipelineState(raw_notes="Notes", output_path="out", case_name="Jane Doe")
+
+    state = asyncio.run(IterativePipeline(**steps, max_iterations=3).run_async(state))
+
+    assert steps["eval_step"].runs == 2
+    assert steps["revise_step"].runs == 1
+    assert state.stop_reason == "Iteration budget reached (2 evaluations for the issues found)"
+    assert state.final_text == state.draft_text
+
+
+def test_loop_stops_when_findings_repeat():
+    flagged = {"unsupported_statements": [f"Statement {i}." for i in range(4)], "needs_revision": True}
+    steps = iterative_steps([flagged, flagged, flagged])
+    state = PipelineState(raw_notes="Notes", output_path="out", case_name="Jane Doe")
+
+    state = asyncio.run(IterativePipeline(**steps, max_iterations=3).run_async(state))
+
+    assert steps["eval_step"].runs == 2
+    assert state.stop_reason == "Stalled: 100% of the flagged statements were flagged again after revision"
+
+
+def test_resumed_run_keeps_the_first_evaluations_budget(tmp_path):
+    reports = [
+        {"unsupported_statements": [f"First {i}." for i in range(7)], "needs_revision": True},
+        {"unsupported_statements": ["Second 1.", "Second 2."], "needs_revision": True},
+        {"unsupported_statements": ["Third 1."], "needs_revision": True},
+    ]
+
+    def make_state():
+        return PipelineState(raw_notes="Notes", output_path=str(tmp_path), case_name="Jane Doe")
+
+    uninterrupted = asyncio.run(IterativePipeline(**iterative_steps(reports), max_iterations=3)
+                                .run_async(make_state()))
+    assert uninterrupted.stop_reason == "Reached max iterations (3)"
+
+    # Interrupted during the second revision
+    steps = iterative_steps(reports)
+    revise = steps["revise_step"].action
+
+    def interrupt_second_revision(state):
+        if state.iteration_count == 1:
+            state.add_error("revise", ErrorSeverity.CRITICAL, "Interrupted")
+            return
+        revise(state)
+
+    steps["revise_step"].action = interrupt_second_revision
+    asyncio.run(IterativePipeline(**steps, max_iterations=3, checkpointing=True).run_async(make_state()))
+
+    steps = iterative_steps(reports[2:])
+    resumed = asyncio.run(IterativePipeline(**steps, max_iterations=3, checkpointing=True)
+                          .run_async(resume_state(make_state())))
+
+    assert steps["revise_step"].runs == 1
+    assert steps["eval_step"].runs == 1
+    assert resumed.completed_steps[-2:] == ["revision_2", "evaluation_3"]
+    assert resumed.stop_reason == uninterrupted.stop_reason
@@ -0,0 +1,95 @@
+"""
+Tests for chunked extraction: failed chunks and API errors.
+"""
+import asyncio
+import json
+
+from conftest import PROJECT_ROOT
+from fakes import COMPONENTS, FakeClient, iterative_steps, prompt_text
+
+from pipeline.checkpoint import load_checkpoint
+from pipeline.core import ErrorSeverity, PipelineState
+from pipeline.iterative import IterativePipeline
+from pipeline.llm_client import PromptLoader
+from pipeline.memo import StepMemo
+from pipeline.steps.extractor import ExtractorStep
+
+PROMPTS = PromptLoader(PROJECT_ROOT / "prompts")
+
+NOTES = "\n\n".join(
+    f"Session {i}\n\n{marker} The client described her work on the farm. "
+    + "She worked from dawn until late at night. " * 8
+    for i, marker in enumerate(["FIRST", "SECOND", "THIRD"], start=1)
+)
+
+
+def chunk_responder(broken: str = ""):
+    """Answer each chunk with its components, or with garbage for the broken one."""
+    def respond(prompt):
+        text = prompt_text(prompt)
+        if broken and broken in text:
+            return "I could not produce the components."
+        if "reformat" in text.lower() and "could not produce" in text:
+            return "Still not JSON."
+        marker = next(m for m in ("FIRST", "SECOND", "THIRD") if m in text)
+        return json.dumps({**COMPONENTS, "tasks": [f"Task from {marker.lower()} session"]})
+    return respond
+
+
+def make_step(client) -> ExtractorStep:
+    step = ExtractorStep(client, PROMPTS)
+    step.CHUNK_CHARS = 500
+    step.CHUNK_OVERLAP_CHARS = 0
+    return step
+
+
+def make_state(output_path="out") -> PipelineState:
+    return PipelineState(raw_notes=NOTES, output_path=str(output_path), case_name="Jane Doe")
+
+
+def test_chunks_are_extracted_and_merged_in_order():
+    state = asyncio.run(make_step(FakeClient(chunk_responder())).execute_async(make_state()))
+
+    assert not state.errors
+    assert state.extracted_components.tasks == \
+        ["Task from first session", "Task from second session", "Task from third session"]
+
+
+def test_failed_chunk_is_an_error_and_the_rest_are_merged():
+    state = asyncio.run(make_step(FakeClient(chunk_responder(broken="SECOND"))).execute_async(make_state()))
+
+    assert [e.severity for e in state.errors] == [ErrorSeverity.ERROR]
+    assert "chunk 2/3" in state.errors[0].message
+    assert state.extracted_components.tasks == ["Task from first session", "Task from third session"]
+
+
+def test_partial_extraction_is_not_checkpointed_or_memoized(tmp_path):
+    steps = iterative_steps([{"needs_revision": False}])
+    steps["extract_step"] = make_step(FakeClient(chunk_responder(broken="SECOND")))
+    pipeline = IterativePipeline(**steps, checkpointing=True, memoize=True)
+
+    state = pipeline.run(make_state(tmp_path))
+
+    assert "extraction" not in state.completed_steps
+    assert "extraction" not in load_checkpoint(str(tmp_path), "Jane Doe")["state"].completed_steps
+    memo = StepMemo.for_case(str(tmp_path), "Jane Doe")
+    assert StepMemo.fingerprint(steps["extract_step"], make_state(tmp_path)) not in memo.entries
+
+
+class FailingFirstChunkClient(FakeClient):
+    """Fails the first chunk at once with an API error; the other chunks take a while."""
+
+    async def agenerate(self, prompt, **kwargs):
+        if "FIRST" in prompt_text(prompt):
+            raise RuntimeError("API unavailable")
+        return await super().agenerate(prompt, **kwargs)
+
+
+def test_api_error_fails_the_step_after_every_chunk_settles():
+    client = FailingFirstChunkClient(chunk_responder(), delay=0.05)
+
+    state = asyncio.run(make_step(client).execute_async(make_state()))
+
+    assert state.has_critical_error()
+    assert "API unavailable" in state.errors[0].message
+    assert len(client.answered) == 2  # The other chunks finished before the step returned
@@ -0,0 +1,85 @@
+"""
+Tests for the local passive voice and -ing checks, and sentence splitting.
+"""
+import pytest
+
+from pipeline.grammar import check_grammar, is_continuous, is_passive, split_sentences
+
+
+@pytest.mark.parametrize("sentence", [
+    "I was paid nothing.",
+    "I was never paid for my work.",
+    "We were locked in the bunkhouse at night.",
+    "My passport was taken by Marco.",
+    "We were always being watched.",
+    "Mr. Smith was paid in cash.",
+])
+def test_passive_sentences_are_flagged(sentence):
+    assert is_passive(sentence)
+
+
+@pytest.mark.parametrize("sentence", [
+    "Marco never paid me.",
+    "I was scared.",
+    "I was tired and hungry.",
+    "I was supposed to send money home.",
+])
+def test_active_and_adjectival_sentences_are_not_flagged(sentence):
+    assert not is_passive(sentence)
+
+
+@pytest.mark.parametrize("sentence", [
+    "I was working in the fields.",
+    "He was sleeping on the floor.",
+    "We were constantly cleaning the rooms.",
+    "He was threatening my family.",
+    "They were always watching us.",
+])
+def test_continuous_sentences_are_flagged(sentence):
+    assert is_continuous(sentence)
+
+
+@pytest.mark.parametrize("sentence", [
+    "It was amazing.",
+    "It was boring",
+    "It was interesting.",
+    "It was really terrifying.",
+    "The worst thing was sleeping on the floor.",
+    "My job was cleaning the bathrooms.",
+    "It was morning when we left.",
+    "I was going to leave.",
+    "I worked every day.",
+    "My passport was missing.",
+])
+def test_adjectives_gerunds_and_nouns_are_not_flagged(sentence):
+    assert not is_continuous(sentence)
+
+
+def test_abbreviations_and_initials_dont_end_sentences():
+    text = "Mr. Smith hired me. I met Dr. J. Ramos at 5 p.m. on Sunday. He left at 6 p.m. Then I slept."
+
+    assert split_sentences(text) == [
+        "Mr. Smith hired me.",
+        "I met Dr. J. Ramos at 5 p.m. on Sunday.",
+        "He left at 6 p.m.",
+        "Then I slept.",
+    ]
+
+
+def test_bullets_and_lines_are_separate_sentences():
+    text = "Tasks:\n- Picked strawberries\n- Cleaned the bunkhouse\n1. Cooked for the crew"
+
+    assert split_sentences(text) == ["Tasks:", "Picked strawberries", "Cleaned the bunkhouse", "Cooked for the crew"]
+
+
+def test_flagged_sentences_are_quoted_verbatim_from_the_draft():
+    draft = ("Mr. Smith was paid by the farm. It was amazing how long the days were.\n\n"
+             "I was working for Mr. Diaz. I was never given a day off.")
+
+    issues = check_grammar(draft)
+
+    assert issues == {
+        "passive_voice_issues": ["Mr. Smith was paid by the farm.", "I was never given a day off."],
+        "ing_word_issues": ["I was working for Mr. Diaz."],
+    }
+    assert all(sentence in draft for found in issues.values() for sentence in found)
@@ -0,0 +1,82 @@
+"""
+Tests for the local grounding index and which sentences it sends to the LLM.
+"""
+import asyncio
+import json
+
+from conftest import PROJECT_ROOT
+from fakes import COMPONENTS, FakeClient, prompt_text
+
+from pipeline.core import PipelineState
+from pipeline.grounding import MIN_CONTENT_WORDS, UNKNOWN_DETAIL_CAP, GroundingIndex
+from pipeline.llm_client import PromptLoader
+from pipeline.models import Components
+from pipeline.steps.evaluator import EvaluatorStep
+
+PROMPTS = PromptLoader(PROJECT_ROOT / "prompts")
+
+INDEX = GroundingIndex({
+    **COMPONENTS,
+    "forced_labor_abuse": "He never hit me. He never paid me for the harvest work every week.",
+})
+
+
+def test_supported_sentence_is_pre_verified():
+    support = INDEX.score("I picked strawberries for 14 hours a day.")
+
+    assert support.score == 1.0
+    assert support.content_words >= MIN_CONTENT_WORDS
+    assert support.pre_verified
+
+
+def test_short_sentence_is_never_pre_verified():
+    support = INDEX.score("He hit me.")
+
+    assert support.content_words < MIN_CONTENT_WORDS
+    assert not support.pre_verified
+
+
+def test_negation_counts_as_content():
+    assert INDEX.score("He never hit me.").content_words == 2
+    assert INDEX.score("He didn't hit me.").content_words == 2
+
+
+def test_dropped_negation_is_capped():
+    support = INDEX.score("He paid me for the harvest work every week.")
+
+    assert support.score <= UNKNOWN_DETAIL_CAP
+    assert not support.pre_verified
+    assert INDEX.score("He never paid me for the harvest work every week.").pre_verified
+
+
+def test_added_negation_is_capped():
+    assert INDEX.score("I never picked strawberries for 14 hours a day.").score <= UNKNOWN_DETAIL_CAP
+
+
+def test_unknown_name_and_number_are_capped():
+    support = INDEX.score("Carlos Mendez made me pick strawberries for 16 hours a day.")
+
+    assert support.score <= UNKNOWN_DETAIL_CAP
+    assert set(support.unknown_details) == {"Carlos Mendez", "16"}
+
+
+def test_sentence_without_content_words_scores_zero():
+    support = INDEX.score("It was.")
+
+    assert support.score == 0.0
+    assert not support.pre_verified
+
+
+def test_evaluator_sends_short_sentences_to_grounding_check():
+    client = FakeClient(lambda prompt: json.dumps({"summary": "Checked."}))
+    state = PipelineState(
+        raw_notes="", output_path="out", case_name="Jane Doe",
+        extracted_components=Components.from_dict({**COMPONENTS, "forced_labor_abuse": "He never hit me."}),
+        draft_text="I picked strawberries for 14 hours a day. He hit me.",
+    )
+
+    state = asyncio.run(EvaluatorStep(client, PROMPTS).execute_async(state))
+
+    grounding_prompt = next(prompt_text(p) for p in client.prompts if "- He hit me." in prompt_text(p))
+    assert "- I picked strawberries" not in grounding_prompt
+    assert [s.pre_verified for s in state.evaluation_report.grounding.sentences] == [True, False]
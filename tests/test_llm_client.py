@@ -0,0 +1,155 @@
+"""
+Tests for continuing responses that stop at max_tokens, and for reporting
+the ones that are still cut off.
+"""
+import asyncio
+
+import pytest
+from conftest import PROJECT_ROOT
+from fakes import COMPONENTS, AsyncFakeAnthropic, FakeAnthropic, FakeClient, message
+
+from pipeline.core import ErrorSeverity, PipelineState
+from pipeline.llm_client import AsyncClaudeClient, ClaudeClient, PromptLoader, TruncatedResponseError
+from pipeline.models import Components, EvaluationReport
+from pipeline.rate_limiter import RateLimiter
+from pipeline.response_cache import ResponseCache
+from pipeline.steps.evaluator import EvaluatorStep
+from pipeline.steps.reviser import ReviserStep
+from pipeline.steps.writer import WriterStep
+
+PROMPTS = PromptLoader(PROJECT_ROOT / "prompts")
+
+
+def make_client(monkeypatch, responses, tmp_path, **kwargs) -> ClaudeClient:
+    sdk = FakeAnthropic(responses)
+    monkeypatch.setattr("pipeline.llm_client.get_anthropic_client", lambda api_key: sdk)
+    return ClaudeClient(api_key="test-key", rate_limiter=RateLimiter(), cache=ResponseCache(str(tmp_path)),
+                        **kwargs)
+
+
+def test_response_is_continued_until_complete(monkeypatch, tmp_path):
+    client = make_client(monkeypatch, [
+        message("The first half ", "max_tokens", 100),
+        message(" and the second half.", "end_turn", 50),
+    ], tmp_path)
+
+    assert client.generate("Write.", max_tokens=100) == "The first half and the second half."
+    continuation = client.client.requests[1]
+    assert continuation["messages"][1] == {"role": "assistant", "content": "The first half"}
+    assert client.generate("Write.", max_tokens=100) == "The first half and the second half."
+    assert len(client.client.requests) == 2
+
+
+def test_response_cut_off_at_output_cap_raises_and_isnt_cached(monkeypatch, tmp_path):
+    client = make_client(monkeypatch, [
+        message("The first half", "max_tokens", 100),
+        message(" and some more", "max_tokens", 50),
+        message("A complete answer.", "end_turn", 50),
+    ], tmp_path, max_output_tokens=150)
+
+    with pytest.raises(TruncatedResponseError) as error:
+        client.generate("Write.", max_tokens=100)
+
+    assert error.value.text == "The first half and some more"
+    assert error.value.output_tokens == 150
+    assert client.generate("Write.", max_tokens=100) == "A complete answer."
+    assert len(client.client.requests) == 3
+
+
+def test_streamed_response_cut_off_raises_after_the_text(monkeypatch, tmp_path):
+    client = make_client(monkeypatch, [message("Cut off mid", "max_tokens", 100)], tmp_path,
+                         max_output_tokens=100)
+    deltas = []
+
+    with pytest.raises(TruncatedResponseError) as error:
+        client.generate("Write.", max_tokens=100, on_delta=lambda delta, tokens: deltas.append(delta))
+
+    assert deltas == ["Cut off mid"]
+    assert error.value.text == "Cut off mid"
+    assert not list(tmp_path.rglob("*.json"))
+
+
+def test_async_response_cut_off_raises(monkeypatch, tmp_path):
+    client = AsyncClaudeClient(api_key="test-key", rate_limiter=RateLimiter(),
+                               cache=ResponseCache(str(tmp_path)), max_output_tokens=100)
+    monkeypatch.setattr(AsyncClaudeClient, "client", AsyncFakeAnthropic([message("Cut off", "max_tokens", 100)]))
+
+    with pytest.raises(TruncatedResponseError):
+        asyncio.run(client.generate("Write.", max_tokens=100))
+    assert not list(tmp_path.rglob("*.json"))
+
+
+class TruncatingClient(FakeClient):
+    """FakeClient whose answers are all cut off at the output limit."""
+
+    async def agenerate(self, prompt, **kwargs) -> str:
+        self.prompts.append(prompt)
+        raise TruncatedResponseError(self.responder(prompt), 4096)
+
+
+def make_state(**values) -> PipelineState:
+    return PipelineState(raw_notes="", output_path="out", case_name="Jane Doe",
+                         extracted_components=Components.from_dict(COMPONENTS), **values)
+
+
+def test_writer_keeps_a_cut_off_draft_with_an_error():
+    client = TruncatingClient(lambda prompt: "I picked strawberries for Marco Diaz. He never")
+
+    state = asyncio.run(WriterStep(client, PROMPTS).execute_async(make_state()))
+
+    assert state.draft_text == "I picked strawberries for Marco Diaz. He never"
+    assert [e.severity for e in state.errors] == [ErrorSeverity.ERROR]
+    assert "cut off at the output limit" in state.errors[0].message
+
+
+def test_reviser_keeps_the_draft_when_the_revision_is_cut_off():
+    client = TruncatingClient(lambda prompt: "A revised draft that stops")
+    evaluation = EvaluationReport.from_dict({"missing_elements": ["Task list"], "needs_revision": True})
+    state = make_state(draft_text="The original draft.", evaluation_report=evaluation)
+
+    state = asyncio.run(ReviserStep(client, PROMPTS).execute_async(state))
+
+    assert state.draft_text == "The original draft."
+    assert state.iteration_count == 0
+    assert [e.severity for e in state.errors] == [ErrorSeverity.ERROR]
+
+
+def test_cut_off_tool_call_raises_and_isnt_cached(monkeypatch, tmp_path):
+    tool = {"name": "record_findings", "description": "Findings", "input_schema": {"type": "object"}}
+    client = make_client(monkeypatch, [
+        message(tool_input={"unsupported_statements": ["a"]}, stop_reason="max_tokens"),
+        message(tool_input={"unsupported_statements": ["a", "b"], "summary": "Two."}),
+    ], tmp_path)
+
+    with pytest.raises(TruncatedResponseError) as error:
+        client.generate("Evaluate.", max_tokens=100, tool=tool)
+
+    assert error.value.text == '{"unsupported_statements": ["a"]}'
+    assert len(client.client.requests) == 1
+    assert client.generate("Evaluate.", max_tokens=100, tool=tool) == \
+        '{"unsupported_statements": ["a", "b"], "summary": "Two."}'
+
+
+def test_cut_off_grounding_check_never_approves_the_draft(monkeypatch, tmp_path):
+    def respond(kwargs):
+        if kwargs["tool_choice"]["name"] == "record_grounding_findings":
+            # Cut off before the categories that matter
+            return message(tool_input={"summary": "The draft"}, stop_reason="max_tokens")
+        return message(tool_input={"missing_elements": [], "summary": "Complete."})
+
+    client = make_client(monkeypatch, respond, tmp_path)
+    state = make_state(draft_text="He hit me.")
+
+    state = asyncio.run(EvaluatorStep(client, PROMPTS).execute_async(state))
+
+    grounding_calls = [r for r in client.client.requests
+                       if r["tool_choice"]["name"] == "record_grounding_findings"]
+    assert [r["max_tokens"] for r in grounding_calls] == [
+        grounding_calls[0]["max_tokens"], grounding_calls[0]["max_tokens"] * 2
+    ]
+    assert state.evaluation_report.needs_revision
+    assert "truncated at max_tokens" in state.evaluation_report.error
+    assert any(e.severity == ErrorSeverity.ERROR for e in state.errors)
+
+    # Only the complete structure check was cached
+    assert len(list(tmp_path.rglob("*.json"))) == 1
@@ -0,0 +1,109 @@
+"""
+Tests for step memoization on input fingerprints.
+"""
+from fakes import FakeClient, ScriptedStep, iterative_steps
+
+from pipeline.core import PipelineState
+from pipeline.iterative import IterativePipeline
+from pipeline.llm_client import PromptLoader
+from pipeline.memo import StepMemo
+
+APPROVED = {"needs_revision": False}
+
+
+def make_state(output_path="out") -> PipelineState:
+    return PipelineState(raw_notes="Interview notes", output_path=str(output_path), case_name="Jane Doe")
+
+
+def make_step(prompts_dir, model: str = "fake-model", temperature: float = 0.0) -> ScriptedStep:
+    step = ScriptedStep("extract", lambda state: None, reads=("raw_notes", "case_specifics"),
+                        writes=("extracted_components",))
+    step.client = FakeClient(lambda prompt: "", model=model, temperature=temperature)
+    step.prompt_loader = PromptLoader(str(prompts_dir))
+    step.prompt_names = ("01-extraction",)
+    return step
+
+
+def write_prompt(prompts_dir, text: str) -> None:
+    prompts_dir.mkdir(exist_ok=True)
+    (prompts_dir / "01-extraction.md").write_text(text, encoding="utf-8")
+
+
+def test_fingerprint_is_stable_for_the_same_inputs(tmp_path):
+    write_prompt(tmp_path, "Extract {notes}")
+
+    assert StepMemo.fingerprint(make_step(tmp_path), make_state()) == \
+        StepMemo.fingerprint(make_step(tmp_path), make_state())
+
+
+def test_fingerprint_covers_inputs_model_temperature_and_options(tmp_path):
+    write_prompt(tmp_path, "Extract {notes}")
+    base = StepMemo.fingerprint(make_step(tmp_path), make_state())
+
+    changed_input = make_state()
+    changed_input.case_specifics = "Farm work"
+    with_options = make_step(tmp_path)
+    with_options.memo_options = {"count": 3}
+
+    variants = [
+        StepMemo.fingerprint(make_step(tmp_path), changed_input),
+        StepMemo.fingerprint(make_step(tmp_path, model="other-model"), make_state()),
+        StepMemo.fingerprint(make_step(tmp_path, temperature=0.8), make_state()),
+        StepMemo.fingerprint(with_options, make_state()),
+    ]
+    assert len({base, *variants}) == 5
+
+
+def test_fingerprint_ignores_fields_the_step_doesnt_read(tmp_path):
+    write_prompt(tmp_path, "Extract {notes}")
+    state = make_state()
+    before = StepMemo.fingerprint(make_step(tmp_path), state)
+
+    state.draft_text = "A draft"
+    state.iteration_count = 2
+
+    assert StepMemo.fingerprint(make_step(tmp_path), state) == before
+
+
+def test_fingerprint_changes_when_the_prompt_is_edited(tmp_path):
+    write_prompt(tmp_path, "Extract {notes}")
+    before = StepMemo.fingerprint(make_step(tmp_path), make_state())
+
+    write_prompt(tmp_path, "Extract every detail from {notes}")
+
+    assert StepMemo.fingerprint(make_step(tmp_path), make_state()) != before
+
+
+def test_undeclared_steps_are_not_memoized():
+    step = ScriptedStep("undeclared", lambda state: None, reads=None)
+
+    assert StepMemo.fingerprint(step, make_state()) is None
+
+
+def test_store_save_and_restore(tmp_path):
+    memo = StepMemo.for_case(str(tmp_path), "Jane Doe")
+    step = ScriptedStep("write", lambda state: None, reads=("raw_notes",), writes=("draft_text",))
+    state = make_state()
+    state.draft_text = "Stored draft"
+    state.step_outputs["writing"] = "Stored draft"
+    memo.store("abc", step, state, step_outputs_before={})
+    memo.save()
+
+    restored = make_state()
+    assert StepMemo.for_case(str(tmp_path), "Jane Doe").restore("abc", step, restored)
+    assert restored.draft_text == "Stored draft"
+    assert restored.step_outputs == {"writing": "Stored draft"}
+    assert not StepMemo.for_case(str(tmp_path), "Jane Doe").restore("other", step, make_state())
+
+
+def test_regenerating_a_case_reuses_unchanged_steps(tmp_path):
+    first_steps = iterative_steps([APPROVED])
+    first = IterativePipeline(**first_steps, memoize=True).run(make_state(tmp_path))
+
+    second_steps = iterative_steps([APPROVED])
+    second = IterativePipeline(**second_steps, memoize=True).run(make_state(tmp_path))
+
+    assert [step.runs for step in first_steps.values()] == [1, 1, 1, 0]
+    assert [step.runs for step in second_steps.values()] == [0, 0, 0, 0]
+    assert second.draft_text == first.draft_text
+    assert second.evaluation_report == first.evaluation_report
@@ -0,0 +1,67 @@
+"""
+Tests for the typed components and evaluation reports.
+"""
+import pytest
+from fakes import COMPONENTS
+
+from pipeline.models import (BLOCKING_CATEGORIES, MISSING, Components, EvaluationReport,
+                             GroundingScores, SentenceScore, is_missing)
+from pipeline.steps.evaluator import EvaluatorStep
+
+
+@pytest.mark.parametrize("value, missing", [
+    (None, True), ("", True), ("  missing ", True), (["MISSING", " "], True), ([], True),
+    ("Marco Diaz", False), (["MISSING", "Cleaned"], False), (0, False),
+])
+def test_is_missing(value, missing):
+    assert is_missing(value) is missing
+
+
+def test_components_normalize_llm_output():
+    components = Components.from_dict({
+        "trafficker_identity": ["Marco Diaz", "MISSING", "owner of Diaz Farms"],
+        "tasks": "Picked strawberries",
+        "forced_labor_abuse": "  ",
+        "unexpected": "dropped",
+    })
+
+    assert components == Components(
+        trafficker_identity="Marco Diaz\n\nowner of Diaz Farms",
+        tasks=["Picked strawberries"],
+        forced_labor_abuse=MISSING,
+    )
+    assert components.missing() == ["forced_labor_abuse", "force_fraud_coercion"]
+
+
+def test_components_round_trip():
+    components = Components.from_dict(COMPONENTS)
+
+    assert Components.from_json(components.to_json()) == components
+    assert Components().to_dict()["tasks"] == MISSING
+
+
+def test_from_dict_rejects_non_dicts():
+    with pytest.raises(TypeError):
+        Components.from_dict(["not", "a", "dict"])
+    with pytest.raises(TypeError):
+        EvaluationReport.from_dict("not a dict")
+
+
+def test_evaluation_report_round_trip():
+    report = EvaluationReport(
+        unsupported_statements=["He beat me."],
+        missing_elements=["Task list"],
+        needs_revision=True,
+        summary="Grounding: one issue.",
+        grounding=GroundingScores(0.85, [SentenceScore("He beat me.", 0.5, False, ["16"])]),
+        error="structure: bad JSON",
+    )
+
+    assert EvaluationReport.from_json(report.to_json()) == report
+    assert "grounding" not in EvaluationReport().to_dict()
+    assert report.blocking_count() == 2
+    assert not report.all_supported
+
+
+def test_evaluator_blocks_on_shared_categories():
+    assert {c for _, _, categories in EvaluatorStep.CHECKS for c in categories} == set(BLOCKING_CATEGORIES)
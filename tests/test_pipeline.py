@@ -0,0 +1,126 @@
+"""
+Tests for the asyncio pipeline engine in pipeline.core.
+"""
+import asyncio
+
+import pytest
+
+from pipeline.core import ErrorSeverity, Pipeline, PipelineState, PipelineStep
+
+
+def make_state() -> PipelineState:
+    return PipelineState(raw_notes="notes", output_path="out", case_name="case")
+
+
+class RecordingStep(PipelineStep):
+    """Step that logs when it starts and finishes, sleeping in between."""
+
+    def __init__(self, name, log, reads=None, writes=(), delay=0.01, severity=None):
+        self._name = name
+        self.log = log
+        self.reads = reads
+        self.writes = writes
+        self.delay = delay
+        self.severity = severity
+
+    @property
+    def name(self) -> str:
+        return self._name
+
+    async def execute_async(self, state: PipelineState) -> PipelineState:
+        self.log.append(("start", self._name))
+        await asyncio.sleep(self.delay)
+        if self.severity:
+            state.add_error(self._name, self.severity, "failed")
+        self.log.append(("end", self._name))
+        return state
+
+
+def started_before_finished(log, first, second) -> bool:
+    """True if `second` started before `first` finished (the two overlapped)."""
+    return log.index(("start", second)) < log.index(("end", first))
+
+
+def test_independent_steps_run_concurrently():
+    log = []
+    steps = [
+        RecordingStep("a", log, reads=("raw_notes",), writes=("extracted_components",)),
+        RecordingStep("b", log, reads=("case_specifics",), writes=("stop_reason",)),
+    ]
+
+    Pipeline(steps).run(make_state())
+
+    assert started_before_finished(log, "a", "b")
+
+
+def test_dependent_steps_wait_for_their_inputs():
+    log = []
+    steps = [
+        RecordingStep("extract", log, reads=("raw_notes",), writes=("extracted_components",)),
+        RecordingStep("write", log, reads=("extracted_components",), writes=("draft_text",)),
+    ]
+
+    Pipeline(steps).run(make_state())
+
+    assert log == [("start", "extract"), ("end", "extract"), ("start", "write"), ("end", "write")]
+
+
+def test_undeclared_steps_run_in_order():
+    log = []
+    steps = [
+        RecordingStep("a", log, reads=("raw_notes",), writes=("extracted_components",)),
+        RecordingStep("undeclared", log),
+        RecordingStep("c", log, reads=("case_specifics",), writes=("stop_reason",)),
+    ]
+
+    Pipeline(steps).run(make_state())
+
+    assert [name for event, name in log if event == "start"] == ["a", "undeclared", "c"]
+    assert not started_before_finished(log, "undeclared", "c")
+
+
+def test_critical_error_stops_later_steps():
+    log = []
+    steps = [
+        RecordingStep("fails", log, severity=ErrorSeverity.CRITICAL),
+        RecordingStep("skipped", log),
+    ]
+
+    state = Pipeline(steps).run(make_state())
+
+    assert state.has_critical_error()
+    assert ("start", "skipped") not in log
+
+
+def test_unexpected_exception_becomes_critical_error():
+    class Raising(RecordingStep):
+        async def execute_async(self, state):
+            raise RuntimeError("boom")
+
+    state = Pipeline([Raising("raising", [])]).run(make_state())
+
+    assert [(e.step_name, e.severity) for e in state.errors] == [("raising", ErrorSeverity.CRITICAL)]
+    assert "boom" in state.errors[0].message
+
+
+def test_progress_reaches_100():
+    progress = []
+    steps = [RecordingStep("a", []), RecordingStep("b", [])]
+
+    Pipeline(steps).run(make_state(), lambda message, percent: progress.append(percent))
+
+    assert progress[-1] == 100
+    assert progress == sorted(progress)
+
+
+def test_unknown_state_field_is_rejected():
+    with pytest.raises(ValueError, match="unknown state fields"):
+        Pipeline([RecordingStep("a", [], reads=("no_such_field",))])
+
+
+def test_execute_runs_step_synchronously():
+    log = []
+
+    RecordingStep("sync", log).execute(make_state())
+
+    assert log == [("start", "sync"), ("end", "sync")]
@@ -0,0 +1,135 @@
+"""
+Tests for the per-model rate limiter and its use by the streaming clients.
+"""
+import asyncio
+
+import pytest
+
+from pipeline.llm_client import AsyncClaudeClient, ClaudeClient
+from pipeline.rate_limiter import RateLimiter, get_rate_limiter
+
+HEADERS = {
+    "anthropic-ratelimit-requests-limit": "50",
+    "anthropic-ratelimit-requests-remaining": "10",
+    "anthropic-ratelimit-output-tokens-limit": "8000",
+    "anthropic-ratelimit-output-tokens-remaining": "4000",
+}
+
+
+def test_each_model_gets_its_own_limiter():
+    haiku = get_rate_limiter("claude-haiku-4-5-20251001")
+    sonnet = get_rate_limiter("claude-sonnet-4-20250514")
+
+    assert haiku is not sonnet
+    assert get_rate_limiter("claude-haiku-4-5-20251001") is haiku
+
+
+def test_headers_update_only_their_models_limits():
+    haiku = get_rate_limiter("test-model-a")
+    sonnet = get_rate_limiter("test-model-b")
+    sonnet_capacity = sonnet.output_tokens.capacity
+
+    haiku.update_from_headers(HEADERS)
+
+    assert haiku.output_tokens.capacity == 8000
+    assert haiku.output_tokens.tokens <= 4000
+    assert haiku.requests.capacity == 50
+    assert sonnet.output_tokens.capacity == sonnet_capacity
+
+
+def test_clients_use_their_models_limiter(monkeypatch):
+    monkeypatch.setattr("pipeline.llm_client.get_anthropic_client", lambda api_key: None)
+    client = ClaudeClient(api_key="test-key", model="test-model-c")
+
+    assert client.rate_limiter is get_rate_limiter("test-model-c")
+
+
+def test_settle_returns_unused_reservation():
+    limiter = RateLimiter(output_tokens_per_minute=10000)
+    limiter.acquire(100, 4000)
+    assert limiter.output_tokens.tokens == pytest.approx(6000, abs=5)
+
+    limiter.settle(4000, 1000)
+
+    assert limiter.output_tokens.tokens == pytest.approx(9000, abs=5)
+
+
+def test_reservation_waits_when_budget_is_spent():
+    limiter = RateLimiter(requests_per_minute=60)
+    limiter.requests.tokens = 0
+
+    assert limiter._reserve(1, 1) == pytest.approx(1.0, abs=0.05)
+
+
+class FailingStream:
+    """messages.stream() context whose text stream fails after one delta."""
+
+    def __init__(self):
+        self.response = type("Response", (), {"headers": {}})()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    @property
+    def text_stream(self):
+        def deltas():
+            yield "Partial "
+            raise ConnectionError("stream dropped")
+        return deltas()
+
+
+class FailingAsyncStream(FailingStream):
+    @property
+    def text_stream(self):
+        async def deltas():
+            yield "Partial "
+            raise ConnectionError("stream dropped")
+        return deltas()
+
+
+class FakeMessages:
+    def __init__(self, stream_type):
+        self.stream_type = stream_type
+
+    def stream(self, **kwargs):
+        return self.stream_type()
+
+
+class FakeAnthropic:
+    def __init__(self, stream_type):
+        self.messages = FakeMessages(stream_type)
+
+
+def test_failed_stream_returns_its_reservation(monkeypatch):
+    monkeypatch.setattr("pipeline.llm_client.get_anthropic_client",
+                        lambda api_key: FakeAnthropic(FailingStream))
+    limiter = RateLimiter(output_tokens_per_minute=10000, max_retries=0)
+    client = ClaudeClient(api_key="test-key", rate_limiter=limiter, streaming=True)
+
+    with pytest.raises(ConnectionError):
+        list(client.generate_stream("prompt", max_tokens=4000))
+
+    assert limiter.output_tokens.tokens == pytest.approx(10000, abs=5)
+
+
+def test_failed_async_stream_returns_its_reservation(monkeypatch):
+    limiter = RateLimiter(output_tokens_per_minute=10000, max_retries=0)
+    client = AsyncClaudeClient(api_key="test-key", rate_limiter=limiter, streaming=True)
+    monkeypatch.setattr(AsyncClaudeClient, "client", FakeAnthropic(FailingAsyncStream))
+
+    async def consume():
+        return [delta async for delta in client.generate_stream("prompt", max_tokens=4000)]
+
+    with pytest.raises(ConnectionError):
+        asyncio.run(consume())
+
+    assert limiter.output_tokens.tokens == pytest.approx(10000, abs=5)
@@ -0,0 +1,136 @@
+"""
+Tests for paragraph-level revision: locating flagged statements and splicing.
+"""
+import asyncio
+
+from conftest import PROJECT_ROOT
+from fakes import COMPONENTS, FakeClient, prompt_text
+
+from pipeline.core import PipelineState
+from pipeline.llm_client import PromptLoader
+from pipeline.models import Components, EvaluationReport
+from pipeline.steps.reviser import ReviserStep
+
+PROMPTS = PromptLoader(PROJECT_ROOT / "prompts")
+
+DRAFT = (
+    "I worked on the farm of Marco Diaz.\n\n"
+    "He made me pick strawberries for 16 hours a day.\n"
+    "I was never paid.\n  \n\n"
+    "He kept my passport in his office.\t\n\n"
+    "He said my family would be arrested."
+)
+
+
+def report(**findings) -> EvaluationReport:
+    return EvaluationReport.from_dict({"needs_revision": True, **findings})
+
+
+def make_state(evaluation: EvaluationReport) -> PipelineState:
+    return PipelineState(
+        raw_notes="", output_path="out", case_name="Jane Doe",
+        extracted_components=Components.from_dict(COMPONENTS),
+        draft_text=DRAFT,
+        evaluation_report=evaluation,
+    )
+
+
+def paragraph_responder(prompt) -> str:
+    """Rewrite a paragraph prompt's paragraph as REVISED, and a whole draft as WHOLE DRAFT."""
+    text = prompt_text(prompt)
+    if "16 hours" in text and "(Before)" in text:
+        return "REVISED: He made me pick strawberries for 14 hours a day. I was never paid.\n"
+    return "WHOLE DRAFT"
+
+
+def revise(evaluation: EvaluationReport, responder=paragraph_responder):
+    client = FakeClient(responder)
+    state = asyncio.run(ReviserStep(client, PROMPTS).execute_async(make_state(evaluation)))
+    return state, client
+
+
+def test_locate_issues_maps_statements_to_paragraphs():
+    step = ReviserStep(FakeClient(paragraph_responder), PROMPTS)
+    paragraphs = ReviserStep.PARAGRAPH_SEPARATOR.split(DRAFT)[::2]
+
+    flagged = step._locate_issues(paragraphs, report(
+        unsupported_statements=["He made me pick  strawberries for 16 hours a day."],
+        uncertain_statements=["“He said my family would be arrested.”"],
+        passive_voice_issues=["He said my family would be arrested.", "I was never paid."],
+        ing_word_issues=["I worked on the farm of Marco Diaz."],
+    ))
+
+    assert flagged == {
+        1: ["UNSUPPORTED: He made me pick  strawberries for 16 hours a day.",
+            "PASSIVE_VOICE (optional): I was never paid."],
+        3: ["UNCERTAIN: “He said my family would be arrested.”",
+            "PASSIVE_VOICE (optional): He said my family would be arrested."],
+    }
+
+
+def test_locate_issues_needs_every_blocking_statement():
+    step = ReviserStep(FakeClient(paragraph_responder), PROMPTS)
+    paragraphs = ReviserStep.PARAGRAPH_SEPARATOR.split(DRAFT)[::2]
+
+    assert step._locate_issues(paragraphs, report(
+        unsupported_statements=["He made me pick strawberries for 16 hours a day.",
+                                "He beat me every night."],
+    )) is None
+    assert step._locate_issues(paragraphs, report(passive_voice_issues=["I was never paid."])) is None
+
+
+def test_only_flagged_paragraph_is_rewritten():
+    state, client = revise(report(unsupported_statements=["He made me pick strawberries for 16 hours a day."]))
+
+    assert len(client.prompts) == 1
+    assert "(After) He kept my passport in his office." in prompt_text(client.prompts[0])
+    assert state.draft_text == (
+        "I worked on the farm of Marco Diaz.\n\n"
+        "REVISED: He made me pick strawberries for 14 hours a day. I was never paid.\n  \n\n"
+        "He kept my passport in his office.\t\n\n"
+        "He said my family would be arrested."
+    )
+    assert state.iteration_count == 1
+    assert state.step_outputs["revision_1"] == state.draft_text
+
+
+def test_removed_paragraph_takes_one_separator_with_it():
+    state, _ = revise(
+        report(unsupported_statements=["He kept my passport in his office."]),
+        responder=lambda prompt: "",
+    )
+
+    assert state.draft_text == (
+        "I worked on the farm of Marco Diaz.\n\n"
+        "He made me pick strawberries for 16 hours a day.\n"
+        "I was never paid.\n\n"
+        "He said my family would be arrested."
+    )
+
+
+def test_unlocated_statement_falls_back_to_full_rewrite():
+    state, client = revise(report(unsupported_statements=["He beat me every night."]))
+
+    assert len(client.prompts) == 1
+    assert "(Before)" not in prompt_text(client.prompts[0])
+    assert state.draft_text == "WHOLE DRAFT"
+
+
+def test_missing_elements_fall_back_to_full_rewrite():
+    state, client = revise(report(
+        unsupported_statements=["He made me pick strawberries for 16 hours a day."],
+        missing_elements=["Statement of the tasks performed"],
+    ))
+
+    assert len(client.prompts) == 1
+    assert state.draft_text == "WHOLE DRAFT"
+
+
+def test_approved_draft_is_not_revised():
+    evaluation = report()
+    evaluation.needs_revision = False
+    state, client = revise(evaluation)
+
+    assert not client.prompts
+    assert state.final_text == DRAFT
+    assert state.iteration_count == 0
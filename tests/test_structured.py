@@ -0,0 +1,126 @@
+"""
+Tests for structured responses: local JSON repair and the reformat fallback.
+"""
+import asyncio
+import json
+
+import pytest
+from conftest import PROJECT_ROOT
+from fakes import FakeClient, prompt_text
+
+from pipeline.llm_client import PromptLoader, TruncatedResponseError
+from pipeline.structured import generate_structured, make_tool, parse_json, repair_json, string_list
+
+PROMPTS = PromptLoader(PROJECT_ROOT / "prompts")
+
+TOOL = make_tool("record_findings", "Findings", {"summary": {"type": "string"},
+                                                  "issues": string_list("Issues")})
+
+
+@pytest.mark.parametrize("broken, repaired", [
+    ('{"a": "x", "b": ["y", "z"', '{"a": "x", "b": ["y", "z"]}'),
+    ('{"a": "unterminated', '{"a": "unterminated"}'),
+    ('{"a": "q\\"uote', '{"a": "q\\"uote"}'),
+    ('{"a": 1, "b":', '{"a": 1}'),
+    ('{"a": 1, "b"', '{"a": 1}'),
+    ('{"a": {"b": 1,', '{"a": {"b": 1}}'),
+    ('{"a": [1, 2,], }', '{"a": [1, 2] }'),
+    ('[1, 2', '[1, 2]'),
+    ('Here you go: {"a": 1} hope that helps {"b": 2}', '{"a": 1}'),
+])
+def test_repair_json(broken, repaired):
+    assert repair_json(broken) == repaired
+    json.loads(repaired)
+
+
+def test_repair_json_without_json():
+    assert repair_json("I can't help with that.") is None
+
+
+def test_parse_json_strips_fences_and_repairs():
+    assert parse_json('```json\n{"a": [1, 2,]}\n```') == {"a": [1, 2]}
+    assert parse_json('```\n[1, 2]\n```') == [1, 2]
+    assert parse_json('{"summary": "Cut off mid') == {"summary": "Cut off mid"}
+
+
+def test_parse_json_raises_when_unrepairable():
+    with pytest.raises(json.JSONDecodeError):
+        parse_json("No JSON at all.")
+    with pytest.raises(json.JSONDecodeError):
+        parse_json('{"a": nope}')
+
+
+def test_make_tool_requires_every_property_by_default():
+    assert TOOL["input_schema"]["required"] == ["summary", "issues"]
+    assert make_tool("t", "d", {"a": {}}, required=())["input_schema"]["required"] == []
+
+
+def test_generate_structured_repairs_without_another_call():
+    client = FakeClient(lambda prompt: '{"summary": "Fine", "issues": ["One", "Tw')
+
+    result = asyncio.run(generate_structured(client, "Evaluate.", TOOL, 100, PROMPTS))
+
+    assert result == {"summary": "Fine", "issues": ["One", "Tw"]}
+    assert len(client.prompts) == 1
+
+
+def test_generate_structured_asks_for_a_reformat():
+    answers = ["Summary: fine. Issues: none.", '{"summary": "fine", "issues": []}']
+    client = FakeClient(lambda prompt: answers.pop(0))
+
+    result = asyncio.run(generate_structured(client, "Evaluate.", TOOL, 100, PROMPTS))
+
+    assert result == {"summary": "fine", "issues": []}
+    reformat = prompt_text(client.prompts[1])
+    assert "Summary: fine. Issues: none." in reformat
+    assert json.dumps(TOOL["input_schema"]) in reformat
+
+
+def test_generate_structured_without_loader_raises():
+    client = FakeClient(lambda prompt: "Summary: fine.")
+
+    with pytest.raises(json.JSONDecodeError):
+        asyncio.run(generate_structured(client, "Evaluate.", TOOL, 100))
+    assert len(client.prompts) == 1
+
+
+def test_generate_structured_needs_an_object():
+    client = FakeClient(lambda prompt: '["not", "an", "object"]')
+
+    with pytest.raises(json.JSONDecodeError):
+        asyncio.run(generate_structured(client, "Evaluate.", TOOL, 100, PROMPTS))
+    assert len(client.prompts) == 2
+
+
+class CutOffClient(FakeClient):
+    """FakeClient whose answers are cut off unless max_tokens is at least `needs`."""
+
+    def __init__(self, responder, needs: int):
+        super().__init__(responder)
+        self.needs = needs
+        self.budgets = []
+
+    async def agenerate(self, prompt, max_tokens: int = 4096, **kwargs) -> str:
+        self.prompts.append(prompt)
+        self.budgets.append(max_tokens)
+        response = self.responder(prompt)
+        if max_tokens < self.needs:
+            raise TruncatedResponseError(response[:len(response) // 2], max_tokens)
+        return response
+
+
+def test_cut_off_tool_call_is_retried_with_a_larger_budget():
+    client = CutOffClient(lambda prompt: '{"summary": "Fine", "issues": ["One"]}', needs=150)
+
+    result = asyncio.run(generate_structured(client, "Evaluate.", TOOL, 100, PROMPTS))
+
+    assert result == {"summary": "Fine", "issues": ["One"]}
+    assert client.budgets == [100, 200]
+
+
+def test_cut_off_tool_call_fails_instead_of_being_repaired():
+    client = CutOffClient(lambda prompt: '{"summary": "Fine", "issues": ["One"]}', needs=1000)
+
+    with pytest.raises(json.JSONDecodeError, match="truncated at max_tokens"):
+        asyncio.run(generate_structured(client, "Evaluate.", TOOL, 100, PROMPTS))
+    assert client.budgets == [100, 200]
@@ -0,0 +1,137 @@
+"""
+Tests for grounding-checking paragraphs while the draft streams in.
+"""
+import asyncio
+import json
+import threading
+
+from conftest import PROJECT_ROOT
+from fakes import COMPONENTS, FakeAnthropic, FakeClient, FakeStream, message, prompt_text
+
+from pipeline.core import PipelineState
+from pipeline.llm_client import ClaudeClient, PromptLoader
+from pipeline.models import Components
+from pipeline.rate_limiter import RateLimiter
+from pipeline.steps.evaluator import EvaluatorStep
+from pipeline.steps.writer import WriterStep
+
+PROMPTS = PromptLoader(PROJECT_ROOT / "prompts")
+
+DRAFT = (
+    "He hit me with a belt every night.\n\n"
+    "Marco Diaz made me pick strawberries for 14 hours a day.\n\n"
+    "He never paid me and kept my passport."
+)
+FLAGGED = "He hit me with a belt every night."
+
+
+class ParagraphStream(FakeStream):
+    """
+    Streams the response in small deltas, holding the stream after the first
+    paragraph until its grounding check has started.
+    """
+
+    def __init__(self, response, first_checked: threading.Event):
+        super().__init__(response)
+        self.first_checked = first_checked
+        self.threads = set()
+
+    @property
+    def text_stream(self):
+        return self._deltas()
+
+    def _deltas(self):
+        self.threads.add(threading.get_ident())
+        first, rest = self.final.content[0].text.split("\n\n", 1)
+        yield first + "\n\n"
+        # The client holds back the break until text follows it
+        yield rest[:10]
+        # Only returns once the event loop has started the check dispatched from this thread
+        assert self.first_checked.wait(timeout=5), "first paragraph wasn't checked while streaming"
+        yield from (rest[i:i + 10] for i in range(10, len(rest), 10))
+
+
+class ParagraphAnthropic(FakeAnthropic):
+    """SDK client whose streams are ParagraphStreams."""
+
+    def __init__(self, responses, first_checked: threading.Event):
+        super().__init__(responses)
+        self.first_checked = first_checked
+        self.opened = []
+
+    def stream(self, **kwargs):
+        stream = ParagraphStream(self._respond(kwargs), self.first_checked)
+        self.opened.append(stream)
+        return stream
+
+
+def make_writer_client(monkeypatch, first_checked: threading.Event) -> ClaudeClient:
+    sdk = ParagraphAnthropic([message(DRAFT, output_tokens=40)], first_checked)
+    monkeypatch.setattr("pipeline.llm_client.get_anthropic_client", lambda api_key: sdk)
+    return ClaudeClient(api_key="test-key", rate_limiter=RateLimiter(), cache=None)
+
+
+def make_evaluator_client(first_checked: threading.Event) -> FakeClient:
+    def respond(prompt):
+        text = prompt_text(prompt)
+        if "Evaluation: Grounding" in text:
+            if FLAGGED in text:
+                first_checked.set()
+            return json.dumps({
+                "unsupported_statements": [FLAGGED] if FLAGGED in text else [],
+                "uncertain_statements": [],
+                "summary": "Checked.",
+            })
+        return json.dumps({"missing_elements": [], "summary": "Complete."})
+
+    return FakeClient(respond)
+
+
+def grounding_calls(client: FakeClient):
+    return [p for p in client.prompts if "Evaluation: Grounding" in prompt_text(p)]
+
+
+def test_paragraphs_streamed_from_a_worker_thread_are_checked_once(monkeypatch, tmp_path):
+    first_checked = threading.Event()
+    writer_client = make_writer_client(monkeypatch, first_checked)
+    evaluator_client = make_evaluator_client(first_checked)
+    evaluator = EvaluatorStep(evaluator_client, PROMPTS)
+    state = PipelineState(raw_notes="", output_path=str(tmp_path), case_name="Jane Doe",
+                          extracted_components=Components.from_dict(COMPONENTS))
+
+    async def write_and_evaluate():
+        state_ = await WriterStep(writer_client, PROMPTS, paragraph_evaluator=evaluator).execute_async(state)
+        return await evaluator.execute_async(state_)
+
+    state = asyncio.run(write_and_evaluate())
+
+    assert state.draft_text == DRAFT
+    assert threading.main_thread().ident not in writer_client.client.opened[0].threads
+    streamed = state.step_outputs["streamed_grounding"]
+    assert streamed["draft"] == DRAFT
+    assert streamed["result"]["unsupported_statements"] == [FLAGGED]
+
+    # One call per paragraph while writing (the last matched the notes locally),
+    # none of the whole draft afterwards
+    calls = grounding_calls(evaluator_client)
+    assert len(calls) == 2
+    assert all(DRAFT not in prompt_text(p) for p in calls)
+    assert state.evaluation_report.unsupported_statements == [FLAGGED]
+    assert state.evaluation_report.needs_revision
+
+
+def test_streamed_grounding_is_not_reused_for_a_changed_draft(tmp_path):
+    evaluator_client = make_evaluator_client(threading.Event())
+    state = PipelineState(raw_notes="", output_path=str(tmp_path), case_name="Jane Doe",
+                          extracted_components=Components.from_dict(COMPONENTS),
+                          draft_text=DRAFT.replace(FLAGGED, "He hit me with a belt."))
+    state.step_outputs["streamed_grounding"] = {
+        "draft": DRAFT,
+        "prompt": PROMPTS.fingerprint("03-evaluation-grounding"),
+        "result": {"unsupported_statements": [FLAGGED], "uncertain_statements": []},
+    }
+
+    state = asyncio.run(EvaluatorStep(evaluator_client, PROMPTS).execute_async(state))
+
+    assert len(grounding_calls(evaluator_client)) == 1
+    assert FLAGGED not in state.evaluation_report.unsupported_statements